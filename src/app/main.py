@@ -4,10 +4,13 @@ from fastapi.responses import HTMLResponse, StreamingResponse, RedirectResponse,
 from fastapi.templating import Jinja2Templates
 from fastapi import Query
 from sqlalchemy.orm import Session
-from typing import List, Dict,Optional, Tuple 
+from typing import List, Dict,Optional, Tuple, Iterable, Iterator
 import io
+import codecs
 import csv
+import itertools
 import os
+import numpy as np
 from .db import Base, engine, get_db
 from . import models, schemas
 import re                                      # ← neu
@@ -16,7 +19,9 @@ import json
 from typing import List, Dict, Optional
 
 # Kombinatorik aus bestehendem Projekt
-from combinatorics import all_combinations, each_choice, orthogonal
+from combinatorics import all_combinations, each_choice, orthogonal, constraints, coverage, estimate, prioritized, sampling
+from combinatorics.suite import MISSING, Suite, chunked
+from rules import engine as rule_engine
 
 app = FastAPI(title="TaNoS API", version="0.1.0")
 
@@ -54,6 +59,16 @@ def _migrate_db():
         vals_have = {c[1] for c in cols_vals}
         if "order_index" not in vals_have:
             conn.exec_driver_sql('ALTER TABLE "values" ADD COLUMN order_index INTEGER NOT NULL DEFAULT 0')
+        # --- Migration: generations.rules_json (Regel-Schnappschuss je Generation) ---
+        cols_gens = conn.exec_driver_sql('PRAGMA table_info("generations")').fetchall()
+        if "rules_json" not in {c[1] for c in cols_gens}:
+            conn.exec_driver_sql('ALTER TABLE "generations" ADD COLUMN rules_json TEXT')
+        # --- Migration: testcases.status / rule_id (Regelstatus je Testfall) ---
+        tc_have = {c[1] for c in conn.exec_driver_sql('PRAGMA table_info("testcases")').fetchall()}
+        if "status" not in tc_have:
+            conn.exec_driver_sql('ALTER TABLE "testcases" ADD COLUMN status TEXT')
+        if "rule_id" not in tc_have:
+            conn.exec_driver_sql('ALTER TABLE "testcases" ADD COLUMN rule_id INTEGER')
 
 
 
@@ -85,16 +100,248 @@ def _load_categories_values(db: Session, project_id: int) -> Dict[str, List[str]
     return result
 
 
-def _generate_cases(categories: Dict[str, List[str]], strategy: str) -> List[Dict[str, str]]:
-    """Ruft die gewünschte Kombinatorik-Strategie auf (ohne Geschäftsregeln!)."""
+def _load_risk_weights(db: Session, project_id: int) -> Dict[str, Dict[str, int]]:
+    """{Kategoriename: {Wert: risk_weight}} der erlaubten Werte (für die Strategie „prioritized“)."""
+    rows = (
+        db.query(models.Category.name, models.Value.value, models.Value.risk_weight)
+        .join(models.Value, models.Value.category_id == models.Category.id)
+        .filter(models.Category.project_id == project_id, models.Value.allowed == True)
+        .all()
+    )
+    weights: Dict[str, Dict[str, int]] = {}
+    for cat_name, value, weight in rows:
+        weights.setdefault(cat_name, {})[value] = weight or 1
+    return weights
+
+
+# Testfälle je flush beim Persistieren großer Generierungen
+_PERSIST_BATCH = 500
+# Anzahl der Zufallstestfälle, wenn in der UI keine angegeben ist
+_DEFAULT_SAMPLE_SIZE = 100
+# Prozesse für die Pairwise-Bewertung (z. B. TANOS_WORKERS=16 auf CI-Maschinen), Standard: seriell
+_WORKERS = int(os.getenv("TANOS_WORKERS", "1"))
+
+
+def _generate_cases(
+    categories: Dict[str, List[str]],
+    strategy: str,
+    strength: int = 2,
+    groups: Optional[List[Tuple[List[str], int]]] = None,
+    forbidden: Optional[List[constraints.ForbiddenPair]] = None,
+    optimize_seconds: float = 0.0,
+    meta: Optional[Dict] = None,
+    existing: Optional[Suite] = None,
+    limit: Optional[int] = None,
+) -> Suite:
+    """
+    Ruft die gewünschte Kombinatorik-Strategie auf.
+    `strength` und `groups` gelten nur für pairwise/orthogonal (t-Wege-Abdeckung, Standard 2;
+    Gruppen = [(Kategorienamen, Stärke), ...] mit höherer Stärke innerhalb der Gruppe).
+    `forbidden` = verbotene Wertepaare aus den Geschäftsregeln (RuleSet.forbidden_pairs); die
+    Generatoren erzeugen dann nur gültige Testfälle.
+    `optimize_seconds` > 0 (nur pairwise): Zeitbudget zum Verkleinern der Suite; die erreichten
+    Kennzahlen landen in `meta["optimize"]` (für Generation.coverage_meta).
+    `existing` (nur pairwise): Testfälle einer früheren Generation, die erweitert statt neu erzeugt
+    wird (siehe orthogonal.extend).
+    `limit` (nur pairwise): höchstens so viele Testfälle mit möglichst hoher Abdeckung statt einer
+    abgeschnittenen Suite; die erreichte Abdeckung landet in `meta["limit"]` (siehe orthogonal.best_prefix).
+    """
     if strategy == "all":
-        return all_combinations.generate(categories)
+        return all_combinations.generate(categories, forbidden=forbidden)
     if strategy == "each":
-        return each_choice.generate(categories)
+        return each_choice.generate(categories, forbidden=forbidden)
     if strategy in ("pairwise", "orthogonal"):
-        return orthogonal.generate(categories)
+        if strength < 1:
+            raise HTTPException(status_code=400, detail="strength must be >= 1")
+        if optimize_seconds < 0:
+            raise HTTPException(status_code=400, detail="optimize_seconds must be >= 0")
+        if existing is not None and optimize_seconds > 0:
+            raise HTTPException(status_code=400, detail="optimize_seconds cannot be combined with extending a generation")
+        if limit is not None and optimize_seconds > 0:
+            raise HTTPException(status_code=400, detail="optimize_seconds cannot be combined with limit")
+        try:
+            if limit is not None and existing is None:
+                cases, stats = orthogonal.best_prefix(categories, limit, strength=strength, groups=groups,
+                                                      forbidden=forbidden)
+                if meta is not None:
+                    meta["limit"] = stats
+                return cases
+            if existing is not None:
+                cases, stats = orthogonal.extend(categories, existing, strength=strength, groups=groups,
+                                                 forbidden=forbidden, workers=_WORKERS)
+                if meta is not None and "extend" in meta and len(stats["kept"]) < len(existing):
+                    meta["extend"]["dropped"] = len(existing) - len(stats["kept"])  # verletzen Regeln
+                return cases
+            if optimize_seconds > 0:
+                cases, stats = orthogonal.optimize(categories, optimize_seconds, strength=strength, groups=groups,
+                                                   forbidden=forbidden, workers=_WORKERS)
+                if meta is not None:
+                    meta["optimize"] = stats
+                return cases
+            return orthogonal.generate(categories, strength=strength, groups=groups, forbidden=forbidden,
+                                      workers=_WORKERS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     raise HTTPException(status_code=400, detail=f"Unknown strategy: {strategy}")
 
+
+def _iter_suites(
+    categories: Dict[str, List[str]],
+    strategy: str,
+    strength: int = 2,
+    groups: Optional[List[Tuple[List[str], int]]] = None,
+    forbidden: Optional[List[constraints.ForbiddenPair]] = None,
+    seed: Optional[int] = None,
+    optimize_seconds: float = 0.0,
+    meta: Optional[Dict] = None,
+    existing: Optional[Suite] = None,
+    weights: Optional[Dict[str, Dict[str, int]]] = None,
+    limit: Optional[int] = None,
+) -> Iterator[Suite]:
+    """
+    Wie _generate_cases, aber als Folge kompakter Suiten: „all“, „sample“ und „prioritized“ werden
+    lazy blockweise aufgezählt („all“ vektorisiert, siehe all_combinations.iter_suites, die übrigen
+    zu _PERSIST_BATCH Testfällen) – ein `limit` beendet die Aufzählung von „all“ und „prioritized“
+    vorzeitig („sample“ wird erst nach der Regelprüfung begrenzt, siehe _take).
+    „sample“ liefert zufällige gültige Kombinationen (`seed`), „prioritized“ risikogewichtetes
+    Pairwise (`weights`, siehe _load_risk_weights): die Paare mit dem höchsten Gewicht stehen vorn.
+    """
+    if strategy == "all":
+        suites = all_combinations.iter_suites(categories, forbidden=forbidden)
+        return suites if limit is None else _take(suites, limit)
+    if strategy == "sample":
+        rows = sampling.iter_sample(categories, seed=seed, forbidden=forbidden)
+    elif strategy == "prioritized":
+        rows = prioritized.iter_rows(categories, weights, forbidden=forbidden)
+    else:
+        return iter([_generate_cases(categories, strategy, strength, groups, forbidden, optimize_seconds, meta,
+                                     existing, limit)])
+    if limit is not None and strategy == "prioritized":
+        rows = itertools.islice(rows, limit)
+    return chunked(categories, rows, _PERSIST_BATCH)
+
+
+def _take(suites: Iterable[Suite], n: int) -> Iterator[Suite]:
+    """Die ersten `n` Testfälle einer Folge von Suiten (bricht die Aufzählung danach ab)."""
+    for suite in suites:
+        if n <= 0:
+            return
+        if len(suite) > n:
+            suite = suite[:n]
+        n -= len(suite)
+        yield suite
+
+
+def _persist_cases(
+    db: Session,
+    gen: models.Generation,
+    suites: Iterable[Suite],
+    cat_by_name: Dict[str, int],
+    name_fmt: str,
+    preview: int = 25,
+    rules: Optional[rule_engine.RuleSet] = None,
+) -> Tuple[int, List[Dict[str, str]]]:
+    """
+    Speichert Testfälle blockweise (flush + expunge je _PERSIST_BATCH), ohne die Suite im Speicher
+    zu halten. `name_fmt` z. B. 'TC_{idx}' oder 'TC-{gid}-{idx}'.
+    Mit `rules` erhält jeder Testfall seinen Regelstatus ('ok' oder 'combined:<Kategorie>=<Wert>')
+    und die erklärende Combine-Regel (TestCase.rule_id) – spaltenweise je Block ermittelt, damit
+    Exporte später keine Regeln mehr auswerten.
+    Liefert (Anzahl, erste `preview` Testfälle für die Anzeige).
+    """
+    count = 0
+    head: List[Dict[str, str]] = []
+    batch: List[models.TestCase] = []
+    for suite in suites:
+        # Kategorie evtl. umbenannt/gelöscht -> Spalte überspringen (robust)
+        cols = [(c, cat_by_name[k], suite.values[c]) for c, k in enumerate(suite.keys) if k in cat_by_name]
+        if len(head) < preview:
+            head.extend(suite[:preview - len(head)])
+        codes = rules.status_codes(suite).tolist() if rules is not None else [None] * len(suite)
+        targets = {r: suite.keys.index(t) for r, (_, _, t, _) in enumerate(rules.combine if rules else [])
+                   if t in suite.keys}
+        for row, code in zip(suite.rows.tolist(), codes):
+            count += 1
+            tc = models.TestCase(generation_id=gen.id, name=name_fmt.format(gid=gen.id, idx=count))
+            if code is not None:
+                tc.status = "ok"
+                if code >= 0:
+                    t = targets[code]
+                    tc.status = f"combined:{suite.keys[t]}={suite.values[t][row[t]]}"
+                    tc.rule_id = rules.combine_ids[code]
+            for c, cid, vals in cols:
+                if row[c] != MISSING:
+                    tc.values.append(models.TestCaseValue(category_id=cid, value=str(vals[row[c]])))
+            db.add(tc)
+            batch.append(tc)
+            if len(batch) >= _PERSIST_BATCH:
+                db.flush()
+                for obj in batch:
+                    db.expunge(obj)  # Identity-Map klein halten
+                batch = []
+    db.flush()
+    return count, head
+
+
+def _load_base_cases(db: Session, pid: int, gid: int, meta: Dict) -> Suite:
+    """
+    Testfälle einer früheren Generation des Projekts als Ausgangspunkt für eine Erweiterung
+    (nur pairwise). Vermerkt die Basis in `meta["extend"]`.
+    """
+    base = db.get(models.Generation, gid)
+    if base is None or base.project_id != pid:
+        raise HTTPException(status_code=404, detail="Generation not found.")
+    _, existing = _load_generation(db, gid, _load_categories_values(db, pid))
+    meta["extend"] = {"generation_id": gid, "base_size": len(existing)}
+    return existing
+
+
+def _coverage_tracker(categories: Dict[str, List[str]], strength: int,
+                      forbidden: Optional[List[constraints.ForbiddenPair]]) -> coverage.Tracker:
+    """coverage.Tracker; zu viele Tupel für die Stärke (Speicher) -> HTTP 400."""
+    try:
+        return coverage.Tracker(categories, strength, forbidden)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _track_coverage(suites: Iterable[Suite], tracker: coverage.Tracker) -> Iterator[Suite]:
+    """Reicht die Suiten durch und schreibt dabei die Abdeckung je Block fort (coverage.Tracker)."""
+    for suite in suites:
+        tracker.add(suite.project(tracker.categories))
+        yield suite
+
+
+def _parse_optional_int(text: Optional[str], label: str) -> Optional[int]:
+    """Leeres Formularfeld -> None, sonst ganze Zahl (sonst HTTP 400)."""
+    if text is None or not text.strip():
+        return None
+    try:
+        return int(text.strip())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{label}: ganze Zahl erwartet, nicht '{text}'")
+
+
+def _parse_strength_groups(text: Optional[str]) -> List[Tuple[List[str], int]]:
+    """
+    Liest Stärke-Gruppen aus dem UI-Textfeld: 'Gewicht, Größe, Versandart = 3; A, B = 3'.
+    Ohne '= n' gilt Stärke 3.
+    """
+    groups: List[Tuple[List[str], int]] = []
+    for part in (text or "").split(";"):
+        if not part.strip():
+            continue
+        names, _, t = part.partition("=")
+        cats = [n.strip() for n in names.split(",") if n.strip()]
+        if not cats:
+            continue
+        try:
+            strength = int(t) if t.strip() else 3
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Ungültige Stärke in Gruppe: '{part.strip()}'")
+        groups.append((cats, strength))
+    return groups
+
     
 
 
@@ -102,7 +349,7 @@ def _generate_cases(categories: Dict[str, List[str]], strategy: str) -> List[Dic
 
 @app.get("/strategies", response_model=List[str])
 def list_strategies() -> List[str]:
-    return ["all", "each", "pairwise"]  # "orthogonal" ist Alias zu pairwise
+    return ["all", "each", "pairwise", "prioritized", "sample"]  # "orthogonal" ist Alias zu pairwise
 
 
 # --------------- API: Projekte & Stammdaten --------
@@ -255,12 +502,36 @@ def generate(pid: int, payload: schemas.GenerateRequest, db: Session = Depends(g
     if not catmap or any(len(v) == 0 for v in catmap.values()):
         raise HTTPException(status_code=400, detail="Project must have categories and values.")
 
-    cases = _generate_cases(catmap, payload.strategy)
+    groups = [(g.categories, g.strength) for g in payload.groups]
+    meta: Dict = {}
+    rules = _compile_rules(db, pid)
+    _fail_if_unsatisfiable(rules, catmap)
+    forbidden = rules.forbidden_pairs(catmap)
+    if payload.strategy == "sample":
+        if payload.limit is None:
+            raise HTTPException(status_code=400, detail="limit is required for strategy 'sample'")
+        # Zufallsauswahl nur aus gültigen Kombinationen (Regeln als Nebenbedingung + Regelprüfung),
+        # nicht auffächern – sonst wäre die Auswahl nicht mehr zufällig
+        cases = _iter_suites(catmap, payload.strategy, forbidden=forbidden, seed=payload.seed)
+        cases = rules.apply(cases, unique_input=True, fan_out=False)
+    else:
+        existing = None
+        if payload.extend_generation_id is not None:
+            if payload.strategy not in ("pairwise", "orthogonal"):
+                raise HTTPException(status_code=400, detail="extend_generation_id requires strategy 'pairwise'")
+            existing = _load_base_cases(db, pid, payload.extend_generation_id, meta)
+        weights = _load_risk_weights(db, pid) if payload.strategy == "prioritized" else None
+        cases = _iter_suites(catmap, payload.strategy, payload.strength, groups, forbidden,
+                             optimize_seconds=payload.optimize_seconds, meta=meta, existing=existing,
+                             weights=weights, limit=payload.limit)
+        # Geschäftsregeln wie in der UI: Combine-Fan-out, Exclude/Dependency, Deduplikation
+        cases = rules.apply(cases, unique_input=(payload.strategy == "all"))
     if payload.limit is not None:
-        cases = cases[: payload.limit]
+        cases = _take(cases, payload.limit)  # Aufzählung endet nach `limit` Testfällen
 
     # Persistieren
-    gen = models.Generation(project_id=pid, strategy=payload.strategy)
+    gen = models.Generation(project_id=pid, strategy=payload.strategy, coverage_meta=json.dumps(meta) if meta else None,
+                            rules_json=rules.to_json())
     db.add(gen)
     db.flush()  # gen.id verfügbar
 
@@ -273,16 +544,95 @@ def generate(pid: int, payload: schemas.GenerateRequest, db: Session = Depends(g
     )
     cat_by_name = {c.name: c.id for c in categories}
 
-    # Testfälle anlegen (TC_1..N) + Werte
-    for idx, assignment in enumerate(cases, start=1):
-        tc = models.TestCase(generation_id=gen.id, name=f"TC_{idx}")
-        db.add(tc)
-        db.flush()
-        for k, v in assignment.items():
-            db.add(models.TestCaseValue(testcase_id=tc.id, category_id=cat_by_name[k], value=v))
+    # Testfälle anlegen (TC_1..N) + Werte, dabei Abdeckung je Block mitzählen
+    strength = payload.strength if payload.strategy in ("pairwise", "orthogonal") else 2
+    tracker = _coverage_tracker(catmap, strength, forbidden)
+    count, _ = _persist_cases(db, gen, _track_coverage(cases, tracker), cat_by_name, "TC_{idx}", rules=rules)
+    meta["coverage"] = coverage.summary(tracker.report(max_uncovered=0))
+    if payload.strategy == "sample" and count < payload.limit:
+        meta["sample"] = {"requested": payload.limit, "count": count}  # weniger gültige Kombinationen
+    gen.coverage_meta = json.dumps(meta)
 
     db.commit()
-    return schemas.GenerateResponse(generation_id=gen.id, count=len(cases))
+    return schemas.GenerateResponse(generation_id=gen.id, count=count, coverage_meta=meta)
+
+
+@app.get("/projects/{pid}/generate/estimate", response_model=schemas.EstimateResponse)
+def estimate_generation(pid: int, strength: int = Query(2), db: Session = Depends(get_db)):
+    """
+    Größenschätzung vor der Generierung – es wird nichts erzeugt oder aufgezählt:
+    Kreuzprodukt, gültige Kombinationen nach den Regeln, Untergrenze/Erwartung für pairwise.
+    """
+    if strength < 1:
+        raise HTTPException(status_code=400, detail="strength must be >= 1")
+    catmap = _load_categories_values(db, pid)
+    if not catmap or any(len(v) == 0 for v in catmap.values()):
+        raise HTTPException(status_code=400, detail="Project must have categories and values.")
+    return schemas.EstimateResponse(**estimate.summarize(catmap, _forbidden_pairs(db, pid, catmap), strength))
+
+
+@app.get("/projects/{pid}/rules/check", response_model=schemas.RuleCheckResponse)
+def check_rules(pid: int, db: Session = Depends(get_db)):
+    """
+    Widerspruchsprüfung der Regeln vor der Generierung (Millisekunden, es wird nichts erzeugt):
+    Kategorien ohne möglichen Wert, unerfüllbare Abhängigkeitsketten, nie abdeckbare Wertepaare.
+    """
+    catmap = _load_categories_values(db, pid)
+    return schemas.RuleCheckResponse(**_compile_rules(db, pid).check(catmap))
+
+
+@app.post("/generations/{gid}/minimize", response_model=schemas.GenerateResponse)
+def minimize_generation(gid: int, payload: Optional[schemas.MinimizeRequest] = None, db: Session = Depends(get_db)):
+    """
+    Kleinste gefundene Teilmenge einer Generation mit derselben t-Wege-Abdeckung (Standard pairwise)
+    als neue Generation; Kennzahlen der Reduktion in coverage_meta["minimize"].
+    """
+    payload = payload or schemas.MinimizeRequest()
+    source = db.get(models.Generation, gid)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Generation not found.")
+    _, cases = _load_generation(db, gid, _project_headers(db, source.project_id))
+    try:
+        kept, stats = orthogonal.minimize(cases, payload.strength, [(g.categories, g.strength) for g in payload.groups])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    stats.pop("kept")
+    meta = {"minimize": {"source_generation_id": gid, "strength": payload.strength, **stats}}
+
+    gen = models.Generation(project_id=source.project_id, strategy="minimized", coverage_meta=json.dumps(meta),
+                            rules_json=source.rules_json)
+    db.add(gen)
+    db.flush()
+    cat_by_name = {c.name: c.id for c in db.query(models.Category).filter(models.Category.project_id == source.project_id)}
+    count, _ = _persist_cases(db, gen, [kept], cat_by_name, "TC_{idx}", rules=_generation_rules(db, source))
+    db.commit()
+    return schemas.GenerateResponse(generation_id=gen.id, count=count, coverage_meta=meta)
+
+
+@app.get("/generations/{gid}/coverage", response_model=schemas.CoverageReport)
+def generation_coverage(
+    gid: int,
+    strength: int = Query(2),
+    max_uncovered: int = Query(100),
+    db: Session = Depends(get_db),
+):
+    """
+    Abdeckungsanalyse einer Generation gegen die aktuellen Kategorien/Werte und Regeln: Paar- und
+    t-Wege-Quote, Quote je Kategoriepaar und die ersten `max_uncovered` fehlenden Paare.
+    Geeignet als CI-Gate (z. B. pairs.ratio == 1.0), ohne CSV-Export. `strength` wird auf die Zahl
+    der Kategorien begrenzt; zu viele t-Tupel -> 400.
+    """
+    if strength < 1:
+        raise HTTPException(status_code=400, detail="strength must be >= 1")
+    gen = db.get(models.Generation, gid)
+    if gen is None:
+        raise HTTPException(status_code=404, detail="Generation not found.")
+    catmap = _load_categories_values(db, gen.project_id)
+    tracker = _coverage_tracker(catmap, strength, _forbidden_pairs(db, gen.project_id, catmap))
+    for _, suite in _iter_generation(db, gid, catmap):
+        tracker.add(suite.project(catmap))
+    report = tracker.report(max(0, max_uncovered))
+    return schemas.CoverageReport(generation_id=gid, **report)
 
 
 @app.get("/generations/{gid}/testcases", response_model=List[schemas.TestCaseOut])
@@ -321,7 +671,7 @@ def get_testcases(gid: int, db: Session = Depends(get_db)):
         )
         assignments = {name_by_id.get(v.category_id, f"cat#{v.category_id}"): v.value for v in vals}
         # Dict zurückgeben; FastAPI/Pydantic validiert das zu TestCaseOut
-        out.append({"name": tc.name, "assignments": assignments})
+        out.append({"name": tc.name, "assignments": assignments, "status": tc.status, "rule_id": tc.rule_id})
 
     return out  # <- garantiert Liste (auch wenn leer)
 
@@ -366,11 +716,25 @@ def ui_generate_slash(request: Request, db: Session = Depends(get_db)):
 def ui_generate_run(
     pid: int = Form(...),
     strategy: str = Form(...),
+    strength: int = Form(2),
+    groups: Optional[str] = Form(None),
+    sample_size: Optional[str] = Form(None),
+    seed: Optional[str] = Form(None),
+    optimize_seconds: Optional[str] = Form(None),
+    extend_generation: Optional[str] = Form(None),
     db: Session = Depends(get_db),
 ):
     """
     Startet die Generierung für das Projekt (pid) mit der gewählten Strategie.
-    NEU: Wendet nach der Roh-Kombinatorik die Geschäftsregeln an (combine/exclude/dependency).
+    `strength` = Interaktionsstärke für pairwise (2 = paarweise, 3 = 3-wise, ...),
+    `groups` = optionale Gruppen mit höherer Stärke ('Gewicht, Größe, Versandart = 3'),
+    `sample_size`/`seed` = Anzahl und Seed der Zufallsauswahl (nur sample, Standard 100); bei pairwise
+    begrenzt `sample_size` die Suite auf so viele Testfälle mit möglichst hoher Paarabdeckung,
+    `optimize_seconds` = Zeitbudget zum Verkleinern der Pairwise-Suite (leer/0 = aus),
+    `extend_generation` = Nummer einer früheren Generation, die nur um fehlende Paare ergänzt wird
+    (nur pairwise; deren Testfälle bleiben unverändert am Anfang).
+    Die Geschäftsregeln gehen als verbotene Wertepaare direkt in die Generatoren ein; danach
+    folgen Combine-Fan-out und die Regelprüfung (combine/exclude/dependency).
     Gibt ein HTML-Fragment zurück: Tabelle der erzeugten Testfälle + CSV-Link.
     """
     # 1) Kategorien + erlaubte Werte laden (bereits berücksichtigt: allowed=True)
@@ -378,40 +742,59 @@ def ui_generate_run(
     if not categories:
         return HTMLResponse("<p style='color:#b91c1c;'>Keine Kategorien/Werte im Projekt.</p>", status_code=400)
 
-    # 2) Roh-Kombinationen erzeugen
-    raw_assignments = _generate_cases(categories, strategy)  # List[Dict[str,str]]
-
-    # 3) Geschäftsregeln anwenden (Combine → Exclude → Dependency)
-    final_assignments = _apply_business_rules(pid, raw_assignments, db)
+    # 2) Kombinationen unter Berücksichtigung der Regeln erzeugen
+    try:
+        strength_groups = _parse_strength_groups(groups)
+        size = _parse_optional_int(sample_size, "Anzahl")
+        seed_value = _parse_optional_int(seed, "Seed")
+        budget = _parse_optional_int(optimize_seconds, "Optimierung") or 0
+        base_gid = _parse_optional_int(extend_generation, "Generation")
+        rules = _compile_rules(db, pid)
+        _fail_if_unsatisfiable(rules, categories)
+        forbidden = rules.forbidden_pairs(categories)
+        meta: Dict = {}
+        existing = None
+        if base_gid is not None and strategy in ("pairwise", "orthogonal"):
+            existing = _load_base_cases(db, pid, base_gid, meta)
+        weights = _load_risk_weights(db, pid) if strategy == "prioritized" else None
+        limit = size if strategy in ("pairwise", "orthogonal") else None
+        raw_assignments = _iter_suites(categories, strategy, strength, strength_groups, forbidden, seed_value,
+                                       budget, meta, existing, weights, limit)  # Iterator[Suite]
+    except HTTPException as e:
+        return HTMLResponse(f"<p style='color:#b91c1c;'>{e.detail}</p>", status_code=e.status_code)
+
+    # 3) Geschäftsregeln anwenden (Combine → Exclude → Dependency), lazy je Block
+    if strategy == "sample":
+        # Zufallszeilen nur prüfen, nicht auffächern – sonst wäre die Auswahl nicht mehr zufällig
+        final_assignments = rules.apply(raw_assignments, unique_input=True, fan_out=False)
+        size = size if size is not None else _DEFAULT_SAMPLE_SIZE
+        final_assignments = _take(final_assignments, size)
+    else:
+        final_assignments = rules.apply(raw_assignments, unique_input=(strategy == "all"))
 
     # 4) Persistieren: Generation + Testfälle + TestCaseValues
-    gen = models.Generation(project_id=pid, strategy=strategy)
+    gen = models.Generation(project_id=pid, strategy=strategy, coverage_meta=json.dumps(meta) if meta else None,
+                            rules_json=rules.to_json())
     db.add(gen)
     db.flush()  # gen.id holen
 
     # Mapping: Kategoriename -> ID (für TestCaseValue.category_id)
     cat_map = {c.name: c.id for c in db.query(models.Category).filter(models.Category.project_id == pid).all()}
 
-    # Testfälle speichern
-    for idx, a in enumerate(final_assignments, start=1):
-        tc = models.TestCase(generation_id=gen.id, name=f"TC-{gen.id}-{idx}")
-        db.add(tc)
-        db.flush()
-        for cat_name, val in a.items():
-            cid = cat_map.get(cat_name)
-            if cid is None:
-                # Kategorie wurde evtl. umbenannt/gelöscht -> überspringen (robust)
-                continue
-            tcv = models.TestCaseValue(testcase_id=tc.id, category_id=cid, value=str(val))
-            db.add(tcv)
+    # Testfälle speichern (blockweise); ein paar Zeilen zeigen, Rest via CSV exportieren
+    tracker = _coverage_tracker(categories, strength if strategy in ("pairwise", "orthogonal") else 2, forbidden)
+    count, rows_preview = _persist_cases(db, gen, _track_coverage(final_assignments, tracker), cat_map,
+                                         "TC-{gid}-{idx}", rules=rules)
+    meta["coverage"] = coverage.summary(tracker.report(max_uncovered=0))
+    if strategy == "sample" and count < size:
+        meta["sample"] = {"requested": size, "count": count}
+    gen.coverage_meta = json.dumps(meta)
 
     db.commit()
 
     # 5) HTML-Output (kleine Tabelle + Export-Links)
     #    Spaltenüberschriften aus den (aktuellen) Kategorienamen
     headers = list(cat_map.keys())
-    # Ein paar Zeilen zeigen, Rest via CSV exportieren
-    rows_preview = final_assignments[:25]
 
     # CSV/JSON-Links (passen zu deinen vorhandenen Endpoints)
     csv_url = f"/generations/{gen.id}/export/csv"
@@ -419,7 +802,23 @@ def ui_generate_run(
 
     # Tabelle rendern
     parts = []
-    parts.append(f"<p><strong>Erzeugt:</strong> {len(final_assignments)} Testfälle (Generation #{gen.id})</p>")
+    parts.append(f"<p><strong>Erzeugt:</strong> {count} Testfälle (Generation #{gen.id})</p>")
+    if "optimize" in meta:
+        opt = meta["optimize"]
+        parts.append(f"<p>Optimiert: {opt['initial_size']} → {opt['size']} Testfälle in {opt['elapsed']} s</p>")
+    cov = meta["coverage"]
+    parts.append(f"<p>Paarabdeckung: {round(100 * cov['pairs']['ratio'], 2)} % "
+                 f"({cov['pairs']['covered']}/{cov['pairs']['total']})</p>")
+    if "limit" in meta:
+        parts.append(f"<p>Paarabdeckung mit {meta['limit']['size']} Testfällen: {meta['limit']['coverage']} %</p>")
+    if "sample" in meta:
+        parts.append(f"<p style='color:#b45309;'>Nur {count} von {meta['sample']['requested']} Testfällen – "
+                     "die Regeln lassen nicht mehr gültige Kombinationen zu.</p>")
+    if "extend" in meta:
+        ext = meta["extend"]
+        parts.append(f"<p>Erweitert: Generation #{ext['generation_id']} ({ext['base_size']} Testfälle) → {count} Testfälle</p>")
+        if ext.get("dropped"):
+            parts.append(f"<p>{ext['dropped']} Testfälle der Basis verletzen Regeln und wurden nicht übernommen.</p>")
     parts.append("<div class='overflow-x-auto'>")
     parts.append("<table><thead><tr>")
     for h in headers:
@@ -439,15 +838,46 @@ def ui_generate_run(
     return HTMLResponse("".join(parts))
 
 
+@app.post("/ui/rules/check", response_class=HTMLResponse)
+def ui_rules_check(pid: int = Form(...), db: Session = Depends(get_db)):
+    """Regeln prüfen (Button im Generieren-Formular): HTML-Fragment mit den gefundenen Widersprüchen."""
+    check = _compile_rules(db, pid).check(_load_categories_values(db, pid))
+    parts = []
+    if not check["ok"]:
+        parts.append("<p style='color:#b91c1c;'><strong>Keine gültige Kombination möglich</strong> – alle Werte "
+                     f"ausgeschlossen in: {', '.join(check['empty_categories'])}</p>")
+    if check["dead_values"]:
+        parts.append("<p>Werte ohne gültigen Testfall: "
+                     + ", ".join(f"{c}={v}" for c, v in check["dead_values"]) + "</p>")
+    if check["unsatisfiable_dependencies"]:
+        parts.append("<p>Unerfüllbare Abhängigkeiten: "
+                     + ", ".join(f"{a}={av} → {b}={bv}" for a, av, b, bv in check["unsatisfiable_dependencies"]) + "</p>")
+    if check["uncoverable_total"]:
+        shown = ", ".join(f"{a}={av} + {b}={bv}" for a, av, b, bv in check["uncoverable_pairs"])
+        more = check["uncoverable_total"] - len(check["uncoverable_pairs"])
+        parts.append(f"<p>Nie abdeckbare Paare ({check['uncoverable_total']}): {shown}"
+                     + (f" … und {more} weitere" if more else "") + "</p>")
+    if not parts:
+        parts.append("<p>Regeln widerspruchsfrei – keine Probleme gefunden.</p>")
+    return HTMLResponse("".join(parts))
+
+
 # Trailing-Slash-Variante abfangen (zeigt nicht in /docs)
 @app.post("/ui/generate/run/", include_in_schema=False)
-async def ui_generate_run_slash(
-    request: Request,
+def ui_generate_run_slash(
     pid: int = Form(...),
     strategy: str = Form(...),
+    strength: int = Form(2),
+    groups: Optional[str] = Form(None),
+    sample_size: Optional[str] = Form(None),
+    seed: Optional[str] = Form(None),
+    optimize_seconds: Optional[str] = Form(None),
+    extend_generation: Optional[str] = Form(None),
     db: Session = Depends(get_db),
 ):
-    return await ui_generate_run(request, pid, strategy, db)  # delegiert an obige Funktion
+    return ui_generate_run(pid=pid, strategy=strategy, strength=strength, groups=groups,
+                           sample_size=sample_size, seed=seed, optimize_seconds=optimize_seconds,
+                           extend_generation=extend_generation, db=db)  # delegiert an obige Funktion
 
 
 
@@ -476,53 +906,12 @@ def export_generation_csv(
     - 'bom' überschreibt Standardverhalten (falls gesetzt)
     - 'excel=1' setzt 'sep=;' zur sicheren Trennzeichenerkennung
     """
-    # 1) Generation & Testfälle laden
+    # 1) Generation prüfen
     gen = db.get(models.Generation, gen_id)
     if not gen:
         raise HTTPException(status_code=404, detail="Generation not found.")
-    tcs = (
-        db.query(models.TestCase)
-        .filter(models.TestCase.generation_id == gen_id)
-        .order_by(models.TestCase.id)
-        .all()
-    )
-
-    # 2) Kopfzeilen (Kategorien) bestimmen
-    cats = (
-        db.query(models.Category)
-        .filter(models.Category.project_id == gen.project_id)
-        .order_by(models.Category.order_index, models.Category.id)
-        .all()
-    )
-    cat_headers: List[str] = [c.name for c in cats]
 
-    # 3) CSV in Textform bauen (Semikolon + CRLF)
-    #    Achtung: newline='' + lineterminator='\r\n' -> sauberes CRLF für Excel
-    out = io.StringIO(newline="")
-    writer = csv.writer(out, delimiter=';', lineterminator="\r\n", quoting=csv.QUOTE_MINIMAL)
-
-    # Optionale Excel-Hinweiszeile
-    if excel:
-        writer.writerow(["sep=;"])
-
-    # Headerzeile
-    headers = cat_headers + ["__TestCaseID", "__GenerationID", "__Strategy"]
-    if include_status:
-        headers.append("Status")
-    writer.writerow(headers)
-
-    # Datenzeilen
-    for tc in tcs:
-        a = _assignment_from_testcase(db, tc.id)  # {Kategorie: Wert}
-        row = [a.get(h, "") for h in cat_headers]
-        row += [tc.id, gen.id, gen.strategy]
-        if include_status:
-            row.append(_status_for_assignment(gen.project_id, a, db))
-        writer.writerow(row)
-
-    csv_text: str = out.getvalue()
-
-    # 4) Encoding anwenden (mit optionalem BOM)
+    # 2) Encoding prüfen (vor dem Streamen, damit Fehler noch als 400 ankommen)
     #    Zulässige Encodings
     enc_norm = encoding.lower().strip()
     aliases = {"latin1": "iso-8859-1"}
@@ -538,42 +927,83 @@ def export_generation_csv(
     else:
         bom_default = bool(bom)
 
-    data_bytes: bytes
     content_charset = enc if enc != "utf-8-sig" else "utf-8"  # header charset-Angabe
 
-    if enc == "utf-8-sig":
-        # Python-Codecs 'utf-8-sig' fügt automatisch BOM an
-        data_bytes = csv_text.encode("utf-8-sig")
-    elif enc in {"utf-16", "utf-16le", "utf-16be"}:
-        # BOM ggf. manuell voranstellen
-        data_bytes = csv_text.encode(enc if enc != "utf-16" else "utf-16")
-        if bom_default:
-            # Bei utf-16: Python setzt bereits BOM; bei le/be ggf. ergänzen:
-            if enc == "utf-16le" and not data_bytes.startswith(b"\xff\xfe"):
-                data_bytes = b"\xff\xfe" + data_bytes
-            elif enc == "utf-16be" and not data_bytes.startswith(b"\xfe\xff"):
-                data_bytes = b"\xfe\xff" + data_bytes
-            # utf-16 (ohne le/be) enthält BOM bereits
-        else:
-            # BOM ggf. entfernen
-            if data_bytes.startswith(b"\xff\xfe"):
-                data_bytes = data_bytes[2:]
-            if data_bytes.startswith(b"\xfe\xff"):
-                data_bytes = data_bytes[2:]
-    else:
-        # 8-bit Encodings (utf-8, cp1252, iso-8859-1)
-        data_bytes = csv_text.encode(enc, errors="strict")
-        if bom_default and enc == "utf-8":
-            # BOM für reines 'utf-8' optional einschalten
-            data_bytes = b"\xef\xbb\xbf" + data_bytes
-
-    # 5) Response mit korrektem Content-Type + Dateiname
-    filename = f"tanos_generation_{gen.id}.csv"
+    # 3) Kopfzeilen (Kategorien) bestimmen
+    cats = (
+        db.query(models.Category)
+        .filter(models.Category.project_id == gen.project_id)
+        .order_by(models.Category.order_index, models.Category.id)
+        .all()
+    )
+    cat_headers: List[str] = [c.name for c in cats]
+    gid, strategy = gen.id, gen.strategy
+    rules: List[rule_engine.RuleSet] = []  # nur für ältere Generationen ohne gespeicherten Status
+
+    def lines() -> Iterator[str]:
+        """CSV-Text blockweise (Semikolon + CRLF) – nie mehr als ein Block Testfälle im Speicher."""
+        #    Achtung: newline='' + lineterminator='\r\n' -> sauberes CRLF für Excel
+        out = io.StringIO(newline="")
+        writer = csv.writer(out, delimiter=';', lineterminator="\r\n", quoting=csv.QUOTE_MINIMAL)
+
+        # Optionale Excel-Hinweiszeile
+        if excel:
+            writer.writerow(["sep=;"])
+
+        # Headerzeile
+        headers = cat_headers + ["__TestCaseID", "__GenerationID", "__Strategy"]
+        if include_status:
+            headers.append("Status")
+        writer.writerow(headers)
+
+        # Datenzeilen
+        for ids, suite in _iter_generation(db, gid, {h: [] for h in cat_headers}):
+            tables = [vals + [""] for vals in suite.values]  # Index -1 (MISSING) -> leere Zelle
+            stored = _stored_status(db, ids) if include_status else {}
+            for r, (tc_id, idx) in enumerate(zip(ids, suite.rows.tolist())):
+                row = [vals[i] for vals, i in zip(tables, idx)]
+                row += [tc_id, gid, strategy]
+                if include_status:
+                    status = stored.get(tc_id)
+                    if status is None:
+                        if not rules:
+                            rules.append(_generation_rules(db, gen))
+                        status = rules[0].status(suite[r])
+                    row.append(status)
+                writer.writerow(row)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+        yield out.getvalue()
+
+    def chunks() -> Iterator[bytes]:
+        """4) Encoding anwenden (mit optionalem BOM)."""
+        # Python-Codecs 'utf-8-sig' und 'utf-16' setzen das BOM automatisch an den Anfang
+        encoder = codecs.getincrementalencoder(enc)(errors="strict")
+        first = True
+        for text in lines():
+            data = encoder.encode(text)
+            if first:
+                first = False
+                if enc == "utf-16" and not bom_default:
+                    data = data[2:]  # BOM entfernen
+                elif bom_default and enc == "utf-16le":
+                    data = b"\xff\xfe" + data
+                elif bom_default and enc == "utf-16be":
+                    data = b"\xfe\xff" + data
+                elif bom_default and enc == "utf-8":
+                    # BOM für reines 'utf-8' optional einschalten
+                    data = b"\xef\xbb\xbf" + data
+            if data:
+                yield data
+
+    # 5) Response mit korrektem Content-Type + Dateiname (gestreamt)
+    filename = f"tanos_generation_{gid}.csv"
     headers = {
         "Content-Disposition": f'attachment; filename="{filename}"',
         "Content-Type": f"text/csv; charset={content_charset}",
     }
-    return Response(content=data_bytes, headers=headers, media_type=f"text/csv; charset={content_charset}")
+    return StreamingResponse(chunks(), headers=headers, media_type=f"text/csv; charset={content_charset}")
 
 # ---------- UI: Projekte ----------
 
@@ -1038,38 +1468,88 @@ def _render_rules_block(db: Session, pid: int) -> str:
     ]
     return "".join(html)
 
-def _assignment_from_testcase(db: Session, tc_id: int) -> Dict[str, str]:
-    """Liest die TestCaseValues eines Testfalls und gibt {KategorieName: Wert} zurück."""
-    # Kategorienamen lookup
-    rows = (
-        db.query(models.TestCaseValue, models.Category.name)
-        .join(models.Category, models.Category.id == models.TestCaseValue.category_id)
-        .filter(models.TestCaseValue.testcase_id == tc_id)
+def _iter_generation(
+    db: Session,
+    gen_id: int,
+    categories: Dict[str, List[str]],
+    batch: int = _PERSIST_BATCH,
+) -> Iterator[Tuple[List[int], Suite]]:
+    """
+    Liefert die Testfälle einer Generation blockweise als (Testfall-IDs, Suite) in ID-Reihenfolge –
+    eine Abfrage je `batch` Testfälle. Spalten und Wertetabelle aus `categories`; Werte, die dort
+    fehlen, werden angehängt (die Tabelle wächst über die Blöcke nur am Ende, frühere Indizes bleiben
+    gültig), Kategorien außerhalb von `categories` entfallen.
+    """
+    table = {k: list(v) for k, v in categories.items()}
+    idx_of = {k: {v: i for i, v in enumerate(vals)} for k, vals in table.items()}
+    col_of = {k: c for c, k in enumerate(table)}
+    last_id = 0
+    while True:
+        ids = [
+            tid for (tid,) in db.query(models.TestCase.id)
+            .filter(models.TestCase.generation_id == gen_id, models.TestCase.id > last_id)
+            .order_by(models.TestCase.id)
+            .limit(batch)
+            .all()
+        ]
+        if not ids:
+            return
+        pos = {tid: r for r, tid in enumerate(ids)}
+        rows = np.full((len(ids), len(table)), MISSING, dtype=np.int64)
+        values = (
+            db.query(models.TestCaseValue.testcase_id, models.Category.name, models.TestCaseValue.value)
+            .join(models.Category, models.Category.id == models.TestCaseValue.category_id)
+            .filter(models.TestCaseValue.testcase_id.in_(ids))
+            .all()
+        )
+        for tid, cat_name, value in values:
+            c = col_of.get(cat_name)
+            if c is None:
+                continue
+            i = idx_of[cat_name].get(value)
+            if i is None:
+                i = idx_of[cat_name][value] = len(table[cat_name])
+                table[cat_name].append(value)
+            rows[pos[tid], c] = i
+        yield ids, Suite(table, rows)
+        last_id = ids[-1]
+
+
+def _load_generation(db: Session, gen_id: int, categories: Dict[str, List[str]]) -> Tuple[List[int], Suite]:
+    """Alle Testfälle einer Generation als eine Suite (siehe _iter_generation)."""
+    ids: List[int] = []
+    blocks: List[Suite] = []
+    for block_ids, suite in _iter_generation(db, gen_id, categories):
+        ids += block_ids
+        blocks.append(suite)
+    if not blocks:
+        return ids, Suite(categories)
+    return ids, blocks[-1].like(np.concatenate([b.rows for b in blocks]))
+
+
+def _project_headers(db: Session, pid: int) -> Dict[str, List[str]]:
+    """Alle Kategorien des Projekts (auch ohne erlaubte Werte) in Anzeige-Reihenfolge, ohne Wertetabelle."""
+    cats = (
+        db.query(models.Category.name)
+        .filter(models.Category.project_id == pid)
+        .order_by(models.Category.order_index, models.Category.id)
         .all()
     )
-    assignment: Dict[str, str] = {}
-    for tcv, cat_name in rows:
-        assignment[cat_name] = tcv.value
-    return assignment
+    return {name: [] for (name,) in cats}
 
-def _status_for_assignment(pid: int, a: Dict[str, str], db: Session) -> str:
+def _stored_status(db: Session, ids: List[int]) -> Dict[int, Optional[str]]:
+    """Bei der Generierung gespeicherter Regelstatus der Testfälle `ids` (eine Abfrage je Block)."""
+    return dict(db.query(models.TestCase.id, models.TestCase.status).filter(models.TestCase.id.in_(ids)).all())
+
+
+def _generation_rules(db: Session, gen: models.Generation) -> rule_engine.RuleSet:
     """
-    Liefert 'ok' oder 'combined:<Kategorie>=<Wert>'.
-    (Exclude/Dependency wurden bereits in der Generierung gefiltert.)
+    Regelsatz, mit dem die Generation erzeugt wurde (Schnappschuss in Generation.rules_json);
+    ältere Generationen ohne Schnappschuss verwenden die aktuellen Regeln des Projekts.
     """
-    rules = _load_rules_structured(db, pid)
-    id2name = _cat_id_to_name_map(db, pid)
-    # nur Combine sichtbar machen
-    for (if_cid, if_val, target_cid, target_values) in rules["combine"]:
-        if not target_values:
-            continue
-        if_name = id2name.get(if_cid)
-        target_name = id2name.get(target_cid)
-        if not if_name or not target_name:
-            continue
-        if a.get(if_name) == if_val and a.get(target_name) in target_values:
-            return f"combined:{target_name}={a.get(target_name)}"
-    return "ok"
+    if gen.rules_json:
+        return rule_engine.RuleSet.from_json(gen.rules_json)
+    return _compile_rules(db, gen.project_id)
 
 
 #---HELPERLINIE-----
@@ -1086,10 +1566,11 @@ def _load_rules_structured(db: Session, pid: int) -> Dict[str, list]:
       "exclude": [(if_cat_id, if_value, then_cat_id, then_value), ...],
       "dependency": [(if_cat_id, if_value, then_cat_id, then_value), ...],
       "combine": [(if_cat_id, if_value, target_cat_id, [values...]), ...],
+      "combine_ids": [Rule.id, ...],  # gleiche Reihenfolge wie "combine"
     }
     """
     rules = db.query(models.Rule).filter(models.Rule.project_id == pid).all()
-    out = {"exclude": [], "dependency": [], "combine": []}
+    out = {"exclude": [], "dependency": [], "combine": [], "combine_ids": []}
     for r in rules:
         t = (r.if_category_id, r.if_value, r.then_category_id, r.then_value)
         if r.type == "exclude":
@@ -1104,79 +1585,34 @@ def _load_rules_structured(db: Session, pid: int) -> Dict[str, list]:
                 except Exception:
                     values = []
             out["combine"].append((r.if_category_id, r.if_value, r.then_category_id, values))
+            out["combine_ids"].append(r.id)
     return out
 
-def _apply_business_rules(
-    pid: int,
-    assignments: list[dict[str, str]],  # [{cat_name: value, ...}, ...]
-    db: Session
-) -> list[dict[str, str]]:
-    """
-    Wendet in Reihenfolge an:
-    1) COMBINE (fan-out anhand gegebener Zielwerte)
-    2) EXCLUDE (Kombinationen verwerfen, die verbotene Paare enthalten)
-    3) DEPENDENCY (verwerfen, wenn if erfüllt aber then nicht)
-    """
+def _compile_rules(db: Session, pid: int) -> rule_engine.RuleSet:
+    """Regeln des Projekts mit Kategorienamen, kompiliert für die Regel-Engine (rules/engine.py)."""
     rules = _load_rules_structured(db, pid)
     id2name = _cat_id_to_name_map(db, pid)
 
-    # 1) COMBINE – Fan-out
-    combined: list[dict[str, str]] = []
-    for a in assignments:
-        clones_added = False
-        for (if_cid, if_val, target_cid, target_values) in rules["combine"]:
-            if not target_values:
-                continue
-            if_name = id2name.get(if_cid)
-            target_name = id2name.get(target_cid)
-            if not if_name or not target_name:
-                continue
-            if a.get(if_name) == if_val:
-                # Für jeden Zielwert eine Kopie, in der die Zielkategorie gesetzt wird
-                for tv in target_values:
-                    clone = dict(a)
-                    clone[target_name] = tv
-                    combined.append(clone)
-                clones_added = True
-        if not clones_added:
-            combined.append(a)
-
-    # 2) EXCLUDE – verbotene Paare aussortieren
-    def violates_exclude(a: dict[str, str]) -> bool:
-        for (l_cid, l_val, r_cid, r_val) in rules["exclude"]:
-            l_name = id2name.get(l_cid)
-            r_name = id2name.get(r_cid)
-            if not l_name or not r_name:
-                continue
-            if a.get(l_name) == l_val and a.get(r_name) == r_val:
-                return True
-        return False
-
-    filtered = [a for a in combined if not violates_exclude(a)]
-
-    # 3) DEPENDENCY – wenn if, dann muss then erfüllt sein
-    def violates_dependency(a: dict[str, str]) -> bool:
-        for (if_cid, if_val, then_cid, then_val) in rules["dependency"]:
-            if_name = id2name.get(if_cid)
-            then_name = id2name.get(then_cid)
-            if not if_name or not then_name:
-                continue
-            if a.get(if_name) == if_val and a.get(then_name) != then_val:
-                return True
-        return False
-
-    filtered = [a for a in filtered if not violates_dependency(a)]
-
-    # 4) Deduplikation (falls COMBINE identische Einträge erzeugt)
-    seen: set[tuple[tuple[str, str], ...]] = set()
-    unique: list[dict[str, str]] = []
-    for a in filtered:
-        key = tuple(sorted(a.items()))
-        if key not in seen:
-            seen.add(key)
-            unique.append(a)
-    return unique
+    def known(item):
+        return bool(id2name.get(item[0]) and id2name.get(item[2]))
+
+    def named(items):
+        return [(id2name[a], av, id2name[b], bv) for a, av, b, bv in items if known((a, av, b, bv))]
+
+    combine_ids = [rid for item, rid in zip(rules["combine"], rules["combine_ids"]) if known(item)]
+    return rule_engine.from_pairs(named(rules["exclude"]), named(rules["dependency"]), named(rules["combine"]),
+                                  combine_ids)
+
+def _fail_if_unsatisfiable(rules: rule_engine.RuleSet, categories: Dict[str, List[str]]) -> None:
+    """Bricht vor der Generierung ab, wenn die Regeln jede Kombination ausschließen (nur Kantenkonsistenz)."""
+    check = rules.check(categories, pairs=False)
+    if not check["ok"]:
+        raise HTTPException(status_code=400, detail="Regeln schließen jede Kombination aus – keine gültigen Werte in: "
+                            + ", ".join(check["empty_categories"]))
 
+def _forbidden_pairs(db: Session, pid: int, categories: Dict[str, List[str]]) -> List[constraints.ForbiddenPair]:
+    """Regeln des Projekts als verbotene Wertepaare (Kategorienamen) für die Generatoren."""
+    return _compile_rules(db, pid).forbidden_pairs(categories)
 
 def _normalize_value_by_vtype(vtype: str, raw: str) -> Tuple[Optional[str], Optional[str]]:
     """
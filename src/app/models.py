@@ -43,6 +43,7 @@ class Generation(Base):
     strategy = Column(String(50), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     coverage_meta = Column(Text, nullable=True)  # JSON-String (optional)
+    rules_json = Column(Text, nullable=True)     # Regelsatz zum Zeitpunkt der Generierung (RuleSet.to_json)
 
     project = relationship("Project", back_populates="generations")
     testcases = relationship("TestCase", back_populates="generation", cascade="all, delete-orphan")
@@ -52,6 +53,8 @@ class TestCase(Base):
     id = Column(Integer, primary_key=True)
     generation_id = Column(Integer, ForeignKey("generations.id", ondelete="CASCADE"), nullable=False)
     name = Column(String(200), nullable=False)
+    status = Column(String(500), nullable=True)  # 'ok' | 'combined:<Kategorie>=<Wert>', bei der Generierung gesetzt
+    rule_id = Column(Integer, nullable=True)     # Combine-Regel (Rule.id), die den Testfall erzeugt hat
 
     generation = relationship("Generation", back_populates="testcases")
     values = relationship("TestCaseValue", back_populates="testcase", cascade="all, delete-orphan")
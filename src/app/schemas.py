@@ -33,14 +33,60 @@ class ValueRead(BaseModel):
     class Config:
         from_attributes = True
 
+class StrengthGroup(BaseModel):
+    categories: List[str]  # Kategorienamen, z. B. ["Gewicht", "Größe", "Versandart"]
+    strength: int = 3
+
 class GenerateRequest(BaseModel):
-    strategy: str  # "all" | "each" | "pairwise"
-    limit: Optional[int] = None
+    strategy: str  # "all" | "each" | "pairwise" | "prioritized" | "sample"
+    limit: Optional[int] = None  # bei "sample": Anzahl der Zufallstestfälle (Pflicht); bei "pairwise": beste Abdeckung mit N Testfällen
+    seed: Optional[int] = None  # nur "sample": gleicher Seed -> gleiche Auswahl
+    optimize_seconds: float = 0  # nur "pairwise": Zeitbudget zum Verkleinern der Suite (0 = aus)
+    strength: int = 2  # Interaktionsstärke für "pairwise" (2 = paarweise, 3 = 3-wise, ...)
+    groups: List[StrengthGroup] = []  # optionale Gruppen mit höherer Stärke (nur "pairwise")
+    extend_generation_id: Optional[int] = None  # nur "pairwise": diese Generation nur um fehlende Paare ergänzen
+
+class MinimizeRequest(BaseModel):
+    strength: int = 2  # diese t-Wege-Abdeckung der Ausgangssuite bleibt erhalten
+    groups: List[StrengthGroup] = []
 
 class GenerateResponse(BaseModel):
     generation_id: int
     count: int
+    coverage_meta: Optional[Dict] = None  # Kennzahlen der Generierung, z. B. {"optimize": {...}}
+
+class CoverageRatio(BaseModel):
+    covered: int
+    total: int
+    ratio: float  # 0..1
+
+class CoverageReport(BaseModel):
+    generation_id: int
+    testcases: int
+    strength: int
+    pairs: CoverageRatio
+    tuples: CoverageRatio            # t-Wege-Abdeckung (t = strength)
+    categories: List[str]
+    pair_matrix: List[List[Optional[float]]]  # Quote je Kategoriepaar, Diagonale None
+    uncovered: List[List[str]]       # [Kategorie1, Wert1, Kategorie2, Wert2]
+    uncovered_count: int
+
+class EstimateResponse(BaseModel):
+    product: int      # Größe des Kreuzprodukts
+    valid: int        # gültige Kombinationen nach exclude/dependency/combine (gezählt)
+    lower_bound: int  # Mindestgröße der Pairwise-/t-Wege-Suite
+    expected: int     # erwartete Größe der Pairwise-/t-Wege-Suite
+
+class RuleCheckResponse(BaseModel):
+    ok: bool                                # False: keine gültige Kombination möglich
+    empty_categories: List[str]             # Kategorien, deren Werte alle ausgeschlossen sind
+    dead_values: List[List[str]]            # [Kategorie, Wert] ohne gültigen Testfall
+    unsatisfiable_dependencies: List[List[str]]  # [Wenn-Kat., Wenn-Wert, Dann-Kat., Dann-Wert]
+    uncoverable_pairs: List[List[str]]      # [Kat1, Wert1, Kat2, Wert2], nie gemeinsam abdeckbar
+    uncoverable_total: int
 
 class TestCaseOut(BaseModel):
     name: str
     assignments: Dict[str, str]
+    status: Optional[str] = None
+    rule_id: Optional[int] = None
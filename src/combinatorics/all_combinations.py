@@ -1,10 +1,97 @@
 import itertools
+import math
+from typing import Iterator, List, Optional, Sequence, Tuple
 
-def generate(categories: dict) -> list[dict]:
-    """All Combinations: Kreuzprodukt aller Werte."""
+import numpy as np
+
+from . import constraints as _constraints
+from .constraints import Constraints, ForbiddenPair
+from .suite import Suite, chunked, concat
+
+# Zeilen je Block beim Aufbau der Suite (begrenzt den Speicher je Block)
+_CHUNK_ROWS = 65536
+# Bis zu dieser Produktgröße wird blockweise vektorisiert aufgezählt und per Maske gefiltert,
+# darüber per Tiefensuche (verbotene Präfixe werden übersprungen statt erzeugt)
+_VECTOR_MAX_PRODUCT = 50_000_000
+
+
+def _valid_indices(cons: Constraints) -> Iterator[Tuple[int, ...]]:
+    """
+    Alle gültigen Kombinationen als Wertindizes in lexikographischer Reihenfolge.
+    Tiefensuche mit Vorwärtsprüfung: Präfixe mit verbotenen Paaren werden gar nicht erst erweitert.
+    """
+    k = len(cons.radices)
+    row: List[int] = [0] * k
+
+    def search(c: int, allowed: np.ndarray) -> Iterator[Tuple[int, ...]]:
+        if c == k:
+            yield tuple(row)
+            return
+        if (np.add.reduceat(allowed, cons.offsets)[c:] == 0).any():
+            return
+        for a in np.flatnonzero(allowed[cons.block(c)]):
+            row[c] = int(a)
+            yield from search(c + 1, allowed & ~cons.conflict[cons.offsets[c] + a])
+
+    yield from search(0, cons.alive.copy())
+
+
+def iter_rows(categories: dict, forbidden: Optional[List[ForbiddenPair]] = None) -> Iterator[Tuple[int, ...]]:
+    """
+    Lazy-Variante: liefert die Kombinationen nacheinander als kompakte Zeilen (Wertindizes je
+    Kategorie, Reihenfolge wie `categories`). Es wird nie mehr als eine Zeile gehalten – wer nur die
+    ersten N braucht, bricht einfach ab (z. B. itertools.islice).
+    """
     if not categories:
-        return []
-    keys = list(categories.keys())
-    values = [categories[k] for k in keys]
-    combos = itertools.product(*values)
-    return [{k: v for k, v in zip(keys, c)} for c in combos]
+        return
+    cons = _constraints.build(categories, forbidden)
+    if cons is None:
+        yield from itertools.product(*[range(len(v)) for v in categories.values()])
+        return
+    yield from _valid_indices(cons)
+
+
+def _valid_mask(cons: Constraints, rows: np.ndarray, pairs: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """Zeilen ohne toten Wert und ohne verbotenes Paar – je Kategoriepaar mit Regeln eine Spaltenmaske."""
+    ids = rows + cons.offsets
+    ok = cons.alive[ids].all(axis=1)
+    for c, d in pairs:
+        ok &= ~cons.conflict[ids[:, c], ids[:, d]]
+    return ok
+
+
+def iter_suites(categories: dict, forbidden: Optional[List[ForbiddenPair]] = None,
+                size: int = _CHUNK_ROWS) -> Iterator[Suite]:
+    """
+    Wie iter_rows, aber blockweise als Suite (höchstens `size` Testfälle je Block, gleiche Reihenfolge).
+    Bis _VECTOR_MAX_PRODUCT wird das Kreuzprodukt je Block per Mixed-Radix-Unranking als Indexmatrix
+    erzeugt und mit booleschen Spaltenmasken gegen die verbotenen Paare gefiltert (keine Schleife je
+    Zeile); größere Produkte zählt die Tiefensuche auf.
+    """
+    if not categories:
+        return
+    radices = [len(v) for v in categories.values()]
+    total = math.prod(radices)
+    if total > _VECTOR_MAX_PRODUCT:
+        yield from chunked(categories, iter_rows(categories, forbidden), size)
+        return
+    cons = _constraints.build(categories, forbidden)
+    pairs = []
+    if cons is not None:
+        pairs = [(c, d) for c, d in itertools.combinations(range(len(radices)), 2)
+                 if cons.conflict[cons.block(c), cons.block(d)].any()]
+    for lo in range(0, total, size):
+        rows = np.stack(np.unravel_index(np.arange(lo, min(total, lo + size)), radices), axis=1)
+        if cons is not None:
+            rows = rows[_valid_mask(cons, rows, pairs)]
+        if len(rows):
+            yield Suite(categories, rows)
+
+
+def generate(categories: dict, forbidden: Optional[List[ForbiddenPair]] = None) -> Suite:
+    """
+    All Combinations: Kreuzprodukt aller Werte.
+    Mit `forbidden` (verbotene Wertepaare, siehe constraints.from_rules) werden nur gültige
+    Kombinationen aufgezählt. Für große Projekte: iter_suites bzw. iter_rows.
+    """
+    return concat(list(iter_suites(categories, forbidden)), categories)
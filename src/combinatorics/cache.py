@@ -0,0 +1,68 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from .constraints import Constraints
+
+# Bei Änderungen an der Erzeugung erhöhen – ältere Einträge werden dann nicht mehr getroffen
+_VERSION = 1
+
+
+def cache_dir() -> Optional[str]:
+    """
+    Verzeichnis des Caches: Umgebungsvariable TANOS_CACHE_DIR, sonst ~/.cache/tanos/covering-arrays.
+    Alle Web-Worker und Desktop-Instanzen mit demselben Verzeichnis teilen sich die Einträge.
+    TANOS_CACHE_DIR="" schaltet den Cache ab.
+    """
+    path = os.getenv("TANOS_CACHE_DIR")
+    if path is None:
+        return os.path.join(os.path.expanduser("~"), ".cache", "tanos", "covering-arrays")
+    return path or None
+
+
+def key(radices: Sequence[int], strength: int, groups: Sequence[Tuple[Sequence[int], int]],
+        cons: Optional[Constraints]) -> str:
+    """
+    Inhaltsadresse einer Suite: nur Form (Anzahl Werte je Kategorie), Stärke, Gruppen und
+    verbotene Wertepaare auf Indexebene – keine Namen oder Wertetexte.
+    """
+    spec = {
+        "version": _VERSION,
+        "radices": [int(n) for n in radices],
+        "strength": int(strength),
+        "groups": [[[int(c) for c in cols], int(t)] for cols, t in groups],
+    }
+    digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8"))
+    if cons is not None:
+        digest.update(np.packbits(np.triu(cons.conflict, 1)).tobytes())
+    return digest.hexdigest()
+
+
+def load(k: str) -> Optional[np.ndarray]:
+    """Gespeicherte Suite (Wertindizes) oder None; unlesbare Einträge gelten als nicht vorhanden."""
+    base = cache_dir()
+    if not base:
+        return None
+    try:
+        return np.load(os.path.join(base, f"{k}.npy"), allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+
+
+def store(k: str, suite: np.ndarray) -> None:
+    """Speichert atomar (temporäre Datei + Umbenennen), damit parallele Leser nie halbe Dateien sehen."""
+    base = cache_dir()
+    if not base:
+        return
+    try:
+        os.makedirs(base, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=base, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            np.save(fh, np.ascontiguousarray(suite), allow_pickle=False)
+        os.replace(tmp, os.path.join(base, f"{k}.npy"))
+    except OSError:
+        pass  # Cache ist optional – Schreibfehler (z. B. schreibgeschützt) nicht weiterreichen
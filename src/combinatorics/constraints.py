@@ -0,0 +1,246 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (Kategorie1, Wert1, Kategorie2, Wert2): diese beiden Werte dürfen nicht gemeinsam vorkommen
+ForbiddenPair = Tuple[str, str, str, str]
+
+# Platzhalter für noch nicht festgelegte Werte (wie in orthogonal.py)
+_DONT_CARE = -1
+
+
+def from_rules(
+    categories: Dict[str, List[str]],
+    exclude: Sequence[Tuple[str, str, str, str]] = (),
+    dependency: Sequence[Tuple[str, str, str, str]] = (),
+    combine: Sequence[Tuple[str, str, str, List[str]]] = (),
+) -> List[ForbiddenPair]:
+    """
+    Übersetzt Geschäftsregeln (mit Kategorienamen) in verbotene Wertepaare:
+    - exclude    (A, a, B, b):      A=a und B=b nie gemeinsam
+    - dependency (A, a, B, b):      wenn A=a, dann B=b  -> A=a verboten mit jedem B≠b
+    - combine    (A, a, B, [b..]):  wenn A=a, dann B ∈ [b..] -> A=a verboten mit jedem anderen B
+    Combine-Regeln mit gleichem Auslöser und gleicher Zielkategorie zählen zusammen (Vereinigung der
+    Zielwerte). Liegt ein Zielwert außerhalb der Werte von B, entsteht er erst durch den Fan-out –
+    dann wird nichts verboten, sonst fielen alle Testfälle mit A=a weg.
+    Regeln auf unbekannte Kategorien werden ignoriert.
+    """
+    forbidden: List[ForbiddenPair] = []
+    for a_cat, a_val, b_cat, b_val in exclude:
+        forbidden.append((a_cat, a_val, b_cat, b_val))
+    for a_cat, a_val, b_cat, b_val in dependency:
+        for other in categories.get(b_cat, []):
+            if other != b_val:
+                forbidden.append((a_cat, a_val, b_cat, other))
+    targets_of: Dict[Tuple[str, str, str], List[str]] = {}
+    for a_cat, a_val, b_cat, targets in combine:
+        targets_of.setdefault((a_cat, a_val, b_cat), []).extend(targets)
+    for (a_cat, a_val, b_cat), targets in targets_of.items():
+        values = categories.get(b_cat, [])
+        if not targets or not set(targets) <= set(values):
+            continue
+        for other in values:
+            if other not in targets:
+                forbidden.append((a_cat, a_val, b_cat, other))
+    return forbidden
+
+
+class Constraints:
+    """
+    Verbotene Wertepaare auf Indexebene. Jeder Wert erhält eine flache ID (offsets[c] + Wertindex);
+    `conflict[x, y]` ist True, wenn x und y nicht gemeinsam in einem Testfall vorkommen dürfen.
+    `alive[x]` ist False für Werte, die wegen der Regeln in keinem gültigen Testfall vorkommen können.
+    Testfälle werden als Integer-Arrays übergeben (-1 = offen); Spalten ab len(radices) werden ignoriert.
+    """
+
+    def __init__(self, radices: Sequence[int]):
+        self.radices = list(radices)
+        self.offsets = np.concatenate(([0], np.cumsum(self.radices)[:-1])).astype(np.int64)
+        n = int(sum(self.radices))
+        self.conflict = np.zeros((n, n), dtype=bool)
+        self.alive = np.ones(n, dtype=bool)
+
+    def forbid(self, c1: int, a: int, c2: int, b: int) -> None:
+        if c1 == c2:
+            return  # zwei Werte derselben Kategorie kommen ohnehin nie gemeinsam vor
+        x, y = self.offsets[c1] + a, self.offsets[c2] + b
+        self.conflict[x, y] = self.conflict[y, x] = True
+
+    def block(self, c: int) -> slice:
+        return slice(int(self.offsets[c]), int(self.offsets[c]) + self.radices[c])
+
+    def propagate(self) -> None:
+        """
+        Kantenkonsistenz: ein Wert ist tot, wenn er mit allen lebenden Werten einer anderen
+        Kategorie in Konflikt steht. Wiederholt bis zum Fixpunkt (z. B. für Abhängigkeitsketten).
+        """
+        changed = True
+        while changed:
+            changed = False
+            for c in range(len(self.radices)):
+                blk = self.block(c)
+                hopeless = (self.conflict[:, blk] | ~self.alive[blk]).all(axis=1)
+                hopeless[blk] = False
+                kill = hopeless & self.alive
+                if kill.any():
+                    self.alive[kill] = False
+                    changed = True
+
+    def close_pairs(self) -> np.ndarray:
+        """
+        Pfadkonsistenz: ein erlaubtes Wertepaar ist unerfüllbar, wenn jeder lebende Wert einer dritten
+        Kategorie mit einem der beiden in Konflikt steht. Solche Paare werden als Konflikt ergänzt und
+        erneut propagiert, bis zum Fixpunkt. Liefert die abgeleiteten Paare (symmetrische Matrix).
+        """
+        implied = np.zeros_like(self.conflict)
+        while True:
+            new = np.zeros_like(self.conflict)
+            for c in range(len(self.radices)):
+                blk = self.block(c)
+                # nur Werte mit Konflikt zu einem lebenden Wert von c können ein Paar zu Fall bringen
+                cand = np.flatnonzero((self.conflict[:, blk] & self.alive[blk]).any(axis=1) & self.alive)
+                cand = cand[(cand < blk.start) | (cand >= blk.stop)]
+                if len(cand) < 2:
+                    continue
+                ok = (~self.conflict[np.ix_(cand, np.arange(blk.start, blk.stop))] & self.alive[blk]).astype(np.int32)
+                new[np.ix_(cand, cand)] |= (ok @ ok.T) == 0
+            new &= ~self.conflict & self.alive[:, None] & self.alive[None, :]
+            for c in range(len(self.radices)):
+                new[self.block(c), self.block(c)] = False
+            if not new.any():
+                return implied
+            implied |= new
+            self.conflict |= new
+            self.propagate()
+
+    def closed(self) -> "Constraints":
+        """
+        Kopie mit abgeschlossenen Paaren (close_pairs): `conflict` enthält dann auch die Wertepaare,
+        die kein gültiger Testfall abdecken kann – Grundlage für die Zahl der abdeckbaren Tupel.
+        """
+        copy = Constraints(self.radices)
+        copy.conflict = self.conflict.copy()
+        copy.alive = self.alive.copy()
+        copy.close_pairs()
+        return copy
+
+    def coverable(self, cols: Sequence[int], vals: np.ndarray) -> np.ndarray:
+        """
+        Maske über die Wertetupel der Kategorien `cols` (Zeilen von `vals`, Wertindizes): False, wenn
+        ein Wert tot ist, zwei Werte in Konflikt stehen oder eine weitere Kategorie keinen lebenden
+        Wert mehr hat, der zu allen passt. Gedacht für closed(): dann für Paare genau, für größere
+        Tupel eine Näherung – dort kann vereinzelt ein nie abdeckbares Tupel mitzählen.
+        """
+        ids = self.offsets[list(cols)] + np.asarray(vals, dtype=np.int64).reshape(-1, len(cols))
+        ok = self.alive[ids].all(axis=1)
+        for i in range(len(cols)):
+            for j in range(i + 1, len(cols)):
+                ok &= ~self.conflict[ids[:, i], ids[:, j]]
+        if not (np.add.reduceat(self.alive, self.offsets) > 0).all():
+            return np.zeros(len(ids), dtype=bool)  # eine Kategorie ohne lebenden Wert: kein gültiger Testfall
+        # Nach closed() sind Einzelwerte und Paare erledigt: eine weitere Kategorie kann ein Tupel nur
+        # noch zu Fall bringen, wenn mindestens drei seiner Kategorien sie einschränken
+        hits = np.zeros(len(self.radices), dtype=np.int64)
+        for c in cols:
+            hits += np.logical_or.reduceat(self.conflict[self.block(c)].any(axis=0), self.offsets)
+        touched = hits >= min(len(cols), 3)
+        touched[list(cols)] = False
+        others = np.flatnonzero(touched)
+        if len(others) and len(ids):
+            sizes = np.array(self.radices)[others]
+            value_ids = np.concatenate([np.arange(self.offsets[c], self.offsets[c] + r) for c, r in zip(others, sizes)])
+            fits = np.repeat(self.alive[None, value_ids], len(ids), axis=0)
+            for i in range(len(cols)):
+                fits &= ~self.conflict[ids[:, i]][:, value_ids]
+            starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+            ok &= np.logical_or.reduceat(fits, starts, axis=1).all(axis=1)
+        return ok
+
+    def possible(self, cols: Sequence[int], vals: np.ndarray) -> np.ndarray:
+        """Wie coverable, aber genau: je Tupel eine Suche nach einem gültigen Testfall (complete)."""
+        out = np.zeros(len(vals), dtype=bool)
+        for i, tup in enumerate(np.asarray(vals, dtype=np.int64).reshape(-1, len(cols))):
+            row = np.full(len(self.radices), _DONT_CARE, dtype=np.int64)
+            row[list(cols)] = tup
+            out[i] = self.complete(row)
+        return out
+
+    def ids(self, row: np.ndarray) -> np.ndarray:
+        """Flache IDs der festgelegten Werte eines Testfalls."""
+        vals = np.asarray(row[: len(self.radices)])
+        cols = np.flatnonzero(vals != _DONT_CARE)
+        return self.offsets[cols] + vals[cols]
+
+    def compatible(self, row: np.ndarray, c: int) -> np.ndarray:
+        """Maske der Werte von Kategorie c, die zu allen festgelegten Werten des Testfalls passen."""
+        blk = self.block(c)
+        return self.alive[blk] & ~self.conflict[self.ids(row), blk].any(axis=0)
+
+    def complete(self, row: np.ndarray, budget: int = 10000) -> bool:
+        """
+        Füllt offene Spalten des Testfalls (in-place) mit passenden Werten – Tiefensuche mit
+        Vorwärtsprüfung, kleinste Wertindizes zuerst. False (Testfall unverändert), wenn keine
+        gültige Belegung gefunden wurde.
+        """
+        k = len(self.radices)
+        ids = self.ids(row)
+        if not self.alive[ids].all() or self.conflict[np.ix_(ids, ids)].any():
+            return False
+        open_cols = [c for c in range(k) if row[c] == _DONT_CARE]
+        allowed = self.alive & ~self.conflict[ids].any(axis=0)
+        steps = [0]
+
+        def search(allowed: np.ndarray, todo: List[int]) -> bool:
+            if not todo:
+                return True
+            steps[0] += 1
+            if steps[0] > budget:
+                return False
+            counts = np.add.reduceat(allowed, self.offsets)[todo]
+            if counts.min() == 0:
+                return False
+            c = todo[int(counts.argmin())]  # Spalte mit den wenigsten passenden Werten zuerst
+            rest = [cc for cc in todo if cc != c]
+            for a in np.flatnonzero(allowed[self.block(c)]):
+                if search(allowed & ~self.conflict[self.offsets[c] + a], rest):
+                    row[c] = a
+                    return True
+            return False
+
+        return search(allowed, open_cols)
+
+    def completable(self, row: np.ndarray, cols: Sequence[int] = (), vals: Sequence[int] = ()) -> bool:
+        """True, wenn der Testfall mit den zusätzlichen Werten noch gültig vervollständigt werden kann."""
+        trial = np.array(row[: len(self.radices)])
+        k = len(self.radices)
+        for c, a in zip(cols, vals):
+            if c < k:
+                trial[c] = a
+        return self.complete(trial)
+
+
+def build(categories: Dict[str, List[str]], forbidden: Optional[Sequence[ForbiddenPair]]) -> Optional[Constraints]:
+    """
+    Baut aus verbotenen Wertepaaren (Namen) die Indexdarstellung für die Generatoren.
+    Liefert None, wenn keine (auflösbaren) Paare vorliegen – die Generatoren laufen dann ungebremst.
+    """
+    if not forbidden:
+        return None
+    keys = list(categories.keys())
+    col_of = {k: c for c, k in enumerate(keys)}
+    idx_of = [{v: i for i, v in enumerate(categories[k])} for k in keys]
+    cons = Constraints([len(categories[k]) for k in keys])
+    used = False
+    for a_cat, a_val, b_cat, b_val in forbidden:
+        c1, c2 = col_of.get(a_cat), col_of.get(b_cat)
+        if c1 is None or c2 is None:
+            continue
+        a, b = idx_of[c1].get(a_val), idx_of[c2].get(b_val)
+        if a is None or b is None:
+            continue
+        cons.forbid(c1, a, c2, b)
+        used = True
+    if not used:
+        return None
+    cons.propagate()
+    return cons
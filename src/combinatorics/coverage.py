@@ -0,0 +1,222 @@
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import constraints as _constraints
+from .constraints import Constraints, ForbiddenPair
+from .suite import Suite
+
+# Platzhalter für Werte, die es (nicht mehr) in den Kategorien gibt
+_MISSING = -1
+# Tupel-Codes je Block bei der Zählung (begrenzt den Speicher für große Generationen)
+_BLOCK_CODES = 2_000_000
+# Obergrenze für die Bitfelder aller Paare und t-Tupel (Einträge); darüber lehnt Tracker ab
+_MAX_TUPLES = 50_000_000
+# fehlen höchstens so viele Tupel, wird jedes einzeln geprüft, ob es überhaupt abdeckbar ist
+_CONFIRM_MISSING = 256
+
+
+def encode(categories: Dict[str, List[str]], cases: Iterable[Dict[str, str]]) -> np.ndarray:
+    """Testfälle -> Integer-Matrix (Testfälle × Kategorien) mit Wertindizes, -1 = unbekannter Wert."""
+    if isinstance(cases, Suite):
+        return cases.project(categories)
+    keys = list(categories.keys())
+    idx_of = [{v: i for i, v in enumerate(categories[k])} for k in keys]
+    rows = [[idx_of[c].get(case.get(k), _MISSING) for c, k in enumerate(keys)] for case in cases]
+    return np.array(rows, dtype=np.int64).reshape(len(rows), len(keys))
+
+
+def _tuple_count(radices: Sequence[int], strength: int) -> int:
+    """Anzahl aller t-Tupel über alle t-Teilmengen der Kategorien, ohne sie aufzuzählen."""
+    counts = [1] + [0] * strength  # counts[j] = Tupel über j der bisherigen Kategorien
+    for r in radices:
+        for j in range(strength, 0, -1):
+            counts[j] += counts[j - 1] * r
+    return counts[strength]
+
+
+def _valid(cons: Optional[Constraints], radices: Sequence[int], cols: Sequence[int]) -> np.ndarray:
+    """Gültige Tupel der Kategorien `cols` (Mixed-Radix, letzte Kategorie läuft am schnellsten)."""
+    n = int(np.prod([radices[c] for c in cols]))
+    if cons is None:
+        return np.ones(n, dtype=bool)
+    vals = np.stack(np.unravel_index(np.arange(n), [radices[c] for c in cols]), axis=1)
+    return cons.coverable(cols, vals)
+
+
+def _valid_sets(cons: Optional[Constraints], radices: Sequence[int], subsets: List[Tuple[int, ...]],
+                hits: "_Hits") -> List[np.ndarray]:
+    """
+    _valid je Teilmenge. _valid ist eine Näherung; fehlen insgesamt nur wenige Tupel (fast
+    vollständige Suite), werden sie einzeln genau geprüft und nie abdeckbare herausgenommen –
+    eine vollständige Suite erreicht so auch 100 %.
+    """
+    valid = [_valid(cons, radices, cols) for cols in subsets]
+    if cons is None:
+        return valid
+    missing = [np.flatnonzero(v & ~hits.covered[start: start + len(v)]) for v, start in zip(valid, hits.offsets)]
+    if sum(len(m) for m in missing) > _CONFIRM_MISSING:
+        return valid
+    for v, m, cols in zip(valid, missing, subsets):
+        if len(m):
+            v[m] = cons.possible(cols, np.stack(np.unravel_index(m, [radices[c] for c in cols]), axis=1))
+    return valid
+
+
+class _Hits:
+    """
+    Abgedeckte Tupel aller `subsets` (gleich viele Kategorien je Teilmenge) in einem flachen Bitfeld:
+    Mixed-Radix-Code je Teilmenge plus deren Offset, markiert per Fancy-Indexing. add() schreibt das
+    Bitfeld blockweise fort, damit die Code-Matrix klein bleibt; vollständig abgedeckte Teilmengen
+    fallen nach jedem Block heraus.
+    """
+
+    def __init__(self, radices: Sequence[int], subsets: List[Tuple[int, ...]]):
+        radices_arr = np.array(radices, dtype=np.int64)
+        self.members = np.array(subsets, dtype=np.int64).reshape(len(subsets), -1)
+        self.sizes = np.prod(radices_arr[self.members], axis=1)
+        self.offsets = np.concatenate(([0], np.cumsum(self.sizes)[:-1])).astype(np.int64)
+        self.mults = np.ones_like(self.members)
+        for m in range(self.members.shape[1] - 2, -1, -1):
+            self.mults[:, m] = self.mults[:, m + 1] * radices_arr[self.members[:, m + 1]]
+        self.total = int(self.sizes.sum())
+        self.seen = np.zeros(self.total + 1, dtype=bool)  # letzter Eintrag sammelt Tupel mit fehlendem Wert
+        self.dtype = np.int32 if self.total < 2 ** 31 else np.int64
+        self.active = np.arange(len(subsets))  # Teilmengen, in denen noch Tupel fehlen
+
+    @property
+    def covered(self) -> np.ndarray:
+        return self.seen[:self.total]
+
+    def add(self, rows: np.ndarray) -> None:
+        dtype, active = self.dtype, self.active
+        rows = rows.astype(dtype, copy=False)
+        lo = 0
+        while lo < len(rows) and len(active):
+            step = max(1, _BLOCK_CODES // len(active))
+            block = rows[lo:lo + step]
+            lo += step
+            codes = np.broadcast_to(self.offsets[active].astype(dtype), (len(block), len(active))).copy()
+            missing = np.zeros(codes.shape, dtype=bool)
+            for m in range(self.members.shape[1]):  # je Position der Teilmenge: (Testfälle × Teilmengen)
+                vals = block[:, self.members[active, m]]
+                codes += vals * self.mults[active, m].astype(dtype)
+                missing |= vals == _MISSING
+            codes[missing] = self.total
+            self.seen[codes.ravel()] = True
+            # vollständig abgedeckte Teilmengen nicht weiter zählen
+            done = np.add.reduceat(self.covered, self.offsets)[active] == self.sizes[active]
+            active = active[~done]
+        self.active = active
+
+
+def _ratio(covered: int, total: int) -> Dict[str, float]:
+    return {"covered": covered, "total": total, "ratio": round(covered / total, 4) if total else 1.0}
+
+
+class Tracker:
+    """
+    Abdeckung einer Suite, die blockweise entsteht (Generierung, Laden aus der Datenbank): add()
+    schreibt die Bitfelder je Block fort, report() liefert dasselbe wie analyze – ohne alle
+    Testfälle im Speicher zu halten.
+    """
+
+    def __init__(
+        self,
+        categories: Dict[str, List[str]],
+        strength: int = 2,
+        forbidden: Optional[Sequence[ForbiddenPair]] = None,
+    ):
+        self.categories = categories
+        self.keys = list(categories.keys())
+        k = len(self.keys)
+        self.radices = [len(categories[key]) for key in self.keys]
+        self.strength = max(1, min(strength, k))
+        size = _tuple_count(self.radices, 2) + (_tuple_count(self.radices, self.strength) if self.strength != 2 else 0)
+        if size > _MAX_TUPLES:
+            raise ValueError(f"too many value tuples for strength {self.strength}: {size}")
+        cons = _constraints.build(categories, forbidden) if k and all(self.radices) else None
+        self.cons = cons.closed() if cons is not None else None  # nur abdeckbare Tupel zählen
+        self.pairs = list(combinations(range(k), 2))
+        self.subsets = list(combinations(range(k), self.strength)) if self.strength != 2 else []
+        self._pair_hits = _Hits(self.radices, self.pairs) if self.pairs else None
+        self._hits = _Hits(self.radices, self.subsets) if self.subsets else None
+        self.testcases = 0
+
+    def add(self, rows: Sequence[Sequence[int]]) -> None:
+        """Weitere Testfälle (Wertindizes, z. B. aus encode bzw. Suite.project)."""
+        rows = np.asarray(rows, dtype=np.int64).reshape(len(rows), len(self.keys))
+        self.testcases += len(rows)
+        for hits in (self._pair_hits, self._hits):
+            if hits is not None:
+                hits.add(rows)
+
+    def report(self, max_uncovered: int = 100) -> Dict:
+        """Kennzahlen wie analyze für alle bisher hinzugefügten Testfälle."""
+        keys, radices, categories, cons = self.keys, self.radices, self.categories, self.cons
+        k = len(keys)
+        matrix: List[List[Optional[float]]] = [[None] * k for _ in range(k)]
+        uncovered: List[List[str]] = []
+        uncovered_count = covered_pairs = total_pairs = 0
+        pair_valid = _valid_sets(cons, radices, self.pairs, self._pair_hits) if self.pairs else []
+        for p, (c, d) in enumerate(self.pairs):
+            valid = pair_valid[p]
+            start = self._pair_hits.offsets[p]
+            hit = self._pair_hits.covered[start: start + len(valid)] & valid
+            covered_pairs += int(hit.sum())
+            total_pairs += int(valid.sum())
+            matrix[c][d] = matrix[d][c] = _ratio(int(hit.sum()), int(valid.sum()))["ratio"]
+            missing = np.flatnonzero(valid & ~hit)
+            uncovered_count += len(missing)
+            for code in missing[: max(0, max_uncovered - len(uncovered))]:
+                a, b = divmod(int(code), radices[d])
+                uncovered.append([keys[c], categories[keys[c]][a], keys[d], categories[keys[d]][b]])
+
+        if self.strength == 2:
+            tuples = _ratio(covered_pairs, total_pairs)
+        else:
+            covered_t = total_t = 0
+            for i, valid in enumerate(_valid_sets(cons, radices, self.subsets, self._hits)):
+                start = self._hits.offsets[i]
+                covered_t += int((self._hits.covered[start: start + len(valid)] & valid).sum())
+                total_t += int(valid.sum())
+            tuples = _ratio(covered_t, total_t)
+        return {
+            "testcases": self.testcases,
+            "strength": self.strength,
+            "pairs": _ratio(covered_pairs, total_pairs),
+            "tuples": tuples,
+            "categories": keys,
+            "pair_matrix": matrix,
+            "uncovered": uncovered,
+            "uncovered_count": uncovered_count,
+        }
+
+
+def analyze(
+    categories: Dict[str, List[str]],
+    rows: Sequence[Sequence[int]],
+    strength: int = 2,
+    forbidden: Optional[Sequence[ForbiddenPair]] = None,
+    max_uncovered: int = 100,
+) -> Dict:
+    """
+    Abdeckungsanalyse einer Suite (`rows` = Wertindizes je Testfall, z. B. aus encode) gegen alle
+    gültigen Tupel (ohne verbotenes Paar):
+    - pairs:       abgedeckte/gültige Wertepaare und Quote
+    - tuples:      dasselbe für t-Tupel (`strength`; für t=2 identisch mit pairs)
+    - pair_matrix: Quote je Kategoriepaar (k × k, Diagonale None)
+    - uncovered:   die ersten `max_uncovered` fehlenden Paare [Kategorie1, Wert1, Kategorie2, Wert2],
+                   uncovered_count = Anzahl insgesamt
+    Gezählt wird vektorisiert über alle Kategoriepaare bzw. t-Teilmengen (Integer-Codes); für
+    blockweise entstehende Suiten siehe Tracker.
+    """
+    tracker = Tracker(categories, strength, forbidden)
+    tracker.add(rows)
+    return tracker.report(max_uncovered)
+
+
+def summary(report: Dict) -> Dict:
+    """Kurzfassung für Generation.coverage_meta: Quoten und Anzahl fehlender Paare."""
+    return {key: report[key] for key in ("testcases", "strength", "pairs", "tuples", "uncovered_count")}
@@ -1,14 +1,54 @@
-def generate(categories: dict) -> list[dict]:
-    """Each Choice nach ISTQB v4: jeder Wert jeder Kategorie mindestens einmal."""
+from typing import List, Optional
+
+import numpy as np
+
+from . import constraints as _constraints
+from .constraints import ForbiddenPair
+from .suite import Suite
+
+_DONT_CARE = -1
+
+
+def generate(categories: dict, forbidden: Optional[List[ForbiddenPair]] = None) -> Suite:
+    """
+    Each Choice nach ISTQB v4: jeder Wert jeder Kategorie mindestens einmal.
+    Mit `forbidden` (verbotene Wertepaare, siehe constraints.from_rules) enthält kein Testfall ein
+    verbotenes Paar; Werte, die nach den Regeln nie gültig sind, entfallen.
+    """
     if not categories:
-        return []
+        return Suite({})
     keys = list(categories.keys())
     max_len = max(len(v) for v in categories.values())
-    testcases = []
+    cons = _constraints.build(categories, forbidden)
+    radices = [len(categories[k]) for k in keys]
+    if cons is None:
+        return Suite(categories, [[i % n for n in radices] for i in range(max_len)])
+
+    unused = [set(range(n)) for n in radices]
+    rows: List[np.ndarray] = []
+
+    def add_row(row: np.ndarray, preferred: List[int]) -> None:
+        # je Kategorie: bevorzugter Wert, dann noch ungenutzte, dann beliebige – solange vervollständigbar
+        for c, n in enumerate(radices):
+            if row[c] != _DONT_CARE:
+                continue
+            for a in [preferred[c]] + sorted(unused[c]) + list(range(n)):
+                if cons.completable(row, [c], [a]):
+                    row[c] = a
+                    break
+        if cons.complete(row):
+            rows.append(row)
+            for c, a in enumerate(row):
+                unused[c].discard(int(a))
+
     for i in range(max_len):
-        tc = {}
-        for k in keys:
-            vals = categories[k]
-            tc[k] = vals[i % len(vals)]
-        testcases.append(tc)
-    return testcases
+        add_row(np.full(len(radices), _DONT_CARE), [i % n for n in radices])
+    # Werte, die noch fehlen, in eigenen Testfällen nachziehen
+    for c, n in enumerate(radices):
+        for a in sorted(unused[c]):
+            if a in unused[c] and cons.completable(np.full(len(radices), _DONT_CARE), [c], [a]):
+                row = np.full(len(radices), _DONT_CARE)
+                row[c] = a
+                add_row(row, [0] * len(radices))
+
+    return Suite(categories, rows)
@@ -0,0 +1,125 @@
+import math
+from collections import defaultdict
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from . import constraints as _constraints
+from .constraints import Constraints, ForbiddenPair
+
+# Empirischer Faktor für die erwartete IPOG-Größe (gemessen an gleichförmigen Projekten, t=2/3):
+# Größe ≈ Untergrenze · (1 + 0.6 · (t-1) · ln(k/t))
+_GROWTH = 0.6
+
+
+def product_size(categories: Dict[str, List[str]]) -> int:
+    """Exakte Größe des Kreuzprodukts (Python-int, kein Überlauf)."""
+    if not categories:
+        return 0
+    return math.prod(len(v) for v in categories.values())
+
+
+def _neighbours(cons: Constraints) -> List[set]:
+    """Kategorien, die über mindestens ein verbotenes Paar verbunden sind."""
+    k = len(cons.radices)
+    adj: List[set] = [set() for _ in range(k)]
+    for c, d in combinations(range(k), 2):
+        if cons.conflict[cons.block(c), cons.block(d)].any():
+            adj[c].add(d)
+            adj[d].add(c)
+    return adj
+
+
+def _elimination_order(adj: List[set]) -> List[int]:
+    """Breitensuche je Zusammenhangskomponente – hält die Front der Zähl-DP klein."""
+    order: List[int] = []
+    seen = set()
+    for start in sorted(range(len(adj)), key=lambda c: -len(adj[c])):
+        if start in seen:
+            continue
+        queue = [start]
+        seen.add(start)
+        while queue:
+            c = queue.pop(0)
+            order.append(c)
+            for d in sorted(adj[c] - seen):
+                seen.add(d)
+                queue.append(d)
+    return order
+
+
+def _count(cons: Constraints) -> int:
+    """
+    Zählt gültige Testfälle ohne sie aufzuzählen: dynamische Programmierung über die Kategorien.
+    Zustand = Werte der bereits belegten Kategorien, die noch mit einer offenen Kategorie
+    verbunden sind; Kategorien ohne Regeln tragen nur ihren Faktor bei.
+    """
+    adj = _neighbours(cons)
+    order = _elimination_order(adj)
+    states: Dict[tuple, int] = {(): 1}
+    frontier: List[int] = []
+    for pos, c in enumerate(order):
+        blk = cons.block(c)
+        grown: Dict[tuple, int] = defaultdict(int)
+        for state, cnt in states.items():
+            ids = cons.offsets[frontier] + np.array(state, dtype=np.int64)
+            allowed = cons.alive[blk] & ~cons.conflict[ids, blk].any(axis=0)
+            for a in np.flatnonzero(allowed):
+                grown[state + (int(a),)] += cnt
+        frontier = frontier + [c]
+        remaining = set(order[pos + 1:])
+        keep = [i for i, f in enumerate(frontier) if adj[f] & remaining]
+        states = defaultdict(int)
+        for state, cnt in grown.items():
+            states[tuple(state[i] for i in keep)] += cnt
+        frontier = [frontier[i] for i in keep]
+    return sum(states.values())
+
+
+def count_valid(categories: Dict[str, List[str]], forbidden: Optional[Sequence[ForbiddenPair]] = None) -> int:
+    """Anzahl der Kombinationen ohne verbotenes Wertepaar (= Ergebnisgröße von „all“ mit Regeln)."""
+    if not categories or any(len(v) == 0 for v in categories.values()):
+        return 0
+    cons = _constraints.build(categories, forbidden)
+    if cons is None:
+        return product_size(categories)
+    return _count(cons)
+
+
+def summarize(
+    categories: Dict[str, List[str]],
+    forbidden: Optional[Sequence[ForbiddenPair]] = None,
+    strength: int = 2,
+) -> Dict[str, int]:
+    """
+    Größenschätzung ohne Generierung:
+    - product:     Größe des Kreuzprodukts
+    - valid:       gültige Kombinationen nach den Regeln (gezählt, nicht aufgelistet)
+    - lower_bound: Mindestgröße einer t-Wege-Suite (Standard: pairwise). Jeder Testfall deckt je
+                   t Kategorien genau ein Tupel ab – für t=2 zählen die erlaubten Paare exakt,
+                   für t>2 die gültigen Werte je Kategorie.
+    - expected:    empirische Schätzung der IPOG-Größe, nie größer als `valid`
+    """
+    if not categories or any(len(v) == 0 for v in categories.values()):
+        return {"product": 0, "valid": 0, "lower_bound": 0, "expected": 0}
+    k = len(categories)
+    t = max(1, min(strength, k))
+    product = product_size(categories)
+    cons = _constraints.build(categories, forbidden)
+    if cons is None:
+        valid = product
+        sizes = [len(v) for v in categories.values()]
+    else:
+        valid = _count(cons)
+        sizes = [int(cons.alive[cons.block(c)].sum()) for c in range(k)]
+    lower = math.prod(sorted(sizes, reverse=True)[:t])
+    if cons is not None and t == 2:
+        lower = 0
+        for c, d in combinations(range(k), 2):
+            blk_c, blk_d = cons.block(c), cons.block(d)
+            ok = ~cons.conflict[blk_c, blk_d] & cons.alive[blk_c][:, None] & cons.alive[blk_d][None, :]
+            lower = max(lower, int(ok.sum()))
+    lower = min(lower, valid)
+    growth = 1 + _GROWTH * (t - 1) * math.log(k / t) if k > t else 1
+    return {"product": product, "valid": valid, "lower_bound": lower, "expected": min(valid, math.ceil(lower * growth))}
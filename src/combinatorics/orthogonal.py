@@ -1,70 +1,847 @@
-from itertools import product
-from typing import Dict, List, Tuple, Set
+import heapq
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, islice, product
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
-def _all_pairs(categories: Dict[str, List[str]]) -> Set[Tuple[str, str, str]]:
+import numpy as np
+
+from . import cache as _cache
+from . import constraints as _constraints
+from . import orthogonal_arrays, prioritized
+from .constraints import Constraints, ForbiddenPair
+from .suite import Suite
+
+# Platzhalter für noch nicht festgelegte Werte ("don't care") während IPOG
+_DONT_CARE = -1
+# Testfälle je Bewertungsblock und Prozess
+_BLOCK_ROWS = 256
+# Unterhalb dieser Blockgröße (Testfälle × Teilmengen) lohnt sich der Prozess-Pool nicht
+_MIN_PARALLEL_WORK = 200_000
+# Erzeugungen, die schneller sind, werden nicht im Datei-Cache abgelegt
+_MIN_CACHE_SECONDS = 0.05
+# fehlen höchstens so viele Tupel, wird jedes einzeln geprüft, ob es überhaupt abdeckbar ist
+_CONFIRM_MISSING = 256
+
+
+def _index(categories: Dict[str, List[str]]) -> Tuple[List[str], List[int]]:
+    """Bildet die Kategorien einmalig auf dichte Integer-IDs ab: (Schlüssel, Anzahl Werte je Kategorie)."""
     keys = list(categories.keys())
-    universe: Set[Tuple[str, str, str]] = set()
-    for i, k1 in enumerate(keys):
-        for j, k2 in enumerate(keys):
-            if i >= j:
-                continue
-            for a in categories[k1]:
-                for b in categories[k2]:
-                    universe.add((k1, k2, a, b))
-    return universe
-
-def _pairs_covered_by_assignment(assignment: Dict[str, str]) -> Set[Tuple[str, str, str]]:
-    keys = list(assignment.keys())
-    covered=set()
-    for i, k1 in enumerate(keys):
-        for j, k2 in enumerate(keys):
-            if i >= j:
-                continue
-            covered.add((k1, k2, assignment[k1], assignment[k2]))
-    return covered
+    return keys, [len(categories[k]) for k in keys]
 
-def generate(categories: Dict[str, List[str]]) -> List[Dict[str, str]]:
+
+def _parameter_order(radices: List[int]) -> List[int]:
     """
-    Pairwise/Orthogonal-ähnliche Erzeugung über eine einfache Greedy-Heuristik.
-    Deckt alle 2er-Kombinationen zwischen Kategorien ab.
+    Reihenfolge, in der IPOG die Kategorien aufnimmt:
+    absteigend nach Anzahl der Werte (stabil), das ergibt kleinere Suiten.
     """
-    if not categories or any(len(v)==0 for v in categories.values()):
-        return []
-    keys = list(categories.keys())
-    if len(keys) == 1:
-        return [{keys[0]: v} for v in categories[keys[0]]]
-
-    universe = _all_pairs(categories)
-    suite: List[Dict[str, str]] = []
-
-    seed = {k: categories[k][0] for k in keys}
-    suite.append(seed)
-    covered = _pairs_covered_by_assignment(seed)
-
-    all_assignments = list(product(*[categories[k] for k in keys]))
-    assignment_dicts: List[Dict[str, str]] = [{k: v for k, v in zip(keys, assg)} for assg in all_assignments]
-    assignment_dicts = [a for a in assignment_dicts if a != seed]
-
-    while covered != universe and assignment_dicts:
-        best = None
-        best_gain = -1
-        for a in assignment_dicts:
-            gain = len(_pairs_covered_by_assignment(a) - covered)
-            if gain > best_gain:
-                best_gain = gain
-                best = a
-        if best is None or best_gain == 0:
-            break
-        suite.append(best)
-        covered |= _pairs_covered_by_assignment(best)
-        assignment_dicts.remove(best)
-
-    if covered != universe:
-        for a in assignment_dicts:
-            if covered == universe:
-                break
-            new_pairs = _pairs_covered_by_assignment(a) - covered
-            if new_pairs:
-                suite.append(a)
-                covered |= new_pairs
+    return sorted(range(len(radices)), key=lambda c: -radices[c])
+
+
+class _Rows:
+    """
+    Wachsende Integer-Matrix (Testfälle × Kategorien), -1 = noch offen.
+    Die zusätzliche letzte Spalte ist eine Pseudo-Kategorie mit genau einem Wert (immer 0).
+    """
+
+    def __init__(self, width: int, capacity: int = 64):
+        self.data = self._empty(capacity, width)
+        self.count = 0
+
+    @staticmethod
+    def _empty(capacity: int, width: int) -> np.ndarray:
+        data = np.full((capacity, width + 1), _DONT_CARE, dtype=np.int32)
+        data[:, -1] = 0
+        return data
+
+    def append(self) -> int:
+        if self.count == len(self.data):
+            grown = self._empty(2 * len(self.data), self.data.shape[1] - 1)
+            grown[: self.count] = self.data
+            self.data = grown
+        self.count += 1
+        return self.count - 1
+
+    @property
+    def view(self) -> np.ndarray:
+        return self.data[: self.count]
+
+
+def _interactions(order: List[int], pos: int, radices: List[int], strength: int,
+                  groups: Sequence[Tuple[Sequence[int], int]] = ()):
+    """
+    Alle Teilmengen der bereits aufgenommenen Kategorien, die mit `order[pos]` ein abzudeckendes
+    Tupel bilden: (t-1)-Teilmengen für die Grundstärke, dazu (t_g-1)-Teilmengen innerhalb jeder
+    Gruppe mit eigener Stärke t_g. Kürzere Teilmengen werden mit der Pseudo-Kategorie
+    `len(radices)` (genau ein Wert) aufgefüllt.
+    Liefert (members, mults, offsets, size): Mitglieder je Teilmenge, Mixed-Radix-Multiplikatoren,
+    Startoffset jeder Teilmenge im flachen Abdeckungsarray und dessen Gesamtlänge.
+    """
+    prefix, ck = order[:pos], order[pos]
+    subsets = dict.fromkeys(combinations(prefix, strength - 1))
+    for cols, t in groups:
+        if t > strength and ck in cols:
+            subsets.update(dict.fromkeys(combinations([c for c in prefix if c in cols], t - 1)))
+    pad = len(radices)
+    width = max(len(sub) for sub in subsets)
+    members = np.array([sub + (pad,) * (width - len(sub)) for sub in subsets], dtype=np.int64)
+    members = members.reshape(len(subsets), width)
+    radices_ext = list(radices) + [1]
+    mults = np.ones_like(members)
+    for m in range(width - 2, -1, -1):
+        mults[:, m] = mults[:, m + 1] * np.take(radices_ext, members[:, m + 1])
+    sizes = np.prod(np.take(radices_ext, members), axis=1).astype(np.int64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+    return members, mults, offsets, int(sizes.sum())
+
+
+def _invalid_slots(members: np.ndarray, mults: np.ndarray, offsets: np.ndarray, size: int,
+                   radices: List[int], ck: int, cons: Constraints) -> np.ndarray:
+    """Maske (size × n_k) der Tupel, die wegen verbotener Paare nie vorkommen dürfen."""
+    radices_ext = np.array(list(radices) + [1])
+    k = len(radices)
+    bad = np.zeros((size, radices[ck]), dtype=bool)
+    ck_ids = cons.offsets[ck] + np.arange(radices[ck])
+    bad |= ~cons.alive[ck_ids][None, :]
+    for s in range(len(members)):
+        cols = members[s]
+        n = int(np.prod(radices_ext[cols]))
+        vals = np.arange(n)[:, None] // mults[s] % radices_ext[cols]  # alle Wertkombinationen von S
+        real = cols < k
+        ids = cons.offsets[cols[real]] + vals[:, real]  # (n × |S|)
+        rows = slice(int(offsets[s]), int(offsets[s]) + n)
+        bad[rows] |= ~cons.alive[ids].all(axis=1)[:, None]
+        bad[rows] |= cons.conflict[ids][:, :, ck_ids].any(axis=1)
+        for i in range(ids.shape[1]):
+            for j in range(i + 1, ids.shape[1]):
+                bad[rows] |= cons.conflict[ids[:, i], ids[:, j]][:, None]
+    return bad
+
+
+def _score_rows(data: np.ndarray, members: np.ndarray, mults: np.ndarray, offsets: np.ndarray,
+                uncovered: np.ndarray, out_idx: np.ndarray, out_gains: np.ndarray) -> None:
+    """
+    Bewertet die Testfälle in `data`: out_idx[r, s] = Zeile in `uncovered` für Teilmenge s
+    (-1, solange dort ein Wert offen ist), out_gains[r, v] = Anzahl offener Tupel mit Wert v.
+    """
+    vals = data[:, members]  # (Testfälle × Teilmengen × Breite)
+    valid = (vals != _DONT_CARE).all(axis=2)
+    idx = offsets + (vals.astype(np.int64) * mults).sum(axis=2)
+    idx[~valid] = -1
+    out_idx[:] = idx
+    out_gains[:] = (uncovered[np.maximum(idx, 0)] & valid[:, :, None]).sum(axis=1)
+
+
+def _attach(spec):
+    """Öffnet ein Shared-Memory-Segment des Hauptprozesses in einem Worker (Freigabe: _Scorer)."""
+    name, shape, dtype = spec
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _score_shared(specs, lo: int, hi: int) -> None:
+    """Worker: bewertet die Testfälle lo..hi-1; alle Arrays liegen im Shared Memory."""
+    handles, arrays = zip(*[_attach(spec) for spec in specs])
+    data, members, mults, offsets, uncovered, out_idx, out_gains = arrays
+    _score_rows(data[lo:hi], members, mults, offsets, uncovered, out_idx[lo:hi], out_gains[lo:hi])
+    del data, members, mults, offsets, uncovered, out_idx, out_gains, arrays
+    for shm in handles:
+        shm.close()
+
+
+class _Scorer:
+    """
+    Bewertung der Kandidatenwerte für die horizontale Erweiterung, blockweise:
+    seriell im Prozess (workers=1) oder verteilt auf einen Prozess-Pool. Abdeckungsstand und
+    Testfälle liegen dann im Shared Memory, jeder Worker bewertet einen Teil des Blocks.
+    Das Ergebnis ist in beiden Fällen identisch.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+        self.block = _BLOCK_ROWS * self.workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._segments: List[SharedMemory] = []
+
+    def __enter__(self) -> "_Scorer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+        self._release()
+
+    def _share(self, array: np.ndarray):
+        shm = SharedMemory(create=True, size=max(1, array.nbytes))
+        self._segments.append(shm)
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+        view[...] = array
+        return view, (shm.name, array.shape, array.dtype.str)
+
+    def _release(self) -> None:
+        for shm in self._segments:
+            shm.close()
+            shm.unlink()
+        self._segments = []
+
+    def score(self, data: np.ndarray, members: np.ndarray, mults: np.ndarray, offsets: np.ndarray,
+              uncovered: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(Adressen, Gewinne) für alle Testfälle in `data` gegen den aktuellen Abdeckungsstand."""
+        out_idx = np.empty((len(data), len(members)), dtype=np.int64)
+        out_gains = np.empty((len(data), uncovered.shape[1]), dtype=np.int64)
+        if self.workers == 1 or len(data) * len(members) < _MIN_PARALLEL_WORK:
+            _score_rows(data, members, mults, offsets, uncovered, out_idx, out_gains)
+            return out_idx, out_gains
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            shared = [self._share(a) for a in (data, members, mults, offsets, uncovered, out_idx, out_gains)]
+            specs = [spec for _, spec in shared]
+            step = -(-len(data) // self.workers)
+            jobs = [self._pool.submit(_score_shared, specs, lo, min(len(data), lo + step))
+                    for lo in range(0, len(data), step)]
+            for job in jobs:
+                job.result()
+            out_idx[:] = shared[5][0]
+            out_gains[:] = shared[6][0]
+            del shared
+        finally:
+            self._release()
+        return out_idx, out_gains
+
+
+def _ipog(radices: List[int], strength: int = 2,
+          groups: Sequence[Tuple[Sequence[int], int]] = (),
+          cons: Optional[Constraints] = None, scorer: Optional[_Scorer] = None,
+          rng: Optional[np.random.Generator] = None, seed: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    t-Wege-Kern (IPOG) auf Indexebene. Liefert ein Array (Testfälle × Kategorien) mit Wertindizes.
+    Offene t-Tupel werden je (t-1)-Teilmenge als boolesche Matrix (Mixed-Radix-Index × n_k) geführt,
+    alle Teilmengen liegen in einem flachen Array. Der Gewinn eines Kandidatenwerts ist damit eine
+    einzige vektorisierte Summe; für t=2 ist das genau eine Matrix je Kategoriepaar.
+    `groups` = [(Kategorie-Indizes, Stärke), ...] für höhere Stärke innerhalb einzelner Gruppen.
+    `cons` = verbotene Wertepaare: ungültige Tupel werden nie erzeugt und nicht als Ziel geführt,
+    jeder Testfall bleibt gültig.
+    `scorer` = Bewertung der Kandidaten (seriell oder Prozess-Pool, siehe _Scorer).
+    `rng` = Zufallsgenerator für Mehrfachstarts: Gleichstände werden zufällig statt zugunsten des
+    kleinsten Werts aufgelöst.
+    `seed` = vorhandene Testfälle (Wertindizes, -1 = offen, z. B. neue Kategorie): sie stehen
+    unverändert am Anfang der Suite, nur offene Plätze werden belegt und Testfälle für die noch
+    fehlenden Tupel angehängt.
+    """
+    scorer = scorer or _Scorer()
+    order = _parameter_order(radices)
+    rows = _Rows(len(radices))
+    for values in seed if seed is not None else ():
+        r = rows.append()
+        rows.data[r, :-1] = values
+    head = order[:strength]
+    seeded = {tuple(row) for row in rows.view[:, head].tolist()}
+    for combo in product(*[range(radices[c]) for c in head]):
+        if combo in seeded:
+            continue
+        if cons is not None and not cons.completable(np.full(len(radices), _DONT_CARE), head, combo):
+            continue
+        hits = []
+        if seed is not None:  # offene Plätze der vorgegebenen Testfälle zuerst nutzen
+            view = rows.view
+            fits = np.ones(len(view), dtype=bool)
+            for c, a in zip(head, combo):
+                fits &= (view[:, c] == _DONT_CARE) | (view[:, c] == a)
+            hits = [h for h in np.flatnonzero(fits) if cons is None or cons.completable(rows.data[h], head, combo)][:1]
+        r = int(hits[0]) if hits else rows.append()
+        rows.data[r, head] = combo
+
+    for pos in range(strength, len(order)):
+        ck = order[pos]
+        members, mults, offsets, size = _interactions(order, pos, radices, strength, groups)
+        # uncovered[offset(S) + idx(Werte von S), v]: Tupel (S=Werte, ck=v) noch offen
+        uncovered = np.ones((size, radices[ck]), dtype=bool)
+        if cons is not None:
+            uncovered &= ~_invalid_slots(members, mults, offsets, size, radices, ck, cons)
+
+        def slots(r: int) -> np.ndarray:
+            """Zeilen in `uncovered`, die Testfall r über seine festgelegten Werte adressiert."""
+            vals = rows.data[r][members]
+            valid = (vals != _DONT_CARE).all(axis=1)
+            return offsets[valid] + (vals[valid] * mults[valid]).sum(axis=1)
+
+        # 0) Vorgegebene Werte (seed) decken ihre Tupel bereits ab
+        fixed = rows.view[:, ck] != _DONT_CARE
+        if fixed.any():
+            vals = rows.view[fixed][:, members]  # (Testfälle × Teilmengen × Breite)
+            valid = (vals != _DONT_CARE).all(axis=2)
+            idx = offsets + (vals.astype(np.int64) * mults).sum(axis=2)
+            uncovered[idx[valid], np.broadcast_to(rows.view[fixed, ck][:, None], idx.shape)[valid]] = False
+
+        # 1) Horizontal: jeden vorhandenen Testfall um den besten Wert erweitern.
+        #    Adressen und Gewinne werden blockweise vorab bewertet; ein Testfall, dessen Tupel im
+        #    Block noch niemand abgedeckt hat, übernimmt den vorab berechneten Gewinn unverändert.
+        touched = np.zeros(size, dtype=bool)
+        for lo in range(0, rows.count, scorer.block):
+            hi = min(rows.count, lo + scorer.block)
+            block_idx, block_gains = scorer.score(rows.data[lo:hi], members, mults, offsets, uncovered)
+            touched[:] = False
+            for r in range(lo, hi):
+                if r < len(fixed) and fixed[r]:
+                    continue
+                idx = block_idx[r - lo]
+                idx = idx[idx >= 0]
+                gains = uncovered[idx].sum(axis=0) if touched[idx].any() else block_gains[r - lo]
+                if rng is not None:
+                    gains = gains + 0.5 * rng.random(len(gains))  # Gleichstände zufällig auflösen
+                if cons is not None:
+                    gains[~cons.compatible(rows.data[r], ck)] = 0
+                    # bester Wert, mit dem der Testfall noch gültig vervollständigt werden kann
+                    for v in np.argsort(-gains, kind="stable"):
+                        if gains[v] < 1 or cons.completable(rows.data[r], [ck], [v]):
+                            break
+                        gains[v] = 0
+                best = int(gains.argmax())
+                if gains[best] >= 1:
+                    rows.data[r, ck] = best
+                    uncovered[idx, best] = False
+                    touched[idx] = True
+
+        # 2) Vertikal: verbleibende Tupel in offene Plätze legen oder neue Testfälle anlegen
+        for flat, v in np.argwhere(uncovered):
+            if not uncovered[flat, v]:
+                continue  # bereits durch ein früheres Auffüllen mit abgedeckt
+            s = int(np.searchsorted(offsets, flat, side="right")) - 1
+            cols = members[s]
+            vals = (flat - offsets[s]) // mults[s] % np.take(radices + [1], cols)
+            view = rows.view
+            fits = (view[:, ck] == _DONT_CARE) | (view[:, ck] == v)
+            for c, a in zip(cols, vals):
+                fits &= (view[:, c] == _DONT_CARE) | (view[:, c] == a)
+            hits = np.flatnonzero(fits)
+            if cons is not None:
+                tcols, tvals = list(cols) + [ck], list(vals) + [v]
+                hits = [h for h in hits if cons.completable(rows.data[h], tcols, tvals)][:1]
+                if not hits and not cons.completable(np.full(len(radices), _DONT_CARE), tcols, tvals):
+                    uncovered[flat, v] = False  # Tupel ist mit den Regeln nie erreichbar
+                    continue
+            r = int(hits[0]) if len(hits) else rows.append()
+            rows.data[r, cols] = vals
+            rows.data[r, ck] = v
+            uncovered[slots(r), v] = False
+
+    suite = rows.view[:, :-1].copy()
+    if cons is None:
+        suite[suite == _DONT_CARE] = 0  # übrig gebliebene Platzhalter: erster Wert
+        return suite
+    # Platzhalter regelkonform füllen (jeder Testfall ist per Konstruktion vervollständigbar)
+    keep = [r for r in range(len(suite)) if cons.complete(suite[r])]
+    return suite[keep]
+
+
+def generate(
+    categories: Dict[str, List[str]],
+    strength: int = 2,
+    groups: Optional[List[Tuple[List[str], int]]] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+    workers: int = 1,
+) -> Suite:
+    """
+    t-Wege-Erzeugung nach IPOG (In-Parameter-Order), Standard: Pairwise (strength=2).
+    Die Suite wird Kategorie für Kategorie erweitert – erst horizontal (neue Spalte
+    für vorhandene Testfälle), dann vertikal (zusätzliche Testfälle für offene Tupel).
+    Der Speicherbedarf wächst mit der Anzahl der Werte-Tupel, nicht mit dem Kreuzprodukt.
+    Ist `strength` ≥ Anzahl der Kategorien, entspricht das Ergebnis allen Kombinationen.
+    Für Pairwise mit passender Form (z. B. 7 Kategorien mit je 7 Werten, siehe
+    orthogonal_arrays.lookup) wird direkt ein optimales orthogonales Array ausgegeben.
+
+    groups: optionale Gruppen mit höherer Stärke, z. B. [(["Gewicht", "Größe", "Versandart"], 3)].
+    Ergebnis ist eine Suite gemischter Stärke: Grundstärke für alle, Gruppenstärke innerhalb der Gruppe.
+
+    forbidden: verbotene Wertepaare [(Kategorie1, Wert1, Kategorie2, Wert2), ...], siehe
+    `constraints.from_rules`. Sie werden bereits bei der Erzeugung berücksichtigt: kein Testfall
+    enthält ein verbotenes Paar, alle erlaubten Tupel bleiben abgedeckt.
+
+    workers: Anzahl Prozesse für die Bewertung der Kandidaten (Standard 1 = seriell). Große Suiten
+    werden blockweise parallel bewertet, das Ergebnis ist identisch zum seriellen Lauf.
+
+    Aufwendige Suiten werden auf Indexebene im Datei-Cache abgelegt (siehe cache.cache_dir), Schlüssel
+    sind nur Form, Stärke, Gruppen und Regeln. Jedes Projekt gleicher Form – auch in anderen Workern
+    oder der Desktop-Anwendung – erhält dieselbe Suite, nur mit seinen eigenen Werten beschriftet.
+    """
+    return Suite(categories, _generate_indexed(categories, strength, groups, forbidden, workers))
+
+
+def extend(
+    categories: Dict[str, List[str]],
+    existing: Sequence[Dict[str, str]],
+    strength: int = 2,
+    groups: Optional[List[Tuple[List[str], int]]] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+    workers: int = 1,
+) -> Tuple[Suite, Dict[str, List[int]]]:
+    """
+    Erweitert eine vorhandene Suite (`existing`, z. B. die Testfälle einer früheren Generation),
+    nachdem Werte oder Kategorien hinzugekommen sind. Die vorhandenen Testfälle bleiben in
+    Reihenfolge und Werten erhalten und stehen am Anfang; Werte neuer Kategorien werden in ihnen
+    ergänzt, angehängt werden nur Testfälle für die noch fehlenden Tupel. Stabil für Diffs in CI.
+    Werte, die es nicht mehr gibt, gelten als offen; Testfälle mit verbotenem Wertepaar (`forbidden`)
+    entfallen. Parameter sonst wie generate().
+    Liefert (Suite, Kennzahlen) mit {"kept", "added"} – `kept` = Positionen der übernommenen
+    Testfälle in `existing` (sie bilden die ersten len(kept) Zeilen), `added` = Anzahl angehängter Testfälle.
+    """
+    if not isinstance(existing, Suite):
+        existing = Suite.from_cases(existing, categories)
+    seed = existing.project(categories)
+    kept = np.arange(len(seed))
+    cons = _constraints.build(categories, forbidden)
+    if cons is not None and len(seed):
+        ids = cons.offsets + np.maximum(seed, 0)
+        known = seed != _DONT_CARE
+        dead = (known & ~cons.alive[ids]).any(axis=1)
+        clash = (cons.conflict[ids[:, :, None], ids[:, None, :]] & known[:, :, None] & known[:, None, :]).any(axis=(1, 2))
+        kept = np.flatnonzero(~(dead | clash))
+        seed = seed[kept]
+    suite = _generate_indexed(categories, strength, groups, forbidden, workers, seed=seed)
+    return Suite(categories, suite), {"kept": kept.tolist(), "added": len(suite) - len(kept)}
+
+
+def _generate_indexed(
+    categories: Dict[str, List[str]],
+    strength: int = 2,
+    groups: Optional[List[Tuple[List[str], int]]] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+    workers: int = 1,
+    rng: Optional[np.random.Generator] = None,
+    seed: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """generate() auf Indexebene: Array (Testfälle × Kategorien) mit Wertindizes; `seed` siehe _ipog."""
+    if strength < 1:
+        raise ValueError(f"strength must be >= 1, got {strength}")
+    if not categories or any(len(v) == 0 for v in categories.values()):
+        return np.zeros((0, len(categories)), dtype=np.int64)
+    keys, radices = _index(categories)
+    strength = min(strength, len(keys))
+    indexed_groups = _index_groups(keys, groups)
+    cons = _constraints.build(categories, forbidden)
+    if strength == 2 and cons is None and seed is None and all(t <= strength for _, t in indexed_groups):
+        oa = orthogonal_arrays.lookup(radices)  # bekannte optimale Form: ohne Suche
+        if oa is not None:
+            return oa
+    if rng is not None or seed is not None:  # zufällige Varianten (optimize) und Erweiterungen nicht cachen
+        with _Scorer(workers) as scorer:
+            return _ipog(radices, strength, indexed_groups, cons, scorer, rng, seed)
+
+    key = _cache.key(radices, strength, indexed_groups, cons)
+    suite = _cache.load(key)
+    if suite is not None and suite.ndim == 2 and suite.shape[1] == len(radices):
+        return suite
+    started = time.monotonic()
+    with _Scorer(workers) as scorer:
+        suite = _ipog(radices, strength, indexed_groups, cons, scorer, rng)
+    if time.monotonic() - started >= _MIN_CACHE_SECONDS:
+        _cache.store(key, suite)
     return suite
+
+
+def _index_groups(keys: List[str], groups: Optional[List[Tuple[List[str], int]]]) -> List[Tuple[List[int], int]]:
+    """Stärke-Gruppen (Kategorienamen) -> (Spaltenindizes, Stärke); ValueError bei unbekannten Namen."""
+    col_of = {k: c for c, k in enumerate(keys)}
+    indexed_groups = []
+    for names, t in groups or []:
+        unknown = [n for n in names if n not in col_of]
+        if unknown:
+            raise ValueError(f"Unknown categories in strength group: {unknown}")
+        if t < 1:
+            raise ValueError(f"strength must be >= 1, got {t}")
+        cols = sorted({col_of[n] for n in names})
+        indexed_groups.append((cols, min(t, len(cols))))
+    return indexed_groups
+
+
+# Obergrenze für den Zählvektor der Tupel bei der Nachoptimierung (Einträge); darüber entfällt sie
+_MAX_TUPLE_SPACE = 50_000_000
+
+
+class _TupleSpace:
+    """
+    Alle abzudeckenden t-Tupel einer Suite auf Indexebene: t-Teilmengen der Kategorien (Grundstärke
+    plus Gruppen höherer Stärke), je Teilmenge ein Mixed-Radix-Bereich in einem flachen Zählvektor.
+    Kürzere Teilmengen werden mit der Pseudo-Kategorie `k` (genau ein Wert, immer 0) aufgefüllt.
+    """
+
+    def __init__(self, radices: List[int], strength: int, groups: Sequence[Tuple[Sequence[int], int]] = ()):
+        k = len(radices)
+        subsets = dict.fromkeys(combinations(range(k), strength))
+        for cols, t in groups:
+            if t > strength:
+                subsets.update(dict.fromkeys(combinations(cols, t)))
+        width = max(len(sub) for sub in subsets)
+        self.members = np.array([sub + (k,) * (width - len(sub)) for sub in subsets], dtype=np.int64)
+        self.radices_ext = radices_ext = np.array(list(radices) + [1])
+        self.mults = np.ones_like(self.members)
+        for m in range(width - 2, -1, -1):
+            self.mults[:, m] = self.mults[:, m + 1] * radices_ext[self.members[:, m + 1]]
+        sizes = np.prod(radices_ext[self.members], axis=1)
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        self.size = int(sizes.sum())
+        # Teilmengen, in denen Kategorie c vorkommt
+        self.touching = [np.flatnonzero((self.members == c).any(axis=1)) for c in range(k)]
+
+    @staticmethod
+    def extend(suite: np.ndarray) -> np.ndarray:
+        """Suite um die Pseudo-Kategorie (Wert 0) erweitern."""
+        return np.hstack([suite, np.zeros((len(suite), 1), dtype=suite.dtype)])
+
+    def codes(self, ext: np.ndarray, subsets=slice(None)) -> np.ndarray:
+        """Tupel-Codes der (erweiterten) Testfälle für die gewählten Teilmengen."""
+        members = self.members[subsets]
+        return self.offsets[subsets] + (ext[..., members] * self.mults[subsets]).sum(axis=-1)
+
+    def counts(self, ext: np.ndarray) -> np.ndarray:
+        counts = np.zeros(self.size, dtype=np.int32)
+        for row in ext:
+            counts[self.codes(row)] += 1  # je Testfall ist jeder Code eindeutig (disjunkte Bereiche)
+        return counts
+
+
+def _valid_tuples(space: _TupleSpace, cons: Optional[Constraints]) -> np.ndarray:
+    """
+    Maske über alle Tupel-Codes: False für Tupel, die kein gültiger Testfall abdecken kann – über die
+    abgeschlossenen Konflikte (Constraints.closed), wie bei coverage und RuleSet.check.
+    """
+    valid = np.ones(space.size, dtype=bool)
+    if cons is None:
+        return valid
+    cons = cons.closed()
+    k = len(cons.radices)
+    for s, cols in enumerate(space.members):
+        n = int(np.prod(space.radices_ext[cols]))
+        vals = np.arange(n)[:, None] // space.mults[s] % space.radices_ext[cols]
+        real = cols < k
+        valid[int(space.offsets[s]): int(space.offsets[s]) + n] = cons.coverable(cols[real].tolist(), vals[:, real])
+    return valid
+
+
+def _confirm_tuples(space: _TupleSpace, need: np.ndarray, covered: np.ndarray, cons: Optional[Constraints]) -> np.ndarray:
+    """
+    _valid_tuples ist eine Näherung: fehlen insgesamt nur wenige Tupel (fast vollständige Suite),
+    werden sie einzeln genau geprüft und nie abdeckbare aus `need` genommen.
+    """
+    missing = np.flatnonzero(need & ~covered)
+    if cons is None or not 0 < len(missing) <= _CONFIRM_MISSING:
+        return need
+    need = need.copy()
+    k = len(cons.radices)
+    subset = np.searchsorted(space.offsets, missing, side="right") - 1
+    for s in np.unique(subset):
+        codes = missing[subset == s]
+        cols = space.members[s]
+        vals = (codes - space.offsets[s])[:, None] // space.mults[s] % space.radices_ext[cols]
+        real = cols < k
+        need[codes] = cons.possible(cols[real].tolist(), vals[:, real])
+    return need
+
+
+def _select_rows(suite: np.ndarray, space: _TupleSpace, need: np.ndarray, limit: Optional[int] = None) -> List[int]:
+    """
+    Greedy-Set-Cover über die Tupel-Codes: wählt nacheinander den Testfall mit den meisten noch
+    nicht abgedeckten Tupeln aus `need`, bis alles abgedeckt ist oder `limit` Testfälle gewählt sind.
+    Gewinne werden nur neu berechnet, wenn ein Testfall oben im Heap liegt (sie sinken nur).
+    Liefert die Zeilenindizes in Auswahlreihenfolge.
+    """
+    ext = space.extend(suite)
+    row_codes = [space.codes(row) for row in ext]
+    open_ = need.copy()
+    heap = [(-int(open_[c].sum()), r) for r, c in enumerate(row_codes)]
+    heapq.heapify(heap)
+    chosen: List[int] = []
+    while heap and (limit is None or len(chosen) < limit):
+        neg, r = heapq.heappop(heap)
+        gain = int(open_[row_codes[r]].sum())
+        if gain == 0:
+            continue
+        if gain < -neg and heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, r))  # veralteter Gewinn: neu einsortieren
+            continue
+        chosen.append(r)
+        open_[row_codes[r]] = False
+    return chosen
+
+
+def _iter_greedy_rows(space: _TupleSpace, need: np.ndarray, radices: List[int],
+                      cons: Optional[Constraints]) -> Iterator[Tuple[int, ...]]:
+    """
+    t-Wege-Testfälle Zeile für Zeile (greedy, AETG-artig): jeder Testfall startet mit dem ersten
+    offenen Tupel aus `need`, die übrigen Kategorien erhalten nacheinander den Wert, der die meisten
+    offenen Tupel mit den bereits belegten Kategorien abdeckt (und sich mit den Regeln noch gültig
+    vervollständigen lässt); danach wird wie in prioritized.iter_rows bei festen übrigen Werten
+    nachgebessert.
+    Lazy – ein Abbruch nach N Testfällen erzeugt den Rest gar nicht erst. Tupel, die sich mit den
+    Regeln nie vervollständigen lassen, entfallen.
+    """
+    k = len(radices)
+    open_ = need.copy()
+    positions = np.arange(k)
+    while open_.any():
+        code = int(np.argmax(open_))
+        s = int(np.searchsorted(space.offsets, code, side="right")) - 1
+        cols = space.members[s]
+        vals = (code - space.offsets[s]) // space.mults[s] % space.radices_ext[cols]
+        row = np.full(k + 1, _DONT_CARE, dtype=np.int64)
+        row[k] = 0  # Pseudo-Kategorie
+        row[cols] = vals
+        if cons is not None and not cons.completable(row[:k]):
+            open_[code] = False  # mit den Regeln nie erreichbar
+            continue
+        todo = np.flatnonzero(row[:k] == _DONT_CARE)
+
+        def gains(e: int) -> np.ndarray:
+            """Offene Tupel je Wert von e in den Teilmengen mit e, deren übrige Kategorien belegt sind."""
+            subsets = space.touching[e]
+            members = space.members[subsets]
+            subsets = subsets[((members == e) | (row[members] != _DONT_CARE)).all(axis=1)]
+            if not len(subsets):
+                return np.zeros(radices[e], dtype=np.int64)
+            trial = np.repeat(row[None, :], radices[e], axis=0)
+            trial[:, e] = np.arange(radices[e])
+            return open_[space.codes(trial, subsets)].sum(axis=1)
+
+        for e in todo:
+            for v in np.argsort(-gains(e), kind="stable"):
+                if cons is None or cons.completable(row[:k], [e], [int(v)]):
+                    row[e] = v
+                    break
+        for _ in range(prioritized._REFINE_PASSES):
+            for e in todo:
+                current, row[e] = row[e], _DONT_CARE
+                gain = gains(e)
+                row[e] = current
+                for v in np.argsort(-gain, kind="stable"):
+                    if gain[v] <= gain[current]:
+                        break
+                    if cons is None or cons.completable(np.where(positions == e, _DONT_CARE, row[:k]), [e], [int(v)]):
+                        row[e] = v
+                        break
+        open_[space.codes(row)] = False
+        yield tuple(int(a) for a in row[:k])
+
+
+def best_prefix(
+    categories: Dict[str, List[str]],
+    n: int,
+    strength: int = 2,
+    groups: Optional[List[Tuple[List[str], int]]] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+) -> Tuple[Suite, Dict[str, float]]:
+    """
+    Höchstens `n` Testfälle mit möglichst hoher t-Wege-Abdeckung (für ein `limit`). Für Pairwise
+    werden die Testfälle greedy einzeln aufgebaut (prioritized.iter_rows mit gleichen Gewichten),
+    die Erzeugung endet nach `n` Testfällen. Für höhere Stärken (oder Gruppen) ebenso Zeile für
+    Zeile über die Tupel-Codes (_iter_greedy_rows) – auch dort entsteht die vollständige Suite nicht.
+    Liefert (Suite, Kennzahlen) mit {"limit", "size", "covered", "total", "coverage"} –
+    `coverage` = abgedeckte gültige Tupel in Prozent.
+    """
+    if n < 0:
+        raise ValueError(f"n must be >= 0, got {n}")
+    if strength < 1:
+        raise ValueError(f"strength must be >= 1, got {strength}")
+    keys, radices = _index(categories)
+    stats = {"limit": n, "size": 0, "covered": 0, "total": 0, "coverage": 100.0}
+    if not categories or any(r == 0 for r in radices):
+        return Suite(categories), stats
+    strength = min(strength, len(keys))
+    indexed_groups = _index_groups(keys, groups)
+    space = _TupleSpace(radices, strength, indexed_groups)
+    cons = _constraints.build(categories, forbidden)
+    need = _valid_tuples(space, cons)
+    if strength == 2 and all(t <= strength for _, t in indexed_groups):
+        rows = list(islice(prioritized.iter_rows(categories, forbidden=forbidden), n))
+    else:
+        rows = list(islice(_iter_greedy_rows(space, need, radices, cons), n))
+    suite = np.array(rows, dtype=np.int64).reshape(len(rows), len(keys))
+    seen = space.counts(space.extend(suite)) > 0 if len(suite) else np.zeros(space.size, dtype=bool)
+    need = _confirm_tuples(space, need, seen, cons)
+    covered = int((need & seen).sum())
+    total = int(need.sum())
+    stats.update(size=len(suite), covered=covered, total=total,
+                 coverage=round(100.0 * covered / total, 2) if total else 100.0)
+    return Suite(categories, suite), stats
+
+
+def minimize(
+    suite: Sequence[Dict[str, str]],
+    strength: int = 2,
+    groups: Optional[List[Tuple[List[str], int]]] = None,
+) -> Tuple[Suite, Dict[str, float]]:
+    """
+    Verkleinert eine vorhandene Suite (z. B. importierte CSV oder ältere Generation) auf eine
+    Teilmenge mit derselben t-Wege-Abdeckung: jedes t-Tupel, das in der Suite vorkommt, bleibt
+    abgedeckt. Die Testfälle werden auf Integer-Codes abgebildet, Greedy-Set-Cover (_select_rows)
+    wählt die Teilmenge, danach entfallen noch redundante Testfälle (_remove_redundant).
+    Die gewählten Testfälle behalten ihre ursprüngliche Reihenfolge; ein fehlender Wert zählt als eigener Wert.
+    Liefert (Teilmenge, Kennzahlen) mit {"original_size", "size", "reduction" (Prozent), "tuples",
+    "kept"} – `kept` = Positionen der übernommenen Testfälle in `suite`.
+    """
+    if strength < 1:
+        raise ValueError(f"strength must be >= 1, got {strength}")
+    if not isinstance(suite, Suite):
+        suite = Suite.from_cases(suite)
+    keys = suite.keys
+    stats = {"original_size": len(suite), "size": len(suite), "reduction": 0.0, "tuples": 0,
+             "kept": list(range(len(suite)))}
+    if not len(suite) or not keys:
+        return suite, stats
+    # je Kategorie dichte Codes der vorkommenden Werte (ein fehlender Wert ist ein eigener Wert)
+    rows = np.stack([np.unique(col, return_inverse=True)[1].ravel() for col in suite.rows.T.astype(np.int64)],
+                    axis=1)
+    radices = [int(col.max()) + 1 for col in rows.T]
+    space = _TupleSpace(radices, min(strength, len(keys)), _index_groups(keys, groups))
+    if space.size > _MAX_TUPLE_SPACE:
+        raise ValueError(f"too many value tuples for strength {strength}: {space.size}")
+    need = space.counts(space.extend(rows)) > 0
+    chosen = np.array(sorted(_select_rows(rows, space, need)), dtype=np.int64)
+    keep = chosen[_kept_rows(rows[chosen], space)]
+    stats.update(size=len(keep), tuples=int(need.sum()), kept=keep.tolist(),
+                 reduction=round(100.0 * (1 - len(keep) / len(suite)), 2))
+    return suite[keep], stats
+
+
+def _kept_rows(suite: np.ndarray, space: _TupleSpace) -> np.ndarray:
+    """Positionen der Testfälle, die _remove_redundant behält."""
+    if len(suite) < 2:
+        return np.arange(len(suite))
+    ext = space.extend(suite)
+    counts = space.counts(ext)
+    keep = np.ones(len(suite), dtype=bool)
+    for r in range(len(suite) - 1, -1, -1):
+        c = space.codes(ext[r])
+        if (counts[c] >= 2).all():
+            counts[c] -= 1
+            keep[r] = False
+    return np.flatnonzero(keep)
+
+
+def _remove_redundant(suite: np.ndarray, space: _TupleSpace) -> np.ndarray:
+    """
+    Lokale Nachoptimierung: entfernt Testfälle, deren t-Tupel alle auch von anderen Testfällen
+    abgedeckt werden – von hinten nach vorn, IPOG hängt die dünn besetzten Testfälle am Ende an.
+    Die Menge der abgedeckten Tupel bleibt exakt gleich.
+    """
+    return suite[_kept_rows(suite, space)]
+
+
+def _eliminate_row(suite: np.ndarray, space: _TupleSpace, need: np.ndarray, cons: Optional[Constraints],
+                   rng: np.random.Generator, deadline: float, max_steps: int = 5000) -> Optional[np.ndarray]:
+    """
+    Versucht, die Suite um einen Testfall zu verkleinern: der Testfall mit den wenigsten nur von
+    ihm abgedeckten Tupeln wird gestrichen, die so fehlenden Tupel werden per lokaler Suche
+    (Min-Conflicts) in andere Testfälle gelegt – jeweils dorthin, wo dabei am wenigsten andere Tupel
+    verloren gehen. Liefert die kleinere Suite (alle Tupel aus `need` abgedeckt) oder None.
+    """
+    ext = space.extend(suite)
+    counts = space.counts(ext)
+    unique = np.array([(counts[space.codes(row)] == 1).sum() for row in ext])
+    drop = int(rng.choice(np.flatnonzero(unique == unique.min())))
+    counts[space.codes(ext[drop])] -= 1
+    ext = np.delete(ext, drop, axis=0)
+    missing = set(np.flatnonzero(need & (counts == 0)).tolist())
+
+    for _ in range(max_steps):
+        if not missing:
+            return ext[:, :-1]
+        if time.monotonic() > deadline:
+            return None
+        # fehlendes Tupel wählen und in allen Testfällen probeweise setzen
+        code = int(rng.choice(list(missing)))
+        s = int(np.searchsorted(space.offsets, code, side="right")) - 1
+        cols = space.members[s]
+        vals = (code - space.offsets[s]) // space.mults[s] % space.radices_ext[cols]
+        trial = ext.copy()
+        trial[:, cols] = vals
+        changed = (trial != ext).any(axis=0)
+        affected = np.unique(np.concatenate([space.touching[c] for c in np.flatnonzero(changed[:-1])]))
+        old = space.codes(ext, affected)      # (Testfälle × betroffene Teilmengen)
+        new = space.codes(trial, affected)
+        diff = old != new
+        lost = (diff & need[old] & (counts[old] == 1)).sum(axis=1)
+        gained = (diff & need[new] & (counts[new] == 0)).sum(axis=1)
+        score = gained - lost
+        if cons is not None:
+            ids = cons.offsets + trial[:, :-1]  # flache Wert-IDs je Testfall
+            real = cols[cols < len(cons.radices)]
+            bad = cons.conflict[ids[:, real][:, :, None], ids[:, None, :]].any(axis=(1, 2))
+            score[bad] = np.iinfo(score.dtype).min
+            if (score == np.iinfo(score.dtype).min).all():
+                continue
+        best = np.flatnonzero(score == score.max())
+        if rng.random() < 0.1:
+            best = np.flatnonzero(score > np.iinfo(score.dtype).min)  # gelegentlich zufälliger Schritt
+        r = int(rng.choice(best))
+        o, n = old[r][diff[r]], new[r][diff[r]]
+        counts[o] -= 1
+        counts[n] += 1
+        missing.difference_update(n.tolist())
+        missing.update(o[need[o] & (counts[o] == 0)].tolist())
+        ext[r] = trial[r]
+    return None
+
+
+def optimize(
+    categories: Dict[str, List[str]],
+    seconds: float,
+    strength: int = 2,
+    groups: Optional[List[Tuple[List[str], int]]] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+    workers: int = 1,
+    seed: Optional[int] = None,
+) -> Tuple[Suite, Dict[str, float]]:
+    """
+    Verkleinert die Suite innerhalb eines Zeitbudgets (`seconds`):
+    1) erst der normale IPOG-Lauf, dann bis zur Hälfte des Budgets Mehrfachstarts mit zufälliger
+       Reihenfolge der Kategorien und Werte und zufällig aufgelösten Gleichständen,
+    2) danach lokale Nachoptimierung der kleinsten Suite: Testfälle streichen und die fehlenden
+       Tupel in andere Testfälle verschieben (_eliminate_row).
+    Jede Suite wird um redundante Testfälle bereinigt (_remove_redundant). Abdeckung und Regeln
+    wie bei generate(): jedes Tupel des normalen Laufs bleibt abgedeckt.
+    Liefert (Suite, Kennzahlen) – Kennzahlen für Generation.coverage_meta:
+    {"seconds", "elapsed", "restarts", "eliminated", "initial_size", "size"}.
+    """
+    start = time.monotonic()
+    keys, radices = _index(categories)
+    suite = _generate_indexed(categories, strength, groups, forbidden, workers)
+    stats = {"seconds": seconds, "elapsed": 0.0, "restarts": 0, "eliminated": 0,
+             "initial_size": len(suite), "size": len(suite)}
+    indexed_groups = _index_groups(keys, groups)
+    space = _TupleSpace(radices, min(strength, len(keys)), indexed_groups) if len(suite) else None
+    if space is not None and space.size <= _MAX_TUPLE_SPACE:
+        need = space.counts(space.extend(suite)) > 0
+        cons = _constraints.build(categories, forbidden)
+        rng = np.random.default_rng(seed)
+        col_of = {k: c for c, k in enumerate(keys)}
+        idx_of = [{v: i for i, v in enumerate(categories[k])} for k in keys]
+        best = _remove_redundant(suite, space)
+        # untere Schranke: je Teilmenge deckt ein Testfall genau ein Tupel ab
+        lower = int(np.add.reduceat(need, space.offsets).max())
+        while len(best) > lower and time.monotonic() - start < seconds / 2:
+            # Reihenfolge der Kategorien und Werte mischen, Gleichstände zufällig auflösen
+            order = [keys[c] for c in rng.permutation(len(keys))]
+            shuffled = {k: [categories[k][i] for i in rng.permutation(len(categories[k]))] for k in order}
+            raw = _generate_indexed(shuffled, strength, groups, forbidden, workers, rng)
+            candidate = np.empty_like(raw)
+            for c, k in enumerate(order):  # zurück auf die ursprüngliche Reihenfolge abbilden
+                relabel = np.array([idx_of[col_of[k]][v] for v in shuffled[k]])
+                candidate[:, col_of[k]] = relabel[raw[:, c]]
+            candidate = _remove_redundant(candidate, space)
+            stats["restarts"] += 1
+            if len(candidate) < len(best):
+                best = candidate
+        deadline = start + seconds
+        while len(best) > lower and time.monotonic() < deadline:
+            smaller = _eliminate_row(best, space, need, cons, rng, deadline)
+            if smaller is not None:
+                best = _remove_redundant(smaller, space)
+                stats["eliminated"] += 1
+        suite = best
+    stats["elapsed"] = round(time.monotonic() - start, 3)
+    stats["size"] = len(suite)
+    return Suite(categories, suite), stats
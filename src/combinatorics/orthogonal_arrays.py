@@ -0,0 +1,95 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+def _prime_power(n: int) -> Optional[Tuple[int, int]]:
+    """(p, m) mit n = p^m für eine Primzahl p, sonst None."""
+    if n < 2:
+        return None
+    p = next(d for d in range(2, n + 1) if n % d == 0)  # kleinster Teiler ist prim
+    m = 0
+    while n % p == 0:
+        n //= p
+        m += 1
+    return (p, m) if n == 1 else None
+
+
+@lru_cache(maxsize=None)
+def _galois_field(q: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Additions- und Multiplikationstafel von GF(q), q = p^m. Elemente sind Zahlen 0..q-1
+    (Koeffizienten eines Polynoms vom Grad < m zur Basis p). Für m > 1 wird ein primitives
+    Polynom gesucht; die Multiplikation läuft dann über Logarithmen zur Basis x.
+    """
+    p, m = _prime_power(q)
+    digits = np.array([[(e // p ** d) % p for d in range(m)] for e in range(q)])
+    weights = p ** np.arange(m)
+    add = ((digits[:, None, :] + digits[None, :, :]) % p) @ weights
+    if m == 1:
+        return add, np.outer(np.arange(q), np.arange(q)) % q
+
+    for tail in range(1, q):  # f(x) = x^m + tail(x), tail(0) ≠ 0
+        tail_digits = digits[tail]
+
+        def times_x(e: int) -> int:
+            d = digits[e]
+            shifted = np.concatenate(([0], d[:-1]))
+            return int(((shifted - d[-1] * tail_digits) % p) @ weights)
+
+        powers = [1]
+        while len(powers) < q and (len(powers) == 1 or powers[-1] != 1):
+            powers.append(times_x(powers[-1]))
+        if len(powers) == q and powers[-1] == 1 and len(set(powers[:-1])) == q - 1:
+            break  # x erzeugt alle q-1 Elemente ≠ 0: f ist primitiv
+    exp = np.array(powers[:-1])
+    log = np.zeros(q, dtype=np.int64)
+    log[exp] = np.arange(q - 1)
+    mul = exp[(log[:, None] + log[None, :]) % (q - 1)]
+    mul[0, :] = 0
+    mul[:, 0] = 0
+    return add, mul
+
+
+@lru_cache(maxsize=None)
+def _bose(q: int) -> np.ndarray:
+    """
+    Bose-Konstruktion OA(q², q+1, q, 2) für Primzahlpotenzen q: Zeile (i, j) hat die Spalten
+    i und i·x + j für alle x aus GF(q). Je zwei Spalten enthalten jedes Wertepaar genau einmal.
+    """
+    add, mul = _galois_field(q)
+    i, j = np.divmod(np.arange(q * q), q)
+    return np.stack([i] + [add[mul[i, x], j] for x in range(q)], axis=1)
+
+
+@lru_cache(maxsize=None)
+def _latin_square(n: int) -> np.ndarray:
+    """OA(n², 3, n, 2) aus dem zyklischen lateinischen Quadrat – für jedes n."""
+    i, j = np.divmod(np.arange(n * n), n)
+    return np.stack([i, j, (i + j) % n], axis=1)
+
+
+def lookup(radices: List[int]) -> Optional[np.ndarray]:
+    """
+    Optimale Pairwise-Suite ohne Suche, falls die Form passt: die beiden größten Kategorien haben
+    gleich viele Werte q (dann sind q² Testfälle die untere Schranke) und
+    - q ist Primzahlpotenz und es gibt höchstens q+1 Kategorien (Bose), oder
+    - es gibt genau 3 Kategorien (lateinisches Quadrat).
+    Kleinere Kategorien werden per Modulo auf ihre Werte zusammengefaltet – jedes Paar bleibt
+    abgedeckt. Liefert (q² × Kategorien) Wertindizes oder None.
+    """
+    k = len(radices)
+    if k < 3:
+        return None
+    top = sorted(radices, reverse=True)
+    q = top[0]
+    if top[1] != q:
+        return None
+    if _prime_power(q) and k <= q + 1:
+        oa = _bose(q)[:, :k]
+    elif k == 3:
+        oa = _latin_square(q)
+    else:
+        return None
+    return oa % np.array(radices)
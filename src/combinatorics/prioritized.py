@@ -0,0 +1,108 @@
+import heapq
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from . import constraints as _constraints
+from .constraints import ForbiddenPair
+from .suite import Suite
+
+_DONT_CARE = -1
+# Durchläufe der Nachbesserung je Testfall (Koordinatenabstieg über die Kategorien)
+_REFINE_PASSES = 2
+
+
+def iter_rows(
+    categories: Dict[str, List[str]],
+    weights: Optional[Dict[str, Dict[str, float]]] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+) -> Iterator[Tuple[int, ...]]:
+    """
+    Risikogewichtetes Pairwise: Testfälle (Wertindizes, Reihenfolge wie `categories`) so, dass die
+    Paare mit dem höchsten Gewicht zuerst abgedeckt werden. Gewicht eines Paars = Produkt der
+    Wertgewichte (`weights[Kategorie][Wert]`, fehlend = 1, z. B. Value.risk_weight).
+    Greedy Zeile für Zeile: jeder Testfall startet mit dem schwersten offenen Paar (Max-Heap mit
+    verzögertem Löschen, kein Neubewerten aller Paare), die übrigen Kategorien erhalten den Wert mit
+    dem größten gewichteten Gewinn und werden danach bei festen übrigen Werten nachgebessert – damit
+    deckt jedes Präfix der Suite möglichst viel Gewicht ab.
+    Lazy: ein Abbruch nach N Testfällen (CI-Zeitbudget) erzeugt den Rest gar nicht erst.
+    Am Ende ist wie bei orthogonal.generate jedes erlaubte Paar abgedeckt.
+    """
+    if not categories or any(len(v) == 0 for v in categories.values()):
+        return
+    keys = list(categories.keys())
+    radices = [len(categories[k]) for k in keys]
+    k = len(keys)
+    if k == 1:
+        yield from ((a,) for a in range(radices[0]))
+        return
+    offsets = np.concatenate(([0], np.cumsum(radices)[:-1])).astype(np.int64)
+    blocks = [slice(int(offsets[c]), int(offsets[c]) + radices[c]) for c in range(k)]
+    w = np.array([float((weights or {}).get(key, {}).get(v, 1)) for key in keys for v in categories[key]])
+    cons = _constraints.build(categories, forbidden)
+
+    # open[x, y] = Gewicht des noch offenen Paars der flachen Wert-IDs x, y (0 = abgedeckt/ungültig)
+    open_w = np.outer(w, w)
+    for c in range(k):
+        open_w[blocks[c], blocks[c]] = 0  # Werte derselben Kategorie bilden kein Paar
+    if cons is not None:
+        open_w[cons.conflict] = 0
+        open_w[~cons.alive, :] = 0
+        open_w[:, ~cons.alive] = 0
+    col_of = np.repeat(np.arange(k), radices)
+
+    xs, ys = np.nonzero(np.triu(open_w))
+    heap = list(zip((-open_w[xs, ys]).tolist(), xs.tolist(), ys.tolist()))
+    heapq.heapify(heap)
+
+    while heap:
+        _, x, y = heapq.heappop(heap)
+        if open_w[x, y] == 0:
+            continue  # inzwischen abgedeckt
+        c, d = int(col_of[x]), int(col_of[y])
+        row = np.full(k, _DONT_CARE, dtype=np.int64)
+        if cons is not None and not cons.completable(row, [c, d], [x - offsets[c], y - offsets[d]]):
+            open_w[x, y] = open_w[y, x] = 0  # mit den Regeln nie erreichbar
+            continue
+        row[c], row[d] = x - offsets[c], y - offsets[d]
+
+        # übrige Kategorien: zuerst die mit dem meisten offenen Gewicht
+        todo = [e for e in range(k) if row[e] == _DONT_CARE]
+        todo.sort(key=lambda e: -open_w[blocks[e]].sum())
+        for e in todo:
+            fixed = offsets[row != _DONT_CARE] + row[row != _DONT_CARE]
+            gain = open_w[fixed, blocks[e]].sum(axis=0)
+            # Aussicht: mittleres offenes Gewicht mit den noch freien Kategorien
+            for g in range(k):
+                if g != e and row[g] == _DONT_CARE:
+                    gain = gain + open_w[blocks[e], blocks[g]].sum(axis=1) / radices[g]
+            for v in np.argsort(-gain, kind="stable"):
+                if cons is None or cons.completable(row, [e], [int(v)]):
+                    row[e] = v
+                    break
+
+        # Nachbessern: jede Kategorie außer dem Startpaar bei festen übrigen Werten neu wählen
+        cols = np.arange(k)
+        for _ in range(_REFINE_PASSES):
+            for e in todo:
+                others = offsets[cols != e] + row[cols != e]
+                gain = open_w[others, blocks[e]].sum(axis=0)
+                for v in np.argsort(-gain, kind="stable"):
+                    if gain[v] <= gain[row[e]]:
+                        break
+                    if cons is None or cons.completable(np.where(cols == e, _DONT_CARE, row), [e], [int(v)]):
+                        row[e] = v
+                        break
+
+        ids = offsets + row
+        open_w[np.ix_(ids, ids)] = 0
+        yield tuple(int(a) for a in row)
+
+
+def generate(
+    categories: Dict[str, List[str]],
+    weights: Optional[Dict[str, Dict[str, float]]] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+) -> Suite:
+    """Vollständige risikogewichtete Pairwise-Suite, siehe iter_rows."""
+    return Suite(categories, list(iter_rows(categories, weights, forbidden)))
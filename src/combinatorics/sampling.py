@@ -0,0 +1,128 @@
+import math
+import random
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import all_combinations
+from . import constraints as _constraints
+from .constraints import ForbiddenPair
+from .suite import Suite
+
+# Bis zu dieser Produktgröße (relativ zu n) wird direkt aus den gültigen Zeilen gezogen,
+# darüber per Unranking zufälliger Indizes mit Verwerfen
+_DENSE_FACTOR = 4
+# Verworfene Ziehungen in Folge, bevor auf regelgeführte Ziehung (bzw. Aufzählung) umgestellt wird
+_MAX_REJECTS = 1000
+
+
+def unrank(index: int, radices: Sequence[int]) -> Tuple[int, ...]:
+    """
+    Mixed-Radix-Unranking: Index im Kreuzprodukt -> Wertindizes je Kategorie.
+    Reihenfolge wie itertools.product (letzte Kategorie läuft am schnellsten).
+    """
+    row = [0] * len(radices)
+    for c in range(len(radices) - 1, -1, -1):
+        index, row[c] = divmod(index, radices[c])
+    return tuple(row)
+
+
+def _rank(row: Sequence[int], radices: Sequence[int]) -> int:
+    """Umkehrung von unrank."""
+    index = 0
+    for a, n in zip(row, radices):
+        index = index * n + a
+    return index
+
+
+def iter_sample(
+    categories: Dict[str, List[str]],
+    seed: Optional[int] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+) -> Iterator[Tuple[int, ...]]:
+    """
+    Gleichverteilte Zufallsauswahl gültiger Kombinationen ohne Wiederholung, als kompakte Zeilen
+    (Wertindizes, Reihenfolge wie `categories`). Lazy: der Aufrufer nimmt so viele, wie er braucht.
+    Zufällige Indizes im Kreuzprodukt werden per Unranking in Zeilen übersetzt; Zeilen mit
+    verbotenem Wertepaar werden verworfen und neu gezogen. Bei sehr restriktiven Regeln
+    (_MAX_REJECTS Fehlzüge in Folge) wird regelgeführt gezogen (_guided_row), und wenn auch das nur
+    noch Wiederholungen liefert, werden die übrigen gültigen Zeilen aufgezählt und gemischt – es
+    fehlen also nur dann Testfälle, wenn es nicht mehr gültige gibt. Gleicher `seed` -> gleiche Folge.
+    """
+    if not categories or any(len(v) == 0 for v in categories.values()):
+        return
+    rng = random.Random(seed)
+    radices = [len(v) for v in categories.values()]
+    cons = _constraints.build(categories, forbidden)
+    total = math.prod(radices)
+
+    seen = set()
+    rejects = 0
+    guided = False
+    while _DENSE_FACTOR * len(seen) < total:
+        if rejects >= _MAX_REJECTS:
+            if guided or cons is None:
+                break  # auch regelgeführt nur Wiederholungen: übrige gültige Zeilen aufzählen (unten)
+            guided, rejects = True, 0
+        if guided:
+            row = _guided_row(cons, rng)
+            if row is None or _rank(row, radices) in seen:
+                rejects += 1
+                continue
+            seen.add(_rank(row, radices))
+            rejects = 0
+            yield row
+            continue
+        index = rng.randrange(total)
+        if index in seen:
+            rejects += 1
+            continue
+        seen.add(index)
+        row = unrank(index, radices)
+        if cons is not None:
+            ids = cons.ids(np.array(row))
+            if not cons.alive[ids].all() or cons.conflict[np.ix_(ids, ids)].any():
+                rejects += 1
+                continue
+        rejects = 0
+        yield row
+
+    # Kleines Produkt (oder weitgehend gezogen): verbleibende gültige Zeilen aufzählen und mischen –
+    # gleichverteilt und über `seed` reproduzierbar, nicht in der Reihenfolge der Aufzählung
+    rest = [row for row in all_combinations.iter_rows(categories, forbidden) if _rank(row, radices) not in seen]
+    rng.shuffle(rest)
+    yield from rest
+
+
+def _guided_row(cons: _constraints.Constraints, rng: random.Random) -> Optional[Tuple[int, ...]]:
+    """
+    Zufällige gültige Zeile ohne Verwerfen: Kategorien in zufälliger Reihenfolge, je Kategorie ein
+    zufälliger passender Wert, der sich noch gültig vervollständigen lässt (Tiefensuche aus
+    Constraints.complete). Nicht exakt gleichverteilt; None, wenn das Suchbudget nicht reicht.
+    """
+    k = len(cons.radices)
+    row = np.full(k, -1, dtype=np.int64)
+    for c in rng.sample(range(k), k):
+        choices = np.flatnonzero(cons.compatible(row, c)).tolist()
+        rng.shuffle(choices)
+        for a in choices:
+            row[c] = a
+            if cons.completable(row):
+                break
+        else:
+            return None
+    return tuple(int(a) for a in row)
+
+
+def sample(
+    categories: Dict[str, List[str]],
+    n: int,
+    seed: Optional[int] = None,
+    forbidden: Optional[List[ForbiddenPair]] = None,
+) -> Suite:
+    """
+    Sample-Strategie: `n` zufällige gültige Kombinationen (weniger, wenn es nicht so viele gibt).
+    Reproduzierbar über `seed`.
+    """
+    return Suite(categories, list(islice(iter_sample(categories, seed, forbidden), max(n, 0))))
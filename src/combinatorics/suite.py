@@ -0,0 +1,158 @@
+from collections.abc import Sequence
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Wertindex für leere Zellen (Kategorie im Testfall nicht belegt)
+MISSING = -1
+
+
+def _dtype(radices: Iterable[int]) -> type:
+    """Kleinster vorzeichenbehafteter Integer-Typ für die Wertindizes (-1 = leer)."""
+    top = max(radices, default=0)
+    if top <= np.iinfo(np.int8).max:
+        return np.int8
+    if top <= np.iinfo(np.int16).max:
+        return np.int16
+    return np.int32
+
+
+class Suite(Sequence):
+    """
+    Kompakte Testfall-Suite: Integer-Matrix `rows` (Testfälle × Kategorien) mit Wertindizes und
+    eine Wertetabelle je Kategorie (`keys`, `values`). Ein Testfall belegt so wenige Bytes statt
+    eines Dicts mit String-Schlüsseln; Regeln vergleichen Integer statt Strings.
+    Verhält sich wie eine (unveränderliche) Liste von {Kategorie: Wert}: len, Index, Iteration und
+    Vergleich mit Listen funktionieren wie bisher, die Dicts entstehen erst beim Zugriff.
+    Slices und Masken (`suite[mask]`) liefern wieder eine Suite mit derselben Wertetabelle.
+    """
+
+    def __init__(self, categories: Dict[str, List[str]], rows=None):
+        self.keys: List[str] = list(categories.keys())
+        self.values: List[List[str]] = [list(categories[k]) for k in self.keys]
+        dtype = _dtype(len(v) for v in self.values)
+        if rows is None:
+            rows = np.zeros((0, len(self.keys)), dtype=dtype)
+        rows = np.asarray(rows, dtype=dtype)
+        self.rows: np.ndarray = rows.reshape(len(rows), len(self.keys))
+
+    @classmethod
+    def from_cases(cls, cases: Iterable[Dict[str, str]],
+                   categories: Optional[Dict[str, List[str]]] = None) -> "Suite":
+        """
+        Suite aus {Kategorie: Wert}-Dicts. Ohne `categories` ergeben sich Kategorien und Werte aus den
+        Testfällen (Reihenfolge des ersten Auftretens); unbekannte Werte werden an die Tabelle angehängt.
+        """
+        cases = list(cases)
+        table = {k: list(v) for k, v in (categories or {}).items()}
+        if categories is None:
+            for case in cases:
+                for k in case:
+                    table.setdefault(k, [])
+        idx_of = {k: {v: i for i, v in enumerate(vals)} for k, vals in table.items()}
+        keys = list(table.keys())
+        rows = np.full((len(cases), len(keys)), MISSING, dtype=np.int64)
+        for r, case in enumerate(cases):
+            for c, k in enumerate(keys):
+                if k not in case:
+                    continue
+                v = case[k]
+                if v not in idx_of[k]:
+                    idx_of[k][v] = len(table[k])
+                    table[k].append(v)
+                rows[r, c] = idx_of[k][v]
+        return cls(table, rows)
+
+    @property
+    def categories(self) -> Dict[str, List[str]]:
+        return dict(zip(self.keys, self.values))
+
+    @property
+    def nbytes(self) -> int:
+        """Speicherbedarf der Indexmatrix."""
+        return int(self.rows.nbytes)
+
+    def like(self, rows) -> "Suite":
+        """Neue Suite mit derselben Wertetabelle."""
+        return Suite(self.categories, rows)
+
+    def project(self, categories: Dict[str, List[str]]) -> np.ndarray:
+        """
+        Wertindizes bezogen auf eine andere Wertetabelle (Kategorien in deren Reihenfolge, int64).
+        Werte oder Kategorien, die es dort nicht gibt, werden MISSING.
+        """
+        out = np.full((len(self), len(categories)), MISSING, dtype=np.int64)
+        for c, (key, vals) in enumerate(categories.items()):
+            if key not in self.keys:
+                continue
+            j = self.keys.index(key)
+            idx_of = {v: i for i, v in enumerate(vals)}
+            # letzter Eintrag bildet MISSING (-1) auf MISSING ab
+            relabel = np.array([idx_of.get(v, MISSING) for v in self.values[j]] + [MISSING], dtype=np.int64)
+            out[:, c] = relabel[self.rows[:, j]]
+        return out
+
+    def value_index(self, key: str, value: str) -> Optional[int]:
+        """Index von `value` in Kategorie `key`, None wenn unbekannt."""
+        try:
+            return self.values[self.keys.index(key)].index(value)
+        except ValueError:
+            return None
+
+    def add_value(self, key: str, value: str) -> int:
+        """Index von `value`; unbekannte Werte werden an die Tabelle angehängt."""
+        c = self.keys.index(key)
+        if value not in self.values[c]:
+            self.values[c].append(value)
+            if len(self.values[c]) > np.iinfo(self.rows.dtype).max:
+                self.rows = self.rows.astype(_dtype(len(v) for v in self.values))
+        return self.values[c].index(value)
+
+    def case(self, r: int) -> Dict[str, str]:
+        return self._decode(self.rows[r].tolist())
+
+    def _decode(self, row: List[int]) -> Dict[str, str]:
+        return {k: vals[i] for k, vals, i in zip(self.keys, self.values, row) if i != MISSING}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return self.case(item)
+        return self.like(self.rows[item])
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        for row in self.rows.tolist():
+            yield self._decode(row)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Suite):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Suite({len(self)} Testfälle × {len(self.keys)} Kategorien)"
+
+
+def concat(suites: List[Suite], categories: Optional[Dict[str, List[str]]] = None) -> Suite:
+    """Hängt Suiten mit gleicher Wertetabelle aneinander (leere Liste -> leere Suite zu `categories`)."""
+    if not suites:
+        return Suite(categories or {})
+    return suites[0].like(np.concatenate([s.rows for s in suites]))
+
+
+def chunked(categories: Dict[str, List[str]], rows: Iterable[Tuple[int, ...]], size: int) -> Iterator[Suite]:
+    """Lazy erzeugte Indexzeilen (z. B. all_combinations.iter_rows) in Suiten zu je `size` Testfällen."""
+    rows = iter(rows)
+    k = len(categories)
+    while True:
+        block = list(islice(rows, size))
+        if not block:
+            return
+        yield Suite(categories, np.array(block, dtype=np.int64).reshape(len(block), k))
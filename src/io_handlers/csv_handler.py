@@ -1,5 +1,7 @@
 import csv
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Sequence, Tuple, Optional
+
+from combinatorics.suite import Suite
 
 # Wir verwenden Semikolon (;) – kompatibel zu deutschen Excel-Defaults.
 
@@ -7,7 +9,7 @@ def export_to_csv(
     filepath: str,
     categories: List[str],
     status: Dict[str, str],
-    testcases: List[Dict[str, str]],
+    testcases: Sequence[Dict[str, str]],
     testcase_names: Optional[List[str]] = None,
 ) -> None:
     """
@@ -17,7 +19,7 @@ def export_to_csv(
         Größe;error;Klein;Mittel
     - categories: Reihenfolge der Zeilen
     - status: Map Kategorie -> Status (default "allowed")
-    - testcases: Liste von Dicts (ein Dict pro Testfall)
+    - testcases: Liste von Dicts (ein Dict pro Testfall) oder Suite (Zeilen direkt aus den Wertindizes)
     - testcase_names: Spaltenköpfe (optional, sonst TC_1..TC_N)
     """
     if testcase_names is None:
@@ -33,11 +35,23 @@ def export_to_csv(
         writer.writerow(["Kategorie", "Status", *testcase_names])
         for cat in categories:
             row = [cat, status.get(cat, "allowed")]
-            for tc in testcases:
-                row.append(tc.get(cat, ""))
+            if isinstance(testcases, Suite):
+                row += _suite_row(testcases, cat)
+            else:
+                for tc in testcases:
+                    row.append(tc.get(cat, ""))
             writer.writerow(row)
 
 
+def _suite_row(suite: Suite, cat: str) -> List[str]:
+    """Werte einer Kategorie über alle Testfälle der Suite (leer, wenn nicht belegt)."""
+    if cat not in suite.keys:
+        return [""] * len(suite)
+    c = suite.keys.index(cat)
+    table = suite.values[c] + [""]  # Index -1 (leer) -> ""
+    return [table[i] for i in suite.rows[:, c].tolist()]
+
+
 def import_from_csv(
     filepath: str,
     return_names: bool = False,  # bleibt erhalten, wird aber ignoriert (immer 4 Rückgabewerte)
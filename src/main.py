@@ -2,7 +2,8 @@ import sys
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QSplitter, QTreeView, QTableWidget, QTableWidgetItem,
     QStatusBar, QMenuBar, QFileDialog, QMessageBox, QMenu, QComboBox,
-    QGroupBox, QVBoxLayout, QHeaderView, QToolBar, QStyle, QInputDialog
+    QGroupBox, QVBoxLayout, QHeaderView, QToolBar, QStyle, QInputDialog,
+    QLabel, QSpinBox
 )
 import api_client
 from PySide6.QtGui import QStandardItem, QAction, QStandardItemModel
@@ -21,6 +22,7 @@ from rules.exclude_rule import ExcludeRule
 
 from rules.dependency_rule_dialog import DependencyRuleDialog
 from rules.dependency_rule import DependencyRule
+from rules import engine as rule_engine
 
 from project_handler import save_project, load_project
 
@@ -68,6 +70,10 @@ class MainWindow(QMainWindow):
         remove_testcase_action.triggered.connect(self.remove_selected_testcase_column)
         new_testcase_action = edit_menu.addAction("Neuer Testfall")
         new_testcase_action.triggered.connect(self.add_testcase_column)
+        minimize_action = edit_menu.addAction("Testfälle minimieren")
+        minimize_action.triggered.connect(self.minimize_testcases)
+        complete_action = edit_menu.addAction("Abdeckung vervollständigen")
+        complete_action.triggered.connect(self.complete_coverage)
 
         # Regeln-Menü
         rules_menu = menu_bar.addMenu("Regeln")
@@ -92,6 +98,13 @@ class MainWindow(QMainWindow):
         btn_orth.triggered.connect(self.generate_orthogonal)
         toolbar.addAction(btn_orth)
 
+        # Interaktionsstärke für Orthogonal (2 = paarweise, 3 = 3-wise, ...)
+        toolbar.addWidget(QLabel(" Stärke: "))
+        self.strength_spin = QSpinBox()
+        self.strength_spin.setRange(1, 6)
+        self.strength_spin.setValue(2)
+        toolbar.addWidget(self.strength_spin)
+
         # Splitter
         splitter = QSplitter(Qt.Horizontal, self)
 
@@ -475,21 +488,16 @@ class MainWindow(QMainWindow):
                 self.rule_names[col-1] = new_name.strip()
                 self.model.setHeaderData(col, Qt.Horizontal, new_name.strip())
 
+    def compiled_rules(self) -> rule_engine.RuleSet:
+        """Aktive Regeln (Exclude + Dependency), kompiliert wie im Web-Backend (rules/engine.py)."""
+        return rule_engine.from_objects(self.rules)
+
     def apply_rules(self, testcases: list[dict]) -> list[dict]:
-        """Wendet alle Regeln (Exclude + Dependency) auf die generierten Testfälle an."""
-        result = []
-        for tc in testcases:
-            valid = True
-            for rule in self.rules:
-                if hasattr(rule, "conditions"):  # ExcludeRule
-                    if not rule.check(tc):
-                        valid = False
-                        break
-                elif isinstance(rule, DependencyRule):
-                    tc = rule.apply(tc)  # verändert den Testfall
-            if valid:
-                result.append(tc)
-        return result
+        """
+        Verwirft Testfälle, die eine Regel verletzen (Exclude: alle Bedingungen erfüllt;
+        Dependency: Wenn-Wert gesetzt, Dann-Wert nicht) – dieselbe Semantik wie im Web-Backend.
+        """
+        return self.compiled_rules().filter(testcases)
     
     #    Regel Löschen
     def remove_rule(self):
@@ -543,6 +551,16 @@ class MainWindow(QMainWindow):
             status[cat_item.text()] = cat_item.child(0).data(Qt.UserRole)
 
         # Testfälle
+        testcases, testcase_names = self.table_testcases()
+
+        file_path, _ = QFileDialog.getSaveFileName(self, "Testfälle exportieren", "", "CSV Dateien (*.csv)")
+        if not file_path:
+            return
+        csv_handler.export_to_csv(file_path, cats, status, testcases, testcase_names)
+        self.statusBar().showMessage(f"CSV exportiert: {file_path}")
+
+    def table_testcases(self) -> tuple[list[dict], list[str]]:
+        """Testfälle und ihre Namen aus der Tabelle (eine Spalte je Testfall)."""
         testcases = []
         testcase_names = []
         for col in range(self.table_widget.columnCount()):
@@ -555,12 +573,49 @@ class MainWindow(QMainWindow):
             testcases.append(tc)
             header_item = self.table_widget.horizontalHeaderItem(col)
             testcase_names.append(header_item.text() if header_item else f"Testfall {col+1}")
+        return testcases, testcase_names
 
-        file_path, _ = QFileDialog.getSaveFileName(self, "Testfälle exportieren", "", "CSV Dateien (*.csv)")
-        if not file_path:
+    def minimize_testcases(self):
+        """Entfernt Testfälle, ohne die t-Wege-Abdeckung (Stärke aus der Toolbar) zu verringern."""
+        testcases, testcase_names = self.table_testcases()
+        if not testcases:
+            QMessageBox.information(self, "Info", "Keine Testfälle vorhanden.")
             return
-        csv_handler.export_to_csv(file_path, cats, status, testcases, testcase_names)
-        self.statusBar().showMessage(f"CSV exportiert: {file_path}")
+        kept, stats = orthogonal.minimize(testcases, strength=self.strength_spin.value())
+        self.display_testcases_with_names(kept, [testcase_names[i] for i in stats["kept"]])
+        self.statusBar().showMessage(
+            f"Minimiert: {stats['original_size']} → {stats['size']} Testfälle (−{stats['reduction']} %), "
+            f"{stats['tuples']} Tupel weiterhin abgedeckt"
+        )
+
+    def complete_coverage(self):
+        """
+        Ergänzt die (von Hand bearbeiteten) Testfälle der Tabelle um die Testfälle, die für die
+        t-Wege-Abdeckung (Stärke aus der Toolbar) noch fehlen. Vorhandene Werte bleiben unverändert;
+        Werte, die es im Baum nicht (mehr) gibt, werden durch die bei der Abdeckung angenommenen
+        ersetzt. Testfälle, die eine Regel verletzen, bleiben stehen, zählen aber nicht zur Abdeckung.
+        """
+        cats = self.get_categories_from_tree()
+        if not cats:
+            QMessageBox.warning(self, "Warnung", "Keine Kategorien im Baum gefunden.")
+            return
+        testcases, testcase_names = self.table_testcases()
+        suite, stats = orthogonal.extend(cats, testcases, strength=self.strength_spin.value(),
+                                         forbidden=self.compiled_rules().forbidden_pairs(cats))
+        kept = stats["kept"]
+        filled = list(testcases)
+        for pos, tc in zip(kept, suite[:len(kept)]):
+            filled[pos] = {**testcases[pos], **tc}
+        added = self.apply_rules(suite[len(kept):])
+        invalid = len(testcases) - len(kept)
+        note = f", {invalid} Testfälle verletzen Regeln und zählen nicht zur Abdeckung" if invalid else ""
+        if not added and filled == testcases:
+            self.statusBar().showMessage(f"Abdeckung bereits vollständig{note}")
+            return
+        names = testcase_names + [f"Testfall {len(testcases) + i + 1}" for i in range(len(added))]
+        self.display_testcases_with_names(filled + added, names)
+        self.update_rule_columns()
+        self.statusBar().showMessage(f"Abdeckung vervollständigt: {len(added)} Testfälle ergänzt{note}")
 
     def import_csv(self):
         file_path, _ = QFileDialog.getOpenFileName(self, "Testfälle importieren", "", "CSV Dateien (*.csv)")
@@ -839,21 +894,22 @@ class MainWindow(QMainWindow):
     # ---------------- Kombinatorik ----------------
     def generate_all_combinations(self):
         cats = self.get_categories_from_tree()
-        tcs = all_combinations.generate(cats)
+        tcs = all_combinations.generate(cats, self.compiled_rules().forbidden_pairs(cats))
         tcs = self.apply_rules(tcs)  # NEU
         self.display_testcases(tcs)
         self.update_rule_columns()
 
     def generate_each_choice(self):
         cats = self.get_categories_from_tree()
-        tcs = each_choice.generate(cats)
+        tcs = each_choice.generate(cats, self.compiled_rules().forbidden_pairs(cats))
         tcs = self.apply_rules(tcs)  # NEU
         self.display_testcases(tcs)
         self.update_rule_columns()
 
     def generate_orthogonal(self):
         cats = self.get_categories_from_tree()
-        tcs = orthogonal.generate(cats)
+        tcs = orthogonal.generate(cats, strength=self.strength_spin.value(),
+                                  forbidden=self.compiled_rules().forbidden_pairs(cats))
         tcs = self.apply_rules(tcs)  # NEU
         self.display_testcases(tcs)
         self.update_rule_columns()
@@ -0,0 +1,145 @@
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from combinatorics.suite import MISSING, Suite
+
+# Schlüssel im Arbeitsspeicher (8 Byte Hash + 4 Byte je Kategorie), danach wird ein sortierter Lauf auf die Platte geschrieben
+_MEMORY_KEYS = 4_000_000
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    """splitmix64-Finalizer (vektorisiert, Überlauf modulo 2^64 gewollt)."""
+    h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return (h ^ (h >> np.uint64(31))) & _MASK64
+
+
+class SeenRows:
+    """
+    Menge bereits ausgegebener Testfälle für die Deduplikation großer Suiten.
+    Jeder Testfall wird über eine eigene Wertetabelle nummeriert (damit Blöcke mit unterschiedlichen
+    Wertetabellen vergleichbar bleiben) und zusätzlich zu einem 64-Bit-Hash dieser Nummern. Gesucht
+    wird per Binärsuche über die Hashes; ein Treffer zählt erst, wenn die vollständige Zeile
+    übereinstimmt – Kollisionen verwerfen also keinen Testfall.
+    Bis `memory_keys` Zeilen liegen im Speicher in sortierten Stufen, die sich wie ein Binärzähler
+    zusammenfügen (je Zeile amortisiert O(log n)), danach als sortierte Läufe in temporären Dateien
+    (Memory-Map) – der Speicherbedarf bleibt so unabhängig von der Größe der Suite.
+    """
+
+    def __init__(self, memory_keys: int = _MEMORY_KEYS, directory: Optional[str] = None):
+        self.memory_keys = memory_keys
+        self.directory = directory
+        self._ids: Dict[str, Dict[str, int]] = {}
+        # je Stufe/Lauf: (Hashes sortiert, Zeilen in derselben Reihenfolge); Stufen nach Größe absteigend
+        self._levels: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._runs: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self.count = 0
+
+    def __enter__(self) -> "SeenRows":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Gibt die temporären Dateien frei."""
+        self._runs = []
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+    @property
+    def spilled(self) -> int:
+        """Anzahl der auf die Platte geschriebenen Läufe."""
+        return len(self._runs)
+
+    def encode(self, suite: Suite) -> np.ndarray:
+        """Zeilen als eigene Wertnummern (uint32, 0 = leer) in der Reihenfolge von suite.keys."""
+        out = np.zeros((len(suite), len(suite.keys)), dtype=np.uint32)
+        for c, key in enumerate(suite.keys):
+            ids = self._ids.setdefault(key, {})
+            relabel = np.array([ids.setdefault(v, len(ids) + 1) for v in suite.values[c]] + [0], dtype=np.uint32)
+            col = suite.rows[:, c].astype(np.int64)
+            out[:, c] = relabel[np.where(col == MISSING, len(relabel) - 1, col)]
+        return out
+
+    @staticmethod
+    def hashes(rows: np.ndarray) -> np.ndarray:
+        """64-Bit-Hash je Zeile aus encode()."""
+        h = np.full(len(rows), np.uint64(rows.shape[1]), dtype=np.uint64)
+        for c in range(rows.shape[1]):
+            h = _mix(h ^ (rows[:, c].astype(np.uint64) + np.uint64(c << 32)))
+        return h
+
+    def first(self, suite: Suite, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Maske der Testfälle (innerhalb von `mask`), die noch nicht vorkamen – auch nicht weiter vorn
+        im selben Block – und merkt sie sich.
+        """
+        mask = np.ones(len(suite), dtype=bool) if mask is None else mask.copy()
+        idx = np.flatnonzero(mask)
+        if not len(idx):
+            return mask
+        rows = self.encode(suite[idx])
+        # innerhalb des Blocks exakt über die Zeilen-Bytes
+        _, first = np.unique(np.ascontiguousarray(rows).view(np.dtype((np.void, rows.itemsize * rows.shape[1]))),
+                             return_index=True)
+        new = np.zeros(len(idx), dtype=bool)
+        new[first] = True
+        h = self.hashes(rows)
+        new[new] &= ~self._contains(h[new], rows[new])
+        mask[idx] = new
+        self._add(h[new], rows[new])
+        return mask
+
+    def _contains(self, h: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        hit = np.zeros(len(h), dtype=bool)
+        for run_h, run_rows in self._levels + self._runs:
+            if not len(run_h):
+                continue
+            lo = np.searchsorted(run_h, h, side="left")
+            hi = np.searchsorted(run_h, h, side="right")
+            # Hash-Treffer erst mit der vollständigen Zeile bestätigen (gleicher Hash: meist genau eine)
+            cand = np.flatnonzero((hi > lo) & ~hit)
+            same = (np.asarray(run_rows[lo[cand]]) == rows[cand]).all(axis=1)
+            hit[cand[same]] = True
+            for i in cand[~same & (hi[cand] - lo[cand] > 1)]:  # Kollision: übrige Zeilen gleichen Hashs
+                hit[i] = bool((np.asarray(run_rows[lo[i]:hi[i]]) == rows[i]).all(axis=1).any())
+        return hit
+
+    def _add(self, h: np.ndarray, rows: np.ndarray) -> None:
+        if not len(h):
+            return
+        self.count += len(h)
+        order = np.argsort(h, kind="stable")
+        self._levels.append((h[order], rows[order]))
+        while len(self._levels) > 1 and 2 * len(self._levels[-1][0]) >= len(self._levels[-2][0]):
+            self._levels.append(self._merge([self._levels.pop(), self._levels.pop()]))
+        if sum(len(level[0]) for level in self._levels) >= self.memory_keys:
+            self._spill()
+
+    @staticmethod
+    def _merge(levels: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        h = np.concatenate([level[0] for level in levels])
+        rows = np.concatenate([level[1] for level in levels])
+        order = np.argsort(h, kind="stable")
+        return h[order], rows[order]
+
+    def _spill(self) -> None:
+        """Speicherinhalt sortiert als neuen Lauf auf die Platte schreiben."""
+        if self._tmp is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="tanos-dedup-", dir=self.directory)
+        h, rows = self._merge(self._levels)
+        run = []
+        for name, array in (("hash", h), ("rows", rows)):
+            path = os.path.join(self._tmp.name, f"run{len(self._runs)}-{name}.npy")
+            np.save(path, array, allow_pickle=False)
+            run.append(np.load(path, mmap_mode="r"))
+        self._runs.append((run[0], run[1]))
+        self._levels = []
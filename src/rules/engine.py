@@ -0,0 +1,318 @@
+import json
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from combinatorics import constraints
+from combinatorics.suite import Suite
+
+from .dedup import SeenRows
+
+# Obergrenze der aufgefächerten Testfälle je Schritt der Combine-Stufe
+_FAN_OUT_WINDOW = 65536
+
+# Ausschlussbedingung: alle (Kategorie, erlaubte Werte) müssen zutreffen, dann entfällt der Testfall
+Condition = Tuple[Tuple[str, FrozenSet[str]], ...]
+# (Wenn-Kategorie, Wenn-Wert, Dann-Kategorie, Dann-Wert)
+Dependency = Tuple[str, str, str, str]
+# (Wenn-Kategorie, Wenn-Wert, Zielkategorie, [Zielwerte])
+Combine = Tuple[str, str, str, List[str]]
+
+
+class RuleSet:
+    """
+    Kompilierte Geschäftsregeln eines Projekts – gemeinsam für Web-Backend und Desktop:
+    - exclude:    Testfall entfällt, wenn alle Bedingungen zutreffen (Kategorie hat einen der Werte)
+    - dependency: Testfall entfällt, wenn Wenn-Wert gesetzt, der Dann-Wert aber nicht
+    - combine:    Testfall wird je Zielwert aufgefächert (fan_out), Status „combined:…“
+    Die Regeln sind nach (Kategorie, Wert) ihres Auslösers indiziert: ein Testfall prüft nur die
+    Regeln, die seine Werte auslösen können; ein Block (Suite) nur die, deren Auslöser darin vorkommt.
+    """
+
+    def __init__(
+        self,
+        exclude: Sequence[Condition] = (),
+        dependency: Sequence[Dependency] = (),
+        combine: Sequence[Combine] = (),
+        combine_ids: Sequence[Optional[int]] = (),
+    ):
+        self.exclude: List[Condition] = [tuple((c, frozenset(vs)) for c, vs in cond) for cond in exclude if cond]
+        self.dependency: List[Dependency] = list(dependency)
+        # combine_ids: optionale Kennungen der Combine-Regeln (z. B. Rule.id), gleiche Reihenfolge wie `combine`
+        ids = list(combine_ids) + [None] * (len(combine) - len(combine_ids))
+        self.combine: List[Combine] = [r for r in combine if r[3]]
+        self.combine_ids: List[Optional[int]] = [i for r, i in zip(combine, ids) if r[3]]
+        # (Kategorie, Wert) -> Regeln, die dieser Wert auslöst; Exclude über seine erste Bedingung
+        self.index: Dict[Tuple[str, str], List[Tuple[str, int]]] = {}
+        for r, cond in enumerate(self.exclude):
+            cat, values = cond[0]
+            for v in values:
+                self.index.setdefault((cat, v), []).append(("exclude", r))
+        for r, (cat, value, _, _) in enumerate(self.dependency):
+            self.index.setdefault((cat, value), []).append(("dependency", r))
+        self.combine_index: Dict[Tuple[str, str], List[int]] = {}
+        for r, (cat, value, _, _) in enumerate(self.combine):
+            self.combine_index.setdefault((cat, value), []).append(r)
+
+    def to_json(self) -> str:
+        """Regelsatz als JSON (Schnappschuss je Generation, siehe from_json)."""
+        return json.dumps({
+            "exclude": [[[c, sorted(vs)] for c, vs in cond] for cond in self.exclude],
+            "dependency": [list(r) for r in self.dependency],
+            "combine": [[c, v, t, list(vs)] for c, v, t, vs in self.combine],
+            "combine_ids": self.combine_ids,
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "RuleSet":
+        data = json.loads(text)
+        return cls([tuple((c, vs) for c, vs in cond) for cond in data.get("exclude", [])],
+                   [tuple(r) for r in data.get("dependency", [])],
+                   [(c, v, t, list(vs)) for c, v, t, vs in data.get("combine", [])],
+                   data.get("combine_ids", []))
+
+    def __len__(self) -> int:
+        return len(self.exclude) + len(self.dependency) + len(self.combine)
+
+    # --- einzelne Testfälle ({Kategorie: Wert}) ---
+
+    def violates(self, case: Dict[str, str]) -> bool:
+        """True, wenn eine Exclude- oder Dependency-Regel den Testfall verwirft."""
+        for key in case.items():
+            for kind, r in self.index.get(key, ()):
+                if kind == "exclude":
+                    if all(case.get(c) in vs for c, vs in self.exclude[r]):
+                        return True
+                else:
+                    _, _, then_cat, then_val = self.dependency[r]
+                    if case.get(then_cat) != then_val:
+                        return True
+        return False
+
+    def fan_out(self, case: Dict[str, str]) -> Iterator[Dict[str, str]]:
+        """Je passender Combine-Regel (Reihenfolge der Regeln) eine Kopie je Zielwert, sonst der Testfall selbst."""
+        hits = sorted(r for key in case.items() for r in self.combine_index.get(key, ()))
+        if not hits:
+            yield case
+            return
+        for r in hits:
+            _, _, target, values = self.combine[r]
+            for tv in values:
+                clone = dict(case)
+                clone[target] = tv
+                yield clone
+
+    def status(self, case: Dict[str, str]) -> str:
+        """'combined:<Kategorie>=<Wert>' für die erste Combine-Regel, die den Testfall erklärt, sonst 'ok'."""
+        for r in sorted(r for key in case.items() for r in self.combine_index.get(key, ())):
+            _, _, target, values = self.combine[r]
+            if case.get(target) in values:
+                return f"combined:{target}={case.get(target)}"
+        return "ok"
+
+    def status_codes(self, suite: Suite) -> np.ndarray:
+        """
+        Je Testfall die erste Combine-Regel (Index in `combine`), die ihn erklärt – wie status(),
+        aber spaltenweise für einen ganzen Block; -1 = 'ok'.
+        """
+        codes = np.full(len(suite), -1, dtype=np.int64)
+        for r, (if_cat, if_val, target, values) in enumerate(self.combine):
+            hit = (codes == -1) & _member(suite, if_cat, (if_val,)) & _member(suite, target, values)
+            codes[hit] = r
+        return codes
+
+    def filter(self, cases: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Testfälle ohne Regelverstoß (Reihenfolge bleibt)."""
+        if isinstance(cases, Suite):
+            return list(cases[self.mask(cases)])
+        return [case for case in cases if not self.violates(case)]
+
+    # --- Blöcke (Suite) ---
+
+    def mask(self, suite: Suite) -> np.ndarray:
+        """
+        Boolesche Maske der Testfälle ohne Regelverstoß. Spaltenweise: je ausgelöster Regel ein
+        Lookup der Wertindizes in einer Wertetabelle – Regeln, deren Auslöser im Block nicht
+        vorkommt, kosten nichts.
+        """
+        ok = np.ones(len(suite), dtype=bool)
+        if not len(suite):
+            return ok
+        for kind, r in self._triggered(suite):
+            if kind == "exclude":
+                hit = np.ones(len(suite), dtype=bool)
+                for cat, values in self.exclude[r]:
+                    hit &= _member(suite, cat, values)
+            else:
+                if_cat, if_val, then_cat, then_val = self.dependency[r]
+                hit = _member(suite, if_cat, (if_val,)) & ~_member(suite, then_cat, (then_val,))
+            ok &= ~hit
+        return ok
+
+    def fan_out_suite(self, suite: Suite) -> Suite:
+        """
+        Wie fan_out für einen ganzen Block: Kopien in der Reihenfolge (Testfall, Regel, Zielwert);
+        Zielwerte, die die Wertetabelle nicht kennt, werden angehängt.
+        """
+        rules = [r for r, (c, v, t, _) in enumerate(self.combine)
+                 if c in suite.keys and t in suite.keys and suite.value_index(c, v) is not None]
+        if not rules or not len(suite):
+            return suite
+        src, rule, target = [], [], []
+        matched = np.zeros(len(suite), dtype=bool)
+        for n, r in enumerate(rules):
+            if_cat, if_val, _, values = self.combine[r]
+            hit = np.flatnonzero(_member(suite, if_cat, (if_val,)))
+            matched[hit] = True
+            for j in range(len(values)):
+                src.append(hit)
+                rule.append(np.full(len(hit), n))
+                target.append(np.full(len(hit), j))
+        keep = np.flatnonzero(~matched)
+        src.append(keep)
+        rule.append(np.full(len(keep), len(rules)))
+        target.append(np.zeros(len(keep), dtype=np.int64))
+        src, rule, target = np.concatenate(src), np.concatenate(rule), np.concatenate(target)
+        order = np.lexsort((target, rule, src))
+        src, rule, target = src[order], rule[order], target[order]
+        codes = [[suite.add_value(self.combine[r][2], tv) for tv in self.combine[r][3]] for r in rules]
+        rows = suite.rows[src].copy()
+        for n, r in enumerate(rules):
+            sel = rule == n
+            rows[sel, suite.keys.index(self.combine[r][2])] = np.array(codes[n], dtype=rows.dtype)[target[sel]]
+        return suite.like(rows)
+
+    def apply(self, suites: Iterable[Suite], unique_input: bool = False, fan_out: bool = True) -> Iterator[Suite]:
+        """
+        Regelstufe der Generierung, lazy je Block (Reihenfolge bleibt erhalten):
+        1) COMBINE (fan-out; entfällt bei fan_out=False) – in Fenstern, sodass je Schritt höchstens
+           etwa _FAN_OUT_WINDOW aufgefächerte Testfälle entstehen,
+        2) EXCLUDE/DEPENDENCY per Maske,
+        3) exakte Deduplikation (dedup.SeenRows: Suche über 64-Bit-Hashes, Treffer per ganzer Zeile
+           bestätigt, ab einer Schwelle auf der Platte) – entfällt bei `unique_input` (Eingabe ohne
+           Duplikate) ohne Combine-Fan-out, dann bleibt der Speicherbedarf unabhängig von der Anzahl
+           der Testfälle.
+        """
+        fan_out = fan_out and bool(self.combine)
+        dedup = fan_out or not unique_input
+        # höchstens so viele Kopien entstehen aus einem Testfall
+        expansion = max(1, sum(len(values) for _, _, _, values in self.combine)) if fan_out else 1
+        step = max(1, _FAN_OUT_WINDOW // expansion)
+        with SeenRows() as seen:
+            for block in suites:
+                for lo in range(0, len(block), step):
+                    piece = block if len(block) <= step else block[lo:lo + step]
+                    if fan_out:
+                        piece = self.fan_out_suite(piece)
+                    ok = self.mask(piece)
+                    if dedup:
+                        ok = seen.first(piece, ok)
+                    if ok.any():
+                        yield piece if ok.all() else piece[ok]
+
+    def _triggered(self, suite: Suite) -> List[Tuple[str, int]]:
+        """Regeln, deren Auslöser (Kategorie, Wert) im Block vorkommt."""
+        out: List[Tuple[str, int]] = []
+        for c, key in enumerate(suite.keys):
+            present = np.flatnonzero(np.bincount(suite.rows[:, c].astype(np.int64) + 1)[1:])
+            for i in present.tolist():
+                out.extend(self.index.get((key, suite.values[c][i]), ()))
+        return sorted(set(out))
+
+    # --- Generatoren ---
+
+    def forbidden_pairs(self, categories: Dict[str, List[str]]) -> List[constraints.ForbiddenPair]:
+        """
+        Regeln als verbotene Wertepaare für die Generatoren (siehe constraints.from_rules).
+        Ausschlüsse über zwei Kategorien ergeben je Wertekombination ein Paar; andere Ausschlüsse
+        bleiben der Regelprüfung (filter/mask) vorbehalten.
+        """
+        return constraints.from_rules(categories, self._exclude_pairs(), self.dependency, self.combine)
+
+    def _exclude_pairs(self) -> List[Tuple[str, str, str, str]]:
+        pairs = []
+        for cond in self.exclude:
+            if len(cond) == 2:
+                (a, avs), (b, bvs) = cond
+                pairs += [(a, av, b, bv) for av in sorted(avs) for bv in sorted(bvs)]
+        return pairs
+
+    # --- Prüfung vor der Generierung ---
+
+    def check(self, categories: Dict[str, List[str]], pairs: bool = True, max_pairs: int = 100) -> Dict:
+        """
+        Widersprüche in den Regeln finden, ohne etwas zu generieren (Constraint-Propagation über die
+        verbotenen Wertepaare):
+        - empty_categories: Kategorien ohne möglichen Wert – jede Generierung bliebe leer (ok=False)
+        - dead_values: Werte, die in keinem gültigen Testfall vorkommen können
+        - unsatisfiable_dependencies: Abhängigkeiten, deren Wenn-Wert dadurch nie vorkommt
+          (z. B. Kette A→B→C, deren Ende ausgeschlossen ist)
+        - uncoverable_pairs: erlaubte Wertepaare, die wegen einer dritten Kategorie nie gemeinsam
+          vorkommen (nur mit pairs=True; höchstens max_pairs, Anzahl in uncoverable_total)
+        Grundlage sind dieselben verbotenen Wertepaare, mit denen generiert wird (forbidden_pairs),
+        dazu Ausschlüsse über eine Kategorie. Ausschlüsse über mehr als zwei Kategorien bleiben außen
+        vor – gemeldete Probleme sind sicher, die Liste ist nicht vollständig.
+        """
+        keys = list(categories)
+        names = [(k, v) for k in keys for v in categories[k]]
+        cons = (constraints.build(categories, self.forbidden_pairs(categories))
+                or constraints.Constraints([len(categories[k]) for k in keys]))
+        for cond in self.exclude:
+            if len(cond) == 1 and cond[0][0] in categories:
+                cat, values = cond[0]
+                c = keys.index(cat)
+                for i, v in enumerate(categories[cat]):
+                    if v in values:
+                        cons.alive[cons.offsets[c] + i] = False
+        cons.propagate()
+        implied = cons.close_pairs() if pairs else np.zeros((0, 0), dtype=bool)
+
+        id_of = {name: i for i, name in enumerate(names)}
+        empty = [k for c, k in enumerate(keys) if not cons.alive[cons.block(c)].any()]
+        broken = [list(d) for d in self.dependency
+                  if (d[0], d[1]) in id_of and not cons.alive[id_of[(d[0], d[1])]]]
+        if pairs:
+            implied &= cons.alive[:, None] & cons.alive[None, :]  # tote Werte stehen in dead_values
+        xs, ys = np.nonzero(np.triu(implied))
+        return {
+            "ok": not empty,
+            "empty_categories": empty,
+            "dead_values": [list(names[i]) for i in np.flatnonzero(~cons.alive)],
+            "unsatisfiable_dependencies": broken,
+            "uncoverable_pairs": [list(names[x] + names[y]) for x, y in zip(xs[:max_pairs], ys[:max_pairs])],
+            "uncoverable_total": int(len(xs)),
+        }
+
+def _member(suite: Suite, cat: str, values: Iterable[str]) -> np.ndarray:
+    """Testfälle, deren Wert in Kategorie `cat` zu `values` gehört (fehlende Kategorie: keiner)."""
+    if cat not in suite.keys:
+        return np.zeros(len(suite), dtype=bool)
+    c = suite.keys.index(cat)
+    table = np.zeros(len(suite.values[c]) + 1, dtype=bool)  # letzter Eintrag: MISSING (-1)
+    for v in values:
+        i = suite.value_index(cat, v)
+        if i is not None:
+            table[i] = True
+    return table[suite.rows[:, c]]
+
+
+def from_pairs(
+    exclude: Sequence[Tuple[str, str, str, str]] = (),
+    dependency: Sequence[Dependency] = (),
+    combine: Sequence[Combine] = (),
+    combine_ids: Sequence[Optional[int]] = (),
+) -> RuleSet:
+    """RuleSet aus Regeln mit Kategorienamen wie in der Datenbank: exclude als (A, a, B, b)."""
+    return RuleSet([((a, (av,)), (b, (bv,))) for a, av, b, bv in exclude], dependency, combine, combine_ids)
+
+
+def from_objects(rules: Iterable[object]) -> RuleSet:
+    """RuleSet aus den Regelobjekten der Desktop-Anwendung (ExcludeRule, DependencyRule)."""
+    exclude: List[Condition] = []
+    dependency: List[Dependency] = []
+    for rule in rules:
+        if hasattr(rule, "conditions"):
+            exclude.append(tuple((c, frozenset(vs)) for c, vs in rule.conditions.items()))
+        elif hasattr(rule, "then_category"):
+            dependency.append((rule.if_category, rule.if_value, rule.then_category, rule.then_value))
+    return RuleSet(exclude, dependency)
@@ -4,3 +4,33 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+# Datei-Cache der Kombinatorik in Tests abschalten (einzelne Tests setzen ein eigenes Verzeichnis)
+os.environ.setdefault("TANOS_CACHE_DIR", "")
+
+import uuid
+
+import pytest
+
+
+@pytest.fixture
+def make_project():
+    """
+    Legt über die API ein Projekt mit Kategorien und Werten an:
+    make_project({"K0": ["v0", "v1"], ...}) -> (pid, {Kategorie: id}).
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+
+    def make(values_by_category):
+        pid = client.post("/projects", json={"name": f"Test-{uuid.uuid4().hex[:6]}"}).json()["id"]
+        cids = {}
+        for name, values in values_by_category.items():
+            cids[name] = client.post(f"/projects/{pid}/categories",
+                                     json={"name": name, "order_index": len(cids)}).json()["id"]
+            for v in values:
+                client.post(f"/categories/{cids[name]}/values", json={"value": v})
+        return pid, cids
+
+    return make
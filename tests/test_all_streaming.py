@@ -0,0 +1,51 @@
+import itertools
+import types
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from combinatorics import all_combinations
+
+client = TestClient(app)
+
+
+def test_iter_rows_is_lazy_and_compact():
+    cats = {f"K{i}": [str(j) for j in range(10)] for i in range(30)}  # 10^30 Kombinationen
+    rows = all_combinations.iter_rows(cats)
+    assert isinstance(rows, types.GeneratorType)
+    first = list(itertools.islice(rows, 3))
+    assert first == [(0,) * 30, (0,) * 29 + (1,), (0,) * 29 + (2,)]
+
+
+def test_iter_rows_matches_generate_with_rules():
+    cats = {"A": ["a1", "a2"], "B": ["b1", "b2", "b3"], "C": ["c1", "c2"]}
+    forbidden = [("A", "a1", "B", "b2"), ("B", "b3", "C", "c1")]
+    decoded = [
+        {k: cats[k][i] for k, i in zip(cats, row)}
+        for row in all_combinations.iter_rows(cats, forbidden)
+    ]
+    assert decoded == all_combinations.generate(cats, forbidden)
+
+
+def test_generate_all_with_limit_stops_early(make_project):
+    pid, _ = make_project({f"K{i}": [f"v{v}" for v in range(8)] for i in range(25)})
+
+    r = client.post(f"/projects/{pid}/generate", json={"strategy": "all", "limit": 7})
+    assert r.status_code == 200, r.text
+    gen = r.json()
+    assert gen["count"] == 7
+
+    r = client.get(f"/generations/{gen['generation_id']}/export/csv", params={"excel": False})
+    assert r.status_code == 200
+    lines = r.content.decode("utf-8-sig").splitlines()
+    assert len(lines) == 1 + 7
+    assert lines[1].startswith("v0;" * 24 + "v0;")
+
+
+def test_iter_suites_matches_iter_rows_in_bounded_blocks():
+    cats = {"A": ["a1", "a2", "a3"], "B": ["b1", "b2", "b3"], "C": ["c1", "c2"], "D": ["d1", "d2"]}
+    forbidden = [("A", "a1", "B", "b2"), ("B", "b3", "C", "c1"), ("A", "a3", "D", "d2")]
+    blocks = list(all_combinations.iter_suites(cats, forbidden, size=8))
+    assert all(len(b) <= 8 for b in blocks)
+    rows = [tuple(r) for b in blocks for r in b.rows.tolist()]
+    assert rows == list(all_combinations.iter_rows(cats, forbidden))
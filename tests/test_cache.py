@@ -0,0 +1,44 @@
+import os
+
+import numpy as np
+
+from combinatorics import cache, orthogonal
+
+
+def _cats(prefix):
+    return {f"{prefix}{c}": [f"{prefix}{c}-{v}" for v in range(n)] for c, n in enumerate([4, 3, 3, 2, 2])}
+
+
+def test_cached_suite_is_relabeled_for_same_shape(tmp_path, monkeypatch):
+    monkeypatch.setenv("TANOS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(orthogonal, "_MIN_CACHE_SECONDS", 0)
+    first = orthogonal.generate(_cats("A"))
+    assert len(os.listdir(tmp_path)) == 1
+
+    def no_search(*args, **kwargs):
+        raise AssertionError("IPOG darf bei Cache-Treffer nicht laufen")
+
+    monkeypatch.setattr(orthogonal, "_ipog", no_search)
+    second = orthogonal.generate(_cats("B"))
+    assert [[v[1:] for v in tc.values()] for tc in second] == [[v[1:] for v in tc.values()] for tc in first]
+
+
+def test_cache_key_depends_on_rules_and_strength():
+    cats = _cats("A")
+    keys, radices = orthogonal._index(cats)
+    cons = orthogonal._constraints.build(cats, [("A0", "A0-0", "A1", "A1-0")])
+    plain = cache.key(radices, 2, [], None)
+    assert plain == cache.key(radices, 2, [], None)
+    assert plain != cache.key(radices, 3, [], None)
+    assert plain != cache.key(radices, 2, [], cons)
+
+
+def test_broken_cache_entry_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.setenv("TANOS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(orthogonal, "_MIN_CACHE_SECONDS", 0)
+    cats = _cats("A")
+    expected = orthogonal.generate(cats)
+    (entry,) = tmp_path.iterdir()
+    entry.write_bytes(b"kaputt")
+    assert orthogonal.generate(cats) == expected
+    assert np.load(entry).ndim == 2  # neu geschrieben
@@ -0,0 +1,85 @@
+from itertools import combinations
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from combinatorics import all_combinations, each_choice, orthogonal
+from combinatorics.constraints import from_rules
+
+CATS = {
+    "Versandart": ["Standard", "Express", "Abholung"],
+    "Zone": ["Inland", "EU", "Welt"],
+    "Gewicht": ["500g", "1000g", "5kg"],
+    "Zahlung": ["Rechnung", "Karte"],
+}
+
+
+def _has_pair(tc, pair):
+    a_cat, a_val, b_cat, b_val = pair
+    return tc[a_cat] == a_val and tc[b_cat] == b_val
+
+
+def test_from_rules_translates_dependency_and_combine():
+    forbidden = from_rules(
+        CATS,
+        exclude=[("Versandart", "Abholung", "Zone", "Welt")],
+        dependency=[("Gewicht", "5kg", "Versandart", "Standard")],
+        combine=[("Zahlung", "Rechnung", "Zone", ["Inland", "EU"])],
+    )
+    assert ("Versandart", "Abholung", "Zone", "Welt") in forbidden
+    assert ("Gewicht", "5kg", "Versandart", "Express") in forbidden
+    assert ("Gewicht", "5kg", "Versandart", "Abholung") in forbidden
+    assert ("Gewicht", "5kg", "Versandart", "Standard") not in forbidden
+    assert ("Zahlung", "Rechnung", "Zone", "Welt") in forbidden
+
+
+def test_generators_never_emit_forbidden_pairs():
+    forbidden = from_rules(
+        CATS,
+        exclude=[("Versandart", "Abholung", "Zone", "Welt"), ("Zone", "Welt", "Zahlung", "Rechnung")],
+        dependency=[("Gewicht", "5kg", "Versandart", "Standard")],
+    )
+    valid = [tc for tc in all_combinations.generate(CATS) if not any(_has_pair(tc, p) for p in forbidden)]
+    assert all_combinations.generate(CATS, forbidden=forbidden) == valid
+
+    for suite in (each_choice.generate(CATS, forbidden=forbidden), orthogonal.generate(CATS, forbidden=forbidden)):
+        assert suite
+        assert not any(_has_pair(tc, p) for tc in suite for p in forbidden)
+
+
+def test_pairwise_with_constraints_covers_all_valid_pairs():
+    forbidden = from_rules(CATS, dependency=[("Gewicht", "5kg", "Versandart", "Standard")])
+    valid = all_combinations.generate(CATS, forbidden=forbidden)
+    suite = orthogonal.generate(CATS, forbidden=forbidden)
+    pairs = lambda rows: {(k1, tc[k1], k2, tc[k2]) for tc in rows for k1, k2 in combinations(CATS, 2)}
+    assert pairs(suite) == pairs(valid)
+    assert len(suite) < len(valid)
+
+
+def test_combine_with_new_target_values_forbids_nothing():
+    # Zielwert „Paypal“ gibt es in Zahlung nicht – er entsteht erst beim Fan-out
+    combine = [("Versandart", "Express", "Zahlung", ["Paypal"])]
+    assert from_rules(CATS, combine=combine) == []
+    # mehrere Regeln mit gleichem Auslöser: Zielwerte werden vereinigt statt A=a ganz zu verbieten
+    combine = [("Versandart", "Express", "Zahlung", ["Rechnung"]), ("Versandart", "Express", "Zahlung", ["Karte"])]
+    assert from_rules(CATS, combine=combine) == []
+    forbidden = from_rules(CATS, combine=[("Versandart", "Express", "Zone", ["Inland"])])
+    assert any(tc["Versandart"] == "Express" for tc in orthogonal.generate(CATS, forbidden=forbidden))
+
+
+def test_generate_endpoint_applies_rules_for_every_strategy(make_project):
+    client = TestClient(app)
+    pid, cids = make_project({"A": ["a1", "a2", "a3"], "B": ["b1", "b2", "b3"]})
+    client.post("/ui/rules/create", data={"pid": pid, "rtype": "exclude", "if_category_id": cids["A"],
+                                          "if_value": "a1", "then_category_id": cids["B"], "then_value": "b1"})
+    client.post("/ui/rules/create", data={"pid": pid, "rtype": "combine", "if_category_id": cids["A"],
+                                          "if_value": "a2", "then_category_id": cids["B"], "then_values": ["bX"]})
+    for strategy in ("all", "each", "pairwise", "prioritized"):
+        r = client.post(f"/projects/{pid}/generate", json={"strategy": strategy})
+        assert r.status_code == 200, r.text
+        cases = client.get(f"/generations/{r.json()['generation_id']}/testcases").json()
+        pairs = {(tc["assignments"]["A"], tc["assignments"]["B"]) for tc in cases}
+        assert ("a1", "b1") not in pairs
+        assert {b for a, b in pairs if a == "a2"} == {"bX"}  # Combine aufgefächert
+        if strategy == "all":
+            assert len(cases) == 2 + 1 + 3
@@ -0,0 +1,78 @@
+from itertools import combinations, product
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from combinatorics import coverage, orthogonal
+
+client = TestClient(app)
+
+
+def test_analyze_matches_brute_force_with_rules_and_missing_values():
+    cats = {"A": ["a0", "a1", "a2"], "B": ["b0", "b1"], "C": ["c0", "c1", "c2"], "D": ["d0", "d1"]}
+    forbidden = [("A", "a0", "B", "b1"), ("C", "c2", "D", "d0")]
+    suite = [
+        {"A": "a0", "B": "b0", "C": "c0", "D": "d0"},
+        {"A": "a1", "B": "b1", "C": "c2", "D": "d1"},
+        {"A": "a2", "B": "b0", "C": "alt", "D": "d1"},  # unbekannter Wert zählt nicht
+    ]
+    report = coverage.analyze(cats, coverage.encode(cats, suite), 3, forbidden, max_uncovered=1000)
+
+    def allowed(tc):
+        return not any(tc.get(a) == x and tc.get(b) == y for a, x, b, y in forbidden)
+
+    for t, key in ((2, "pairs"), (3, "tuples")):
+        total = covered = 0
+        for sub in combinations(cats, t):
+            for vals in product(*[cats[c] for c in sub]):
+                if not allowed(dict(zip(sub, vals))):
+                    continue
+                total += 1
+                covered += any(all(tc.get(c) == v for c, v in zip(sub, vals)) for tc in suite)
+        assert (report[key]["covered"], report[key]["total"]) == (covered, total)
+    assert report["uncovered_count"] == len(report["uncovered"]) == report["pairs"]["total"] - report["pairs"]["covered"]
+    assert report["pair_matrix"][0][1] == round(3 / 5, 4) and report["pair_matrix"][1][1] is None
+
+
+
+def test_pairs_made_impossible_by_rule_chain_do_not_count():
+    cats = {"A": ["a1", "a2"], "B": ["b1", "b2"], "C": ["c1", "c2"], "D": ["d1", "d2"]}
+    # A=a1 → C=c1, B=b1 → C=c2: a1/b1 ist nie abdeckbar, ohne direkt verboten zu sein
+    forbidden = [("A", "a1", "C", "c2"), ("B", "b1", "C", "c1")]
+    for t in (2, 3):
+        suite = orthogonal.generate(cats, t, forbidden=forbidden)
+        report = coverage.analyze(cats, coverage.encode(cats, suite), t, forbidden)
+        assert report["pairs"]["total"] == 6 * 4 - 2 - 1
+        assert report["tuples"]["ratio"] == 1.0 and report["uncovered"] == []
+
+def test_tracker_blockwise_matches_analyze():
+    cats = {f"K{i}": [f"v{j}" for j in range(3)] for i in range(5)}
+    forbidden = [("K0", "v0", "K1", "v1")]
+    rows = coverage.encode(cats, orthogonal.generate(cats, strength=3, forbidden=forbidden))
+    tracker = coverage.Tracker(cats, 3, forbidden)
+    for lo in range(0, len(rows), 7):
+        tracker.add(rows[lo:lo + 7])
+    assert tracker.report(50) == coverage.analyze(cats, rows, 3, forbidden, max_uncovered=50)
+    assert tracker.report()["tuples"]["ratio"] == 1.0
+
+
+def test_generation_stores_coverage_and_endpoint_reports_gaps(make_project, monkeypatch):
+    pid, _ = make_project({f"K{i}": [f"v{v}" for v in range(3)] for i in range(4)})
+    full = client.post(f"/projects/{pid}/generate", json={"strategy": "pairwise"}).json()
+    assert full["coverage_meta"]["coverage"]["pairs"]["ratio"] == 1.0
+
+    partial = client.post(f"/projects/{pid}/generate", json={"strategy": "each"}).json()
+    r = client.get(f"/generations/{partial['generation_id']}/coverage", params={"max_uncovered": 5})
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert report["pairs"]["total"] == 6 * 9 and report["pairs"]["covered"] == 6 * 3
+    assert report["uncovered_count"] == 36 and len(report["uncovered"]) == 5
+    assert report["categories"] == ["K0", "K1", "K2", "K3"]
+    assert client.get("/generations/999999/coverage").status_code == 404
+
+    gid = partial["generation_id"]
+    clamped = client.get(f"/generations/{gid}/coverage", params={"strength": 99})
+    assert clamped.status_code == 200 and clamped.json()["strength"] == 4
+    monkeypatch.setattr(coverage, "_MAX_TUPLES", 6 * 9 + 4 * 27 - 1)  # Paare + Tripel knapp zu viel
+    assert client.get(f"/generations/{gid}/coverage", params={"strength": 3}).status_code == 400
+    assert client.get(f"/generations/{gid}/coverage", params={"strength": 2}).status_code == 200
@@ -0,0 +1,43 @@
+import os
+from itertools import combinations
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PySide6")
+
+from PySide6.QtWidgets import QApplication
+
+import api_client
+import main as desktop
+from rules.exclude_rule import ExcludeRule
+
+CATS = {"A": ["a1", "a2"], "B": ["b1", "b2"], "C": ["c1", "c2"]}
+
+
+@pytest.fixture
+def window(monkeypatch):
+    ids = {name: i + 1 for i, name in enumerate(CATS)}
+    monkeypatch.setattr(api_client, "get_categories",
+                        lambda: [{"id": i, "name": name, "parent_id": None} for name, i in ids.items()])
+    monkeypatch.setattr(api_client, "get_values",
+                        lambda cid: [{"name": v} for v in CATS[list(ids)[cid - 1]]])
+    _app = QApplication.instance() or QApplication([])
+    win = desktop.MainWindow()
+    yield win
+    win.close()
+
+
+def test_complete_coverage_keeps_rows_behind_rule_violating_manual_case(window):
+    window.rules = [ExcludeRule({"A": ["a1"], "B": ["b1"]})]
+    window.display_testcases_with_names([{"A": "a1", "B": "b1", "C": "c1"}], ["Manuell"])
+    window.complete_coverage()
+
+    cases, names = window.table_testcases()
+    assert names[0] == "Manuell" and cases[0] == {"A": "a1", "B": "b1", "C": "c1"}
+    valid = cases[1:]
+    assert all(not (tc["A"] == "a1" and tc["B"] == "b1") for tc in valid)
+    covered = {(a, tc[a], b, tc[b]) for tc in valid for a, b in combinations(CATS, 2)}
+    needed = {(a, x, b, y) for a, b in combinations(CATS, 2) for x in CATS[a] for y in CATS[b]
+              if (a, x, b, y) != ("A", "a1", "B", "b1")}
+    assert covered == needed
@@ -0,0 +1,48 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from combinatorics import all_combinations, estimate, orthogonal
+from combinatorics.constraints import from_rules
+
+client = TestClient(app)
+
+
+def test_count_valid_matches_enumeration():
+    cats = {f"K{i}": [f"v{j}" for j in range(3)] for i in range(6)}
+    forbidden = from_rules(
+        cats,
+        exclude=[("K0", "v0", "K1", "v1"), ("K2", "v2", "K5", "v0")],
+        dependency=[("K3", "v1", "K4", "v2"), ("K4", "v2", "K0", "v1")],
+    )
+    assert estimate.count_valid(cats, forbidden) == len(all_combinations.generate(cats, forbidden=forbidden))
+
+
+def test_summarize_large_project_without_enumeration():
+    cats = {f"K{i}": [str(j) for j in range(6)] for i in range(40)}
+    forbidden = [(f"K{i}", "0", f"K{i + 1}", "1") for i in range(39)]
+    est = estimate.summarize(cats, forbidden)
+    assert est["product"] == 6 ** 40
+    assert 0 < est["valid"] < est["product"]
+    assert est["lower_bound"] == 36
+    assert est["lower_bound"] <= est["expected"]
+
+
+def test_summarize_bounds_pairwise_suite():
+    cats = {f"K{i}": [str(j) for j in range(4)] for i in range(8)}
+    est = estimate.summarize(cats)
+    size = len(orthogonal.generate(cats))
+    assert est["lower_bound"] == 16 <= size
+    assert est["expected"] >= est["lower_bound"]
+
+
+def test_estimate_endpoint_counts_rules(make_project):
+    pid, cids = make_project({"Versandart": ["A", "B", "C"], "Zone": ["A", "B", "C"]})
+    r = client.post("/ui/rules/create", data={
+        "pid": pid, "rtype": "exclude", "if_category_id": cids["Versandart"], "if_value": "A",
+        "then_category_id": cids["Zone"], "then_value": "C",
+    })
+    assert r.status_code == 200, r.text
+
+    r = client.get(f"/projects/{pid}/generate/estimate")
+    assert r.status_code == 200, r.text
+    assert r.json() == {"product": 9, "valid": 8, "lower_bound": 8, "expected": 8}
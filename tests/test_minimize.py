@@ -0,0 +1,38 @@
+from itertools import combinations
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from combinatorics import all_combinations, orthogonal
+
+client = TestClient(app)
+
+
+def _pairs(suite):
+    return {(a, tc[a], b, tc[b]) for tc in suite for a, b in combinations(sorted(tc), 2)}
+
+
+def test_minimize_keeps_pair_coverage_of_redundant_suite():
+    cats = {"A": ["a1", "a2", "a3"], "B": ["b1", "b2", "b3"], "C": ["c1", "c2"], "D": ["d1", "d2"]}
+    suite = all_combinations.generate(cats)
+    kept, stats = orthogonal.minimize(suite)
+    assert _pairs(kept) == _pairs(suite)
+    assert stats["original_size"] == 36 and stats["size"] == len(kept) < 15
+    assert [suite[i] for i in stats["kept"]] == kept  # ursprüngliche Reihenfolge
+
+
+def test_minimize_generation_endpoint_stores_new_generation(make_project):
+    pid, _ = make_project({f"K{i}": [f"v{v}" for v in range(3)] for i in range(3)})
+    source = client.post(f"/projects/{pid}/generate", json={"strategy": "all"}).json()
+
+    r = client.post(f"/generations/{source['generation_id']}/minimize")
+    assert r.status_code == 200, r.text
+    body = r.json()
+    stats = body["coverage_meta"]["minimize"]
+    assert stats["source_generation_id"] == source["generation_id"]
+    assert stats["original_size"] == 27 and 9 <= stats["size"] == body["count"] <= 12
+
+    before = [tc["assignments"] for tc in client.get(f"/generations/{source['generation_id']}/testcases").json()]
+    after = [tc["assignments"] for tc in client.get(f"/generations/{body['generation_id']}/testcases").json()]
+    assert _pairs(after) == _pairs(before)
+    assert client.post("/generations/999999/minimize").status_code == 404
@@ -1,3 +1,5 @@
+from itertools import combinations
+
 from combinatorics import all_combinations, each_choice, orthogonal
 
 def test_orthogonal_pairwise_covers_all_pairs_small():
@@ -29,3 +31,122 @@ def test_orthogonal_pairwise_covers_all_pairs_small():
     assert required_pairs.issubset(covered)
     assert len(suite) < len(all_combinations.generate(cats))
 
+
+def _covers_all_pairs(cats, suite):
+    keys = list(cats.keys())
+    for i, k1 in enumerate(keys):
+        for k2 in keys[i + 1:]:
+            seen = {(tc[k1], tc[k2]) for tc in suite}
+            if len(seen) != len(cats[k1]) * len(cats[k2]):
+                return False
+    return True
+
+def test_orthogonal_pairwise_large_project_without_full_product():
+    # 12 Kategorien à 5 Werte = 244 Mio. Kombinationen – darf nicht materialisiert werden
+    cats = {f"K{i}": [f"W{i}_{j}" for j in range(5)] for i in range(12)}
+    suite = orthogonal.generate(cats)
+    assert _covers_all_pairs(cats, suite)
+    assert 25 <= len(suite) < 100
+    assert all(set(tc.keys()) == set(cats.keys()) for tc in suite)
+
+def test_orthogonal_pairwise_mixed_sizes_and_single_values():
+    cats = {"A": ["a1", "a2"], "B": ["b1"], "C": ["c1", "c2", "c3"], "D": ["d1", "d2"]}
+    suite = orthogonal.generate(cats)
+    assert _covers_all_pairs(cats, suite)
+    assert len(suite) >= 6
+
+
+def test_uniform_shapes_use_optimal_orthogonal_array():
+    import time
+
+    for n_cats, n_vals in [(4, 3), (6, 5), (8, 7), (10, 9)]:
+        cats = {f"K{i}": [f"W{i}_{j}" for j in range(n_vals)] for i in range(n_cats)}
+        start = time.perf_counter()
+        suite = orthogonal.generate(cats)
+        assert time.perf_counter() - start < 0.5
+        assert len(suite) == n_vals * n_vals
+        assert _covers_all_pairs(cats, suite)
+
+
+def test_mixed_shape_reducible_to_orthogonal_array():
+    cats = {"A": list("abcd"), "B": list("efgh"), "C": list("ijk"), "D": list("lm"), "E": list("no")}
+    suite = orthogonal.generate(cats)
+    assert len(suite) == 16
+    assert _covers_all_pairs(cats, suite)
+
+
+def test_extend_keeps_existing_rows_and_covers_new_pairs():
+    cats = {"A": ["a1", "a2", "a3"], "B": ["b1", "b2", "b3"], "C": ["c1", "c2"], "D": ["d1", "d2", "d3"]}
+    old = orthogonal.generate(cats)
+    grown = dict(cats, B=cats["B"] + ["b4"], E=["e1", "e2"])
+    suite, stats = orthogonal.extend(grown, old)
+    assert [{k: tc[k] for k in cats} for tc in suite[: len(old)]] == old
+    assert _covers_all_pairs(grown, suite)
+    assert len(suite) < len(old) + len(orthogonal.generate(grown))
+
+
+def test_best_prefix_reports_coverage_and_stops_at_limit():
+    cats = {f"K{c}": [f"v{i}" for i in range(4)] for c in range(8)}
+    cases, stats = orthogonal.best_prefix(cats, 6)
+    assert len(cases) == stats["size"] == 6
+    assert stats["total"] == 28 * 16
+    covered = {(a, tc[a], b, tc[b]) for tc in cases for a in cats for b in cats if a < b}
+    assert stats["covered"] == len(covered)
+    assert 0 < stats["coverage"] < 100
+
+    full, stats = orthogonal.best_prefix(cats, 1000)
+    assert stats["coverage"] == 100.0
+    assert _covers_all_pairs(cats, full)
+
+
+def test_extend_completes_large_manual_suite_quickly():
+    import random
+    import time
+
+    rng = random.Random(0)
+    cats = {f"K{c}": [f"v{i}" for i in range(5)] for c in range(10)}
+    manual = [{k: rng.choice(v[:4]) for k, v in cats.items()} for _ in range(3000)]  # v4 fehlt überall
+    start = time.monotonic()
+    suite, stats = orthogonal.extend(cats, manual)
+    assert time.monotonic() - start < 1.0
+    assert suite[: len(manual)] == manual
+    assert _covers_all_pairs(cats, suite)
+    assert len(suite) - len(manual) <= 40
+
+
+def test_best_prefix_higher_strength_builds_only_n_rows(monkeypatch):
+    cats = {f"K{c}": [f"v{i}" for i in range(3)] for c in range(7)}
+
+    def no_full_suite(*args, **kwargs):
+        raise AssertionError("vollständige Suite erzeugt")
+
+    monkeypatch.setattr(orthogonal, "_generate_indexed", no_full_suite)
+    cases, stats = orthogonal.best_prefix(cats, 10, strength=3)
+    assert len(cases) == stats["size"] == 10 and 0 < stats["coverage"] < 100
+
+    full, stats = orthogonal.best_prefix(cats, 10_000, strength=3)
+    assert stats["coverage"] == 100.0
+    triples = {(a, tc[a], b, tc[b], c, tc[c]) for tc in full for a, b, c in combinations(cats, 3)}
+    assert len(triples) == 35 * 27
+
+
+def test_extend_reports_dropped_rule_violating_rows():
+    cats = {"A": ["a1", "a2"], "B": ["b1", "b2"], "C": ["c1", "c2"]}
+    forbidden = [("A", "a1", "B", "b1")]
+    manual = [{"A": "a2", "B": "b2", "C": "c2"}, {"A": "a1", "B": "b1", "C": "c1"}]
+    suite, stats = orthogonal.extend(cats, manual, forbidden=forbidden)
+    assert stats["kept"] == [0] and stats["added"] == len(suite) - 1
+    assert suite[0] == manual[0]
+    assert all((tc["A"], tc["B"]) != ("a1", "b1") for tc in suite)
+    covered = {(a, tc[a], b, tc[b]) for tc in suite for a, b in combinations(cats, 2)}
+    assert len(covered) == 3 * 4 - 1  # alle Paare außer dem verbotenen
+
+
+def test_best_prefix_ignores_pairs_a_rule_chain_makes_uncoverable():
+    cats = {"A": ["a1", "a2"], "B": ["b1", "b2"], "C": ["c1", "c2"]}
+    # A=a1 → C=c1, B=b1 → C=c2: a1 und b1 kommen nie gemeinsam vor, ohne direkt verboten zu sein
+    forbidden = [("A", "a1", "C", "c2"), ("B", "b1", "C", "c1")]
+    cases, stats = orthogonal.best_prefix(cats, 100, forbidden=forbidden)
+    assert stats["total"] == 12 - 2 - 1
+    assert stats["coverage"] == 100.0
+    assert all((tc["A"], tc["B"]) != ("a1", "b1") for tc in cases)
@@ -0,0 +1,35 @@
+from itertools import combinations
+
+from combinatorics import orthogonal, prioritized
+
+
+def _weighted_coverage(suite, weights):
+    covered = {(a, tc[a], b, tc[b]) for tc in suite for a, b in combinations(list(tc), 2)}
+    return sum(weights[a][x] * weights[b][y] for a, x, b, y in covered)
+
+
+def test_prioritized_covers_all_pairs():
+    cats = {"A": ["a1", "a2", "a3"], "B": ["b1", "b2"], "C": ["c1", "c2", "c3"], "D": ["d1", "d2"]}
+    suite = prioritized.generate(cats)
+    covered = {(a, tc[a], b, tc[b]) for tc in suite for a, b in combinations(cats, 2)}
+    assert covered == {(a, x, b, y) for a, b in combinations(cats, 2) for x in cats[a] for y in cats[b]}
+
+
+def test_prioritized_puts_heaviest_pairs_first():
+    cats = {f"K{c}": [f"v{i}" for i in range(4)] for c in range(6)}
+    weights = {k: {v: 1 for v in vals} for k, vals in cats.items()}
+    weights["K2"]["v3"] = 10
+    weights["K5"]["v1"] = 10
+    suite = prioritized.generate(cats, weights)
+    assert (suite[0]["K2"], suite[0]["K5"]) == ("v3", "v1")
+    baseline = orthogonal.generate(cats)
+    for n in (3, 6):
+        assert _weighted_coverage(suite[:n], weights) > _weighted_coverage(baseline[:n], weights)
+
+
+def test_prioritized_respects_forbidden_pairs():
+    cats = {"A": ["a1", "a2"], "B": ["b1", "b2"], "C": ["c1", "c2"]}
+    forbidden = [("A", "a1", "B", "b1")]
+    suite = prioritized.generate(cats, {"A": {"a1": 5}, "B": {"b1": 5}}, forbidden)
+    assert suite
+    assert not any(tc["A"] == "a1" and tc["B"] == "b1" for tc in suite)
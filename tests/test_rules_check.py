@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _project(make_project, rules):
+    pid, cids = make_project({"Versand": ["A", "B"], "Zone": ["A", "B"]})
+    for rtype, if_cat, if_val, then_cat, then_val in rules:
+        r = client.post("/ui/rules/create", data={
+            "pid": pid, "rtype": rtype, "if_category_id": cids[if_cat], "if_value": if_val,
+            "then_category_id": cids[then_cat], "then_value": then_val,
+        })
+        assert r.status_code == 200, r.text
+    return pid
+
+
+def test_check_endpoint_reports_dead_values(make_project):
+    pid = _project(make_project, [("exclude", "Versand", "A", "Zone", "A"), ("exclude", "Versand", "A", "Zone", "B")])
+    r = client.get(f"/projects/{pid}/rules/check")
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["ok"] and body["dead_values"] == [["Versand", "A"]]
+
+    r = client.post("/ui/rules/check", data={"pid": pid})
+    assert r.status_code == 200 and "Versand=A" in r.text
+
+
+def test_unsatisfiable_rules_fail_before_generation(make_project):
+    pid = _project(make_project, [
+        ("dependency", "Versand", "A", "Zone", "A"), ("dependency", "Versand", "B", "Zone", "A"),
+        ("exclude", "Zone", "A", "Versand", "A"), ("exclude", "Zone", "A", "Versand", "B"),
+    ])
+    assert client.get(f"/projects/{pid}/rules/check").json()["empty_categories"] == ["Versand", "Zone"]
+
+    r = client.post(f"/projects/{pid}/generate", json={"strategy": "all"})
+    assert r.status_code == 400 and "Versand" in r.json()["detail"]
+    r = client.post("/ui/generate/run", data={"pid": pid, "strategy": "pairwise"})
+    assert r.status_code == 400 and "keine gültigen Werte" in r.text
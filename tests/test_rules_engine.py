@@ -0,0 +1,121 @@
+import numpy as np
+
+from combinatorics import all_combinations
+from combinatorics.suite import Suite
+from rules import engine
+from rules.dedup import SeenRows
+from rules.dependency_rule import DependencyRule
+from rules.exclude_rule import ExcludeRule
+
+CATS = {"Versand": ["Post", "Express", "Abholung"], "Gewicht": ["500g", "1000g"], "Zahlung": ["Karte", "Bar"]}
+
+
+def test_pairs_and_dependencies_filter_rows_and_blocks_alike():
+    rules = engine.from_pairs(
+        exclude=[("Versand", "Express", "Gewicht", "1000g")],
+        dependency=[("Versand", "Abholung", "Zahlung", "Bar")],
+    )
+    suite = all_combinations.generate(CATS)
+    kept = [tc for tc in suite if not rules.violates(tc)]
+    assert len(kept) == 12 - 2 - 2
+    assert {"Versand": "Express", "Gewicht": "1000g", "Zahlung": "Bar"} not in kept
+    assert all(tc["Zahlung"] == "Bar" for tc in kept if tc["Versand"] == "Abholung")
+    assert list(suite[rules.mask(suite)]) == kept
+    assert rules.filter(suite) == rules.filter(list(suite)) == kept
+
+
+def test_rules_are_indexed_by_trigger_value():
+    # viele Regeln auf anderen Werten: ein Testfall prüft nur die, die seine Werte auslösen
+    many = [(f"K{i}", "x", "Gewicht", "500g") for i in range(1000)]
+    rules = engine.from_pairs(exclude=many + [("Versand", "Post", "Gewicht", "500g")])
+    assert rules.index[("Versand", "Post")] == [("exclude", 1000)]
+    assert rules.violates({"Versand": "Post", "Gewicht": "500g"})
+    assert not rules.violates({"Versand": "Express", "Gewicht": "500g"})
+
+
+def test_combine_fan_out_and_status():
+    rules = engine.from_pairs(combine=[("Versand", "Express", "Zahlung", ["Karte", "Paypal"])])
+    case = {"Versand": "Express", "Gewicht": "500g", "Zahlung": "Bar"}
+    assert [c["Zahlung"] for c in rules.fan_out(case)] == ["Karte", "Paypal"]
+    assert rules.status({"Versand": "Express", "Zahlung": "Karte"}) == "combined:Zahlung=Karte"
+    assert rules.status({"Versand": "Post", "Zahlung": "Karte"}) == "ok"
+    suite = all_combinations.generate(CATS)
+    fanned = rules.fan_out_suite(suite)
+    assert list(fanned) == [c for tc in suite for c in rules.fan_out(tc)]
+    blocks = list(rules.apply([suite[:6], suite[6:]]))
+    assert sum(len(b) for b in blocks) == 12 - 4 + 4  # Express-Zeilen: je 2 Zielwerte, dedupliziert
+
+
+def test_desktop_rule_objects_use_the_same_engine():
+    rules = engine.from_objects([
+        ExcludeRule({"Versand": ["Post", "Express"], "Gewicht": ["1000g"], "Zahlung": ["Bar"]}),
+        DependencyRule("Versand", "Abholung", "Gewicht", "500g"),
+    ])
+    kept = rules.filter(all_combinations.generate(CATS))
+    assert len(kept) == 12 - 2 - 2
+    # Ausschluss über zwei Kategorien wird zu verbotenen Paaren für die Generatoren
+    pairs = engine.from_pairs(exclude=[("Versand", "Post", "Gewicht", "500g")]).forbidden_pairs(CATS)
+    assert pairs == [("Versand", "Post", "Gewicht", "500g")]
+    assert ("Versand", "Abholung", "Gewicht", "1000g") in rules.forbidden_pairs(CATS)
+
+
+def test_dedup_spills_to_disk_and_compares_across_value_tables():
+    suite = all_combinations.generate(CATS)
+    with SeenRows(memory_keys=4) as seen:
+        assert seen.first(suite[:8]).all()
+        assert seen.spilled >= 1
+        # gleiche Testfälle mit anders sortierter Wertetabelle
+        other = Suite.from_cases(list(suite)[6:], {k: list(reversed(v)) for k, v in CATS.items()})
+        assert seen.first(other).tolist() == [False, False, True, True, True, True]
+        assert seen.first(suite[:1].like([[0, 0, 0], [0, 0, 0]])).tolist() == [False, False]
+
+
+
+def test_dedup_confirms_hash_hits_with_full_rows(monkeypatch):
+    # jeder Testfall kollidiert: trotzdem entfällt keiner, nur echte Wiederholungen
+    monkeypatch.setattr(SeenRows, "hashes", staticmethod(lambda rows: np.zeros(len(rows), dtype=np.uint64)))
+    suite = all_combinations.generate(CATS)
+    with SeenRows(memory_keys=5) as seen:
+        assert seen.first(suite[:7]).all()
+        assert seen.first(suite).tolist() == [False] * 7 + [True] * 5
+        assert seen.spilled >= 1
+
+def test_apply_fans_out_in_windows(monkeypatch):
+    rules = engine.from_pairs(combine=[("Versand", "Express", "Zahlung", ["Karte", "Paypal"])])
+    suite = all_combinations.generate(CATS)
+    expected = [tc for block in rules.apply([suite]) for tc in block]
+    monkeypatch.setattr(engine, "_FAN_OUT_WINDOW", 4)
+    blocks = list(rules.apply([suite]))
+    assert max(len(b) for b in blocks) <= 4 * 2
+    assert [tc for block in blocks for tc in block] == expected
+
+
+def test_check_finds_chains_and_uncoverable_pairs():
+    rules = engine.from_pairs(
+        exclude=[("Versand", "Express", "Gewicht", "1000g"), ("Zahlung", "Bar", "Gewicht", "500g"),
+                 ("Versand", "Post", "Zahlung", "Karte")],
+        dependency=[("Versand", "Express", "Zahlung", "Bar")],
+    )
+    check = rules.check(CATS)
+    # Express braucht 500g (Exclude) und Bar (Dependency) – Bar schließt 500g aus
+    assert check["ok"] and check["dead_values"] == [["Versand", "Express"]]
+    assert check["unsatisfiable_dependencies"] == [["Versand", "Express", "Zahlung", "Bar"]]
+    # Post braucht Bar, Bar schließt 500g aus: Post + 500g kommt nie gemeinsam vor
+    assert check["uncoverable_pairs"] == [["Versand", "Post", "Gewicht", "500g"]]
+    valid = rules.filter(all_combinations.generate(CATS))
+    assert not any(tc["Versand"] == "Post" and tc["Gewicht"] == "500g" for tc in valid)
+
+    everything = engine.from_pairs(dependency=[("Gewicht", g, "Zahlung", "Paypal") for g in CATS["Gewicht"]])
+    assert everything.check(CATS, pairs=False)["empty_categories"] == ["Versand", "Gewicht", "Zahlung"]
+
+
+def test_check_uses_the_generators_forbidden_pairs():
+    # Combine-Ziel „Paypal“ entsteht erst beim Fan-out: nichts ist tot, Express wird weiter generiert
+    rules = engine.from_pairs(combine=[("Versand", "Express", "Zahlung", ["Paypal"])])
+    assert rules.check(CATS)["dead_values"] == []
+    # Combine auf Karte, Karte aber mit Express ausgeschlossen: Express kommt nie vor – wie im Generator
+    rules = engine.from_pairs(exclude=[("Versand", "Express", "Zahlung", "Karte")],
+                              combine=[("Versand", "Express", "Zahlung", ["Karte"])])
+    assert rules.check(CATS)["dead_values"] == [["Versand", "Express"]]
+    generated = all_combinations.generate(CATS, forbidden=rules.forbidden_pairs(CATS))
+    assert not any(tc["Versand"] == "Express" for tc in generated)
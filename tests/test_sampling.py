@@ -0,0 +1,83 @@
+import itertools
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from combinatorics import all_combinations, sampling
+
+client = TestClient(app)
+
+
+def test_unrank_matches_product_order():
+    radices = [3, 1, 4, 2]
+    expected = list(itertools.product(*[range(n) for n in radices]))
+    assert [sampling.unrank(i, radices) for i in range(len(expected))] == expected
+
+
+def test_sample_is_reproducible_and_spread():
+    cats = {f"K{i}": [f"v{j}" for j in range(10)] for i in range(30)}
+    a = sampling.sample(cats, 300, seed=42)
+    assert a == sampling.sample(cats, 300, seed=42)
+    assert a != sampling.sample(cats, 300, seed=43)
+    assert len({tuple(tc.values()) for tc in a}) == 300
+    # nicht auf die ersten Werte der ersten Kategorie beschränkt (wie limit auf „all“)
+    assert len(Counter(tc["K0"] for tc in a)) == 10
+
+
+def test_sample_respects_rules_and_exhausts_small_projects():
+    cats = {"A": ["a1", "a2", "a3"], "B": ["b1", "b2"], "C": ["c1", "c2", "c3"]}
+    forbidden = [("A", "a1", "B", "b1"), ("B", "b2", "C", "c3")]
+    valid = all_combinations.generate(cats, forbidden)
+    drawn = sampling.sample(cats, 100, seed=1, forbidden=forbidden)
+    assert sorted(map(str, drawn)) == sorted(map(str, valid))
+
+
+def test_generate_sample_endpoint(make_project):
+    pid, _ = make_project({f"K{i}": [f"v{v}" for v in range(5)] for i in range(6)})
+
+    r = client.post(f"/projects/{pid}/generate", json={"strategy": "sample"})
+    assert r.status_code == 400
+
+    def drawn(seed):
+        r = client.post(f"/projects/{pid}/generate", json={"strategy": "sample", "limit": 20, "seed": seed})
+        assert r.status_code == 200, r.text
+        assert r.json()["count"] == 20
+        return [tc["assignments"] for tc in client.get(f"/generations/{r.json()['generation_id']}/testcases").json()]
+
+    assert drawn(7) == drawn(7)
+
+
+def test_sample_falls_back_to_guided_draws_under_restrictive_rules():
+    # je Kategorie nur zwei von sechs Nachfolgewerten erlaubt: ~6e-6 des Produkts ist gültig
+    cats = {f"K{i}": [f"v{j}" for j in range(6)] for i in range(12)}
+    forbidden = [(f"K{i}", f"v{a}", f"K{i + 1}", f"v{b}")
+                 for i in range(11) for a in range(6) for b in range(6) if b not in (a, (a + 1) % 6)]
+    drawn = sampling.sample(cats, 50, seed=3, forbidden=forbidden)
+    assert len({tuple(tc.values()) for tc in drawn}) == 50
+    assert not any(tc[a] == av and tc[b] == bv for tc in drawn for a, av, b, bv in forbidden)
+
+
+
+def test_sample_enumeration_fallback_is_shuffled(monkeypatch):
+    monkeypatch.setattr(sampling, "_MAX_REJECTS", 0)  # sofort auf die Aufzählung der übrigen Zeilen
+    cats = {f"K{i}": [f"v{j}" for j in range(4)] for i in range(4)}
+    forbidden = [("K0", "v0", "K1", "v0")]
+    first = all_combinations.generate(cats, forbidden)[:9]
+    drawn = sampling.sample(cats, 10, seed=5, forbidden=forbidden)
+    assert drawn == sampling.sample(cats, 10, seed=5, forbidden=forbidden)
+    assert drawn != sampling.sample(cats, 10, seed=6, forbidden=forbidden)
+    # nach der ersten regelgeführten Zeile nicht die lexikografisch ersten (alle mit K0=v0)
+    assert drawn[1:] != first and len(Counter(tc["K0"] for tc in drawn[1:])) > 1
+
+def test_sample_endpoint_reports_shortfall(make_project):
+    pid, cids = make_project({"K0": ["v0", "v1"], "K1": ["v0", "v1"]})
+    client.post("/ui/rules/create", data={"pid": pid, "rtype": "exclude", "if_category_id": cids["K0"],
+                                          "if_value": "v0", "then_category_id": cids["K1"], "then_value": "v0"})
+    r = client.post(f"/projects/{pid}/generate", json={"strategy": "sample", "limit": 10})
+    assert r.status_code == 200, r.text
+    assert r.json()["count"] == 3
+    assert r.json()["coverage_meta"]["sample"] == {"requested": 10, "count": 3}
+
+    r = client.post("/ui/generate/run", data={"pid": pid, "strategy": "sample", "sample_size": "5"})
+    assert r.status_code == 200 and "Nur 3 von 5" in r.text
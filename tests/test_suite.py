@@ -0,0 +1,67 @@
+import os
+import tempfile
+
+import numpy as np
+
+from combinatorics import all_combinations, each_choice, orthogonal, prioritized, sampling
+from combinatorics.suite import MISSING, Suite, chunked, concat
+from io_handlers import csv_handler
+
+CATS = {"Gewicht": ["500g", "1000g"], "Farbe": ["Rot", "Blau", "Grün"], "Größe": ["S", "M"]}
+
+
+def test_suite_behaves_like_list_of_dicts():
+    suite = all_combinations.generate(CATS)
+    assert isinstance(suite, Suite)
+    assert suite.rows.dtype == np.int8 and suite.rows.shape == (12, 3)
+    assert suite[0] == {"Gewicht": "500g", "Farbe": "Rot", "Größe": "S"}
+    assert suite[-1] == {"Gewicht": "1000g", "Farbe": "Grün", "Größe": "M"}
+    assert isinstance(suite[2:4], Suite) and list(suite[2:4]) == [suite[2], suite[3]]
+    assert suite == list(suite) and list(suite) == suite
+    assert {"Gewicht": "1000g", "Farbe": "Blau", "Größe": "S"} in suite
+
+
+def test_from_cases_and_project():
+    cases = [{"Gewicht": "500g", "Farbe": "Lila"}, {"Farbe": "Rot"}]
+    suite = Suite.from_cases(cases, CATS)
+    assert suite.values[1] == ["Rot", "Blau", "Grün", "Lila"]  # unbekannter Wert angehängt
+    assert suite == cases
+    # bezogen auf die ursprünglichen Kategorien: unbekannte Werte und leere Zellen -> MISSING
+    assert suite.project(CATS).tolist() == [[0, MISSING, MISSING], [MISSING, 0, MISSING]]
+
+
+def test_all_generators_return_suites():
+    suites = [
+        all_combinations.generate(CATS),
+        each_choice.generate(CATS),
+        orthogonal.generate(CATS),
+        prioritized.generate(CATS),
+        sampling.sample(CATS, 5, seed=1),
+        orthogonal.best_prefix(CATS, 4)[0],
+    ]
+    for suite in suites:
+        assert isinstance(suite, Suite) and suite.keys == list(CATS)
+
+
+def test_compact_rows_are_small():
+    cats = {f"K{i}": [str(j) for j in range(10)] for i in range(8)}
+    suite = orthogonal.generate(cats)
+    assert suite.nbytes == len(suite) * 8  # ein Byte je Zelle
+
+
+def test_chunked_and_concat():
+    rows = list(all_combinations.iter_rows(CATS))
+    blocks = list(chunked(CATS, iter(rows), 5))
+    assert [len(b) for b in blocks] == [5, 5, 2]
+    assert concat(blocks) == all_combinations.generate(CATS)
+    assert len(concat([], CATS)) == 0
+
+
+def test_csv_export_of_suite_matches_dicts():
+    suite = Suite.from_cases([{"Gewicht": "500g", "Farbe": "Rot"}, {"Farbe": "Blau"}], CATS)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        a, b = os.path.join(tmpdir, "a.csv"), os.path.join(tmpdir, "b.csv")
+        csv_handler.export_to_csv(a, list(CATS), {}, suite)
+        csv_handler.export_to_csv(b, list(CATS), {}, list(suite))
+        with open(a, encoding="utf-8") as fa, open(b, encoding="utf-8") as fb:
+            assert fa.read() == fb.read()
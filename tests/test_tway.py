@@ -0,0 +1,81 @@
+from itertools import combinations, product
+import time
+
+from combinatorics import orthogonal
+
+
+def _covers_all_tuples(cats, suite, t):
+    keys = list(cats.keys())
+    for ks in combinations(keys, t):
+        seen = {tuple(tc[k] for k in ks) for tc in suite}
+        if len(seen) != len(list(product(*[cats[k] for k in ks]))):
+            return False
+    return True
+
+
+def test_three_wise_covers_all_triples_15x4():
+    cats = {f"K{i}": [f"W{i}_{j}" for j in range(4)] for i in range(15)}
+    start = time.time()
+    suite = orthogonal.generate(cats, strength=3)
+    assert time.time() - start < 60
+    assert _covers_all_tuples(cats, suite, 3)
+    assert len(suite) >= 64
+
+
+def test_four_wise_mixed_sizes():
+    cats = {f"K{i}": [f"W{i}_{j}" for j in range(2 + i % 3)] for i in range(7)}
+    suite = orthogonal.generate(cats, strength=4)
+    assert _covers_all_tuples(cats, suite, 4)
+
+
+def test_strength_at_least_categories_gives_all_combinations():
+    cats = {"Gewicht": ["500g", "1000g"], "Größe": ["Klein", "Mittel", "Groß"]}
+    suite = orthogonal.generate(cats, strength=3)
+    assert len(suite) == 6
+    assert _covers_all_tuples(cats, suite, 2)
+
+
+def test_variable_strength_group_gets_three_wise_rest_pairwise():
+    cats = {
+        "Gewicht": ["Bis 500 g", "501 bis 1000 g", "1001 bis 2000 g"],
+        "Größe": ["Klein", "Mittel", "Groß"],
+        "Versandart": ["Overnight", "Normal", "Gefahrgut"],
+        "Innerdeutsch": ["True", "False"],
+        "Nachricht an Bote": ["nichts", "klingeln", "Nachbar"],
+        "Zahlart": ["Bar", "Karte", "Rechnung"],
+    }
+    group = ["Gewicht", "Größe", "Versandart"]
+    suite = orthogonal.generate(cats, strength=2, groups=[(group, 3)])
+    assert _covers_all_tuples(cats, suite, 2)
+    assert _covers_all_tuples({k: cats[k] for k in group}, suite, 3)
+    # deutlich kleiner als eine 3-wise-Suite über alle Kategorien
+    assert len(suite) < len(orthogonal.generate(cats, strength=3))
+
+
+def test_variable_strength_unknown_category_raises():
+    cats = {"A": ["a1", "a2"], "B": ["b1", "b2"]}
+    try:
+        orthogonal.generate(cats, groups=[(["A", "X"], 3)])
+    except ValueError as e:
+        assert "X" in str(e)
+    else:
+        raise AssertionError("ValueError erwartet")
+
+
+def test_parallel_scoring_matches_serial(monkeypatch):
+    monkeypatch.setattr(orthogonal, "_MIN_PARALLEL_WORK", 0)  # Pool auch für kleine Blöcke nutzen
+    cats = {f"K{i}": [f"v{j}" for j in range(4)] for i in range(10)}
+    forbidden = [("K0", "v0", "K1", "v1"), ("K2", "v3", "K5", "v0")]
+    for strength in (2, 3):
+        serial = orthogonal.generate(cats, strength=strength, forbidden=forbidden)
+        assert orthogonal.generate(cats, strength=strength, forbidden=forbidden, workers=2) == serial
+
+
+def test_optimize_shrinks_suite_and_keeps_coverage():
+    cats = {f"K{i}": [f"v{j}" for j in range(4)] for i in range(10)}
+    baseline = orthogonal.generate(cats)
+    suite, stats = orthogonal.optimize(cats, 2.0, seed=1)
+    assert _covers_all_tuples(cats, suite, 2)
+    assert stats["initial_size"] == len(baseline)
+    assert stats["size"] == len(suite) < len(baseline)
+    assert stats["elapsed"] < 4
@@ -1,8 +1,18 @@
+import csv
+import io
+import json
+
 from fastapi.testclient import TestClient
+from app import models
+from app.db import SessionLocal
 from app.main import app
 
 client = TestClient(app)
 
+
+def _uniform(k, n):
+    return {f"K{i}": [f"v{v}" for v in range(n)] for i in range(k)}
+
 def test_ui_generate_run_route_exists():
     r = client.get("/ui/generate")
     assert r.status_code == 200
@@ -10,4 +20,79 @@ def test_ui_generate_run_route_exists():
     # Route darf nicht 404 liefern – Status 200/400/422 sind ok je nach Datenlage
     r = client.post("/ui/generate/run", data={"pid": 1, "strategy": "pairwise"})
     assert r.status_code in (200, 400, 422), r.text
-    
\ No newline at end of file
+    
+
+def test_generate_optimize_records_coverage_meta(make_project):
+    pid, _ = make_project(_uniform(6, 3))
+    r = client.post(f"/projects/{pid}/generate", json={"strategy": "pairwise", "optimize_seconds": 0.5})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["coverage_meta"]["optimize"]["size"] == body["count"]
+
+    with SessionLocal() as db:
+        gen = db.get(models.Generation, body["generation_id"])
+        assert json.loads(gen.coverage_meta)["optimize"]["seconds"] == 0.5
+
+
+def test_generate_extends_previous_generation(make_project):
+    pid, cids = make_project(_uniform(4, 3))
+    base = client.post(f"/projects/{pid}/generate", json={"strategy": "pairwise"}).json()
+    client.post(f"/categories/{cids['K0']}/values", json={"value": "neu"})
+
+    r = client.post(f"/projects/{pid}/generate",
+                    json={"strategy": "pairwise", "extend_generation_id": base["generation_id"]})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["coverage_meta"]["extend"] == {"generation_id": base["generation_id"], "base_size": base["count"]}
+    old = [tc["assignments"] for tc in client.get(f"/generations/{base['generation_id']}/testcases").json()]
+    new = [tc["assignments"] for tc in client.get(f"/generations/{body['generation_id']}/testcases").json()]
+    assert new[: len(old)] == old
+    assert {("neu", tc["K1"]) for tc in new if tc["K0"] == "neu"} == {("neu", f"v{v}") for v in range(3)}
+
+
+def test_generate_pairwise_limit_reports_coverage(make_project):
+    pid, _ = make_project(_uniform(5, 3))
+    r = client.post(f"/projects/{pid}/generate", json={"strategy": "pairwise", "limit": 4})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["count"] == 4
+    assert body["coverage_meta"]["limit"]["size"] == 4
+    assert 0 < body["coverage_meta"]["limit"]["coverage"] < 100
+
+
+SHOP = {"Versand": ["Post", "Express"], "Zahlung": ["Karte", "Bar"]}
+
+
+def test_export_status_uses_rule_snapshot_of_generation(make_project):
+    pid, cids = make_project(SHOP)
+    r = client.post("/ui/rules/create", data={"pid": pid, "rtype": "combine", "if_category_id": cids["Versand"],
+                                              "if_value": "Express", "then_category_id": cids["Zahlung"],
+                                              "then_values": ["Karte"]})
+    assert r.status_code == 200, r.text
+    gid = client.post(f"/projects/{pid}/generate", json={"strategy": "all"}).json()["generation_id"]
+
+    # Regeln nach der Generierung ändern: der Export bleibt beim Stand der Generation
+    with SessionLocal() as db:
+        db.query(models.Rule).filter(models.Rule.project_id == pid).delete()
+        db.commit()
+    r = client.get(f"/generations/{gid}/export/csv?status=1&excel=0")
+    rows = list(csv.DictReader(io.StringIO(r.text.lstrip("﻿")), delimiter=";"))
+    status = {(row["Versand"], row["Zahlung"]): row["Status"] for row in rows}
+    assert status[("Express", "Karte")] == "combined:Zahlung=Karte"
+    assert status[("Post", "Bar")] == "ok"
+
+
+def test_status_is_stored_per_testcase(make_project):
+    pid, cids = make_project(SHOP)
+    client.post("/ui/rules/create", data={"pid": pid, "rtype": "combine", "if_category_id": cids["Versand"],
+                                          "if_value": "Express", "then_category_id": cids["Zahlung"],
+                                          "then_values": ["Karte"]})
+    with SessionLocal() as db:
+        rule_id = db.query(models.Rule.id).filter(models.Rule.project_id == pid).scalar()
+    gid = client.post(f"/projects/{pid}/generate", json={"strategy": "all"}).json()["generation_id"]
+
+    cases = client.get(f"/generations/{gid}/testcases").json()
+    by_values = {(c["assignments"]["Versand"], c["assignments"]["Zahlung"]): c for c in cases}
+    assert by_values[("Express", "Karte")]["status"] == "combined:Zahlung=Karte"
+    assert by_values[("Express", "Karte")]["rule_id"] == rule_id
+    assert by_values[("Post", "Bar")]["status"] == "ok" and by_values[("Post", "Bar")]["rule_id"] is None